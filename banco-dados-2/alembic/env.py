@@ -16,6 +16,7 @@ from models import (
     Manga, Status, Genero,
     Capitulo, Avaliacao, Comentario, LeitorManga
 )
+from migracao_online import configurar_conexao
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -76,6 +77,12 @@ def run_migrations_online():
     and associate a connection with the context.
 
     """
+    # Conexão fornecida por quem chamou (ex.: init.py, no mesmo processo)
+    conexao = config.attributes.get("connection")
+    if conexao is not None:
+        _executar_migrations(conexao)
+        return
+
     configuration = config.get_section(config.config_ini_section)
     configuration["sqlalchemy.url"] = get_url()
     connectable = engine_from_config(
@@ -85,12 +92,25 @@ def run_migrations_online():
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+        _executar_migrations(connection)
+
+
+def _executar_migrations(connection):
+    """
+    Uma transação por migration: helpers de migracao_online (CREATE INDEX
+    CONCURRENTLY) precisam sair da transação, e cada migration confirmada
+    não é refeita se uma posterior falhar. A sessão usa lock_timeout
+    (MIGRATION_LOCK_TIMEOUT) para não enfileirar a aplicação atrás de um ALTER
+    """
+    configurar_conexao(connection)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        transaction_per_migration=True,
+    )
 
-        with context.begin_transaction():
-            context.run_migrations()
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -14,20 +14,12 @@ from models import (
 
 
 def limpar_dados(session: Session):
-    """Remove todos os dados do banco"""
+    """Remove todos os dados do banco (TRUNCATE ... RESTART IDENTITY)"""
+    from reset_banco import truncar_tabelas
+    
     print("  Limpando dados existentes...")
     
-    # A ordem importa por causa das FKs
-    session.query(Comentario).delete()
-    session.query(Avaliacao).delete()
-    session.query(LeitorManga).delete()
-    session.query(Capitulo).delete()
-    session.query(MangaGenero).delete()
-    session.query(Manga).delete()
-    session.query(Genero).delete()
-    session.query(Leitor).delete()
-    session.query(Administrador).delete()
-    session.query(Usuario).delete()
+    truncar_tabelas(session.connection())
     
     session.commit()
     print("✓ Dados removidos\n")
@@ -137,16 +129,13 @@ def criar_mangas(session: Session, admin: Administrador, generos: list):
         manga = Manga(**data)
         admin.adicionar_manga(manga, session)
         
-        # Adicionar gêneros ao mangá
+        # Adicionar gêneros ao mangá (nome -> id pelo cache de referência)
         for i, genero_nome in enumerate(generos_nomes):
-            genero = session.query(Genero).filter_by(tipo_genero=genero_nome).first()
-            if genero:
-                manga_genero = MangaGenero(
-                    manga=manga,
-                    genero=genero,
-                    principal=(i == 0)  # Primeiro gênero é o principal
-                )
-                session.add(manga_genero)
+            manga.adicionar_genero(
+                genero_nome,
+                session,
+                principal=(i == 0)  # Primeiro gênero é o principal
+            )
         
         mangas.append(manga)
     
@@ -0,0 +1,32 @@
+"""Bitmap de capítulos lidos
+
+leitor_manga.capitulos_lidos (bytea/BLOB) guarda um bit por numero_capitulo.
+Coluna nula, sem reescrever a tabela; o backfill de mesmo nome marca
+1..ultimo_capitulo_lido nas leituras existentes (único dado disponível)
+
+Revision ID: 0050a8346dc5
+Revises: 2557f8a23caa
+Create Date: 2026-10-19 13:15:51.109223
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0050a8346dc5'
+down_revision = '2557f8a23caa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('leitor_manga', sa.Column('capitulos_lidos', sa.LargeBinary(), nullable=True))
+
+    from backfill import executar_na_migration
+    executar_na_migration('capitulos_lidos')
+
+
+def downgrade():
+    with op.batch_alter_table('leitor_manga') as batch_op:
+        batch_op.drop_column('capitulos_lidos')
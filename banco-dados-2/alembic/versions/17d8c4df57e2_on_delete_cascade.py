@@ -0,0 +1,58 @@
+"""ON DELETE CASCADE nas chaves de mangás e leitores
+
+Excluir um mangá ou um leitor passa a remover avaliações, comentários e
+leituras no próprio banco, sem o ORM carregar os filhos
+
+Revision ID: 17d8c4df57e2
+Revises: ba2365f79494
+Create Date: 2026-10-19 14:27:40.662981
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '17d8c4df57e2'
+down_revision = 'ba2365f79494'
+branch_labels = None
+depends_on = None
+
+
+# (tabela, coluna, tabela referenciada, coluna referenciada)
+CHAVES = [
+    ('avaliacoes', 'id_manga', 'mangas', 'id_manga'),
+    ('avaliacoes', 'id_leitor', 'leitores', 'id_usuario'),
+    ('comentarios', 'id_manga', 'mangas', 'id_manga'),
+    ('comentarios', 'id_leitor', 'leitores', 'id_usuario'),
+    ('leitor_manga', 'id_manga', 'mangas', 'id_manga'),
+    ('leitor_manga', 'id_leitor', 'leitores', 'id_usuario'),
+    ('leitores', 'id_usuario', 'usuarios', 'id_usuario'),
+    ('administradores', 'id_usuario', 'usuarios', 'id_usuario'),
+]
+
+# O SQLite não nomeia as FKs: o modo batch as identifica por esta convenção
+CONVENCAO_SQLITE = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _recriar_chaves(ondelete):
+    if op.get_bind().dialect.name == 'sqlite':
+        for tabela, coluna, referida, coluna_referida in CHAVES:
+            with op.batch_alter_table(tabela, naming_convention=CONVENCAO_SQLITE) as batch_op:
+                nome = f'fk_{tabela}_{coluna}_{referida}'
+                batch_op.drop_constraint(nome, type_='foreignkey')
+                batch_op.create_foreign_key(nome, referida, [coluna], [coluna_referida], ondelete=ondelete)
+        return
+
+    # Nomes padrão do PostgreSQL (<tabela>_<coluna>_fkey)
+    for tabela, coluna, referida, coluna_referida in CHAVES:
+        nome = f'{tabela}_{coluna}_fkey'
+        op.drop_constraint(nome, tabela, type_='foreignkey')
+        op.create_foreign_key(nome, tabela, referida, [coluna], [coluna_referida], ondelete=ondelete)
+
+
+def upgrade():
+    _recriar_chaves('CASCADE')
+
+
+def downgrade():
+    _recriar_chaves(None)
@@ -0,0 +1,29 @@
+"""Versões de dados de referência
+
+Revision ID: 1b36b070b824
+Revises: 4187a671ccc3
+Create Date: 2026-10-19 12:58:41.730215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b36b070b824'
+down_revision = '4187a671ccc3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    versoes = op.create_table('versoes_referencia',
+    sa.Column('nome', sa.String(length=50), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('nome')
+    )
+    op.bulk_insert(versoes, [{'nome': 'generos', 'versao': 0}])
+
+
+def downgrade():
+    op.drop_table('versoes_referencia')
@@ -0,0 +1,49 @@
+"""Progresso de páginas por leitor
+
+progresso_paginas guarda a última página lida por (leitor, capítulo),
+gravada em lotes pelo BufferProgresso. capitulos.paginas_lidas era um valor
+único para todos os leitores e sai; o valor antigo não tem dono e não é
+migrado. No PostgreSQL o DROP COLUMN só altera o catálogo (sob lock_timeout)
+
+Revision ID: 2557f8a23caa
+Revises: cb7272b6b599
+Create Date: 2026-10-19 13:14:37.033925
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migracao_online import executar
+
+
+# revision identifiers, used by Alembic.
+revision = '2557f8a23caa'
+down_revision = 'cb7272b6b599'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('progresso_paginas',
+    sa.Column('id_leitor', sa.Integer(), nullable=False),
+    sa.Column('id_capitulo', sa.Integer(), nullable=False),
+    sa.Column('pagina', sa.Integer(), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['id_capitulo'], ['capitulos.id_capitulo'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['id_leitor'], ['leitores.id_usuario'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_leitor', 'id_capitulo')
+    )
+    op.create_index('ix_progresso_paginas_id_capitulo', 'progresso_paginas', ['id_capitulo'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        executar('ALTER TABLE capitulos DROP COLUMN paginas_lidas')
+    else:
+        with op.batch_alter_table('capitulos') as batch_op:
+            batch_op.drop_column('paginas_lidas')
+
+
+def downgrade():
+    with op.batch_alter_table('capitulos') as batch_op:
+        batch_op.add_column(sa.Column('paginas_lidas', sa.Integer(), nullable=True, server_default='0'))
+    op.drop_index('ix_progresso_paginas_id_capitulo', table_name='progresso_paginas')
+    op.drop_table('progresso_paginas')
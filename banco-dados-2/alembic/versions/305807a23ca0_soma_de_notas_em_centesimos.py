@@ -0,0 +1,51 @@
+"""Soma de notas em centésimos
+
+avaliacoes_diarias.soma_notas (float) acumulava erro a cada delta somado e
+subtraído; soma_centesimos é inteira. A coluna entra com DEFAULT 0 (sem
+reescrever a tabela no PostgreSQL) e recebe ROUND(soma_notas * 100): as
+somas corretas são múltiplas de 0,01, então o arredondamento descarta o
+erro já acumulado. Uma linha por mangá e dia: o UPDATE é pequeno
+
+Revision ID: 305807a23ca0
+Revises: 6fb72815e988
+Create Date: 2026-10-19 13:28:27.194660
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migracao_online import executar
+
+
+# revision identifiers, used by Alembic.
+revision = '305807a23ca0'
+down_revision = '6fb72815e988'
+branch_labels = None
+depends_on = None
+
+
+CONVERTER_SOMAS = 'UPDATE avaliacoes_diarias SET soma_centesimos = CAST(ROUND(soma_notas * 100) AS BIGINT)'
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        executar('ALTER TABLE avaliacoes_diarias ADD COLUMN soma_centesimos BIGINT NOT NULL DEFAULT 0')
+        op.execute(CONVERTER_SOMAS)
+        executar('ALTER TABLE avaliacoes_diarias DROP COLUMN soma_notas, '
+                 'ALTER COLUMN soma_centesimos DROP DEFAULT')
+    else:
+        with op.batch_alter_table('avaliacoes_diarias') as batch_op:
+            batch_op.add_column(sa.Column('soma_centesimos', sa.BigInteger(), nullable=False, server_default='0'))
+        op.execute(CONVERTER_SOMAS)
+        with op.batch_alter_table('avaliacoes_diarias', recreate='always') as batch_op:
+            batch_op.alter_column('soma_centesimos', server_default=None)
+            batch_op.drop_column('soma_notas')
+
+
+def downgrade():
+    with op.batch_alter_table('avaliacoes_diarias') as batch_op:
+        batch_op.add_column(sa.Column('soma_notas', sa.Float(), nullable=False, server_default='0'))
+    op.execute('UPDATE avaliacoes_diarias SET soma_notas = soma_centesimos / 100.0')
+    with op.batch_alter_table('avaliacoes_diarias') as batch_op:
+        batch_op.alter_column('soma_notas', server_default=None)
+        batch_op.drop_column('soma_centesimos')
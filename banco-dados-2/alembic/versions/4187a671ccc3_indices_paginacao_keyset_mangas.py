@@ -0,0 +1,30 @@
+"""Índices para paginação keyset de mangás
+
+Revision ID: 4187a671ccc3
+Revises: 444c89e7f4e9
+Create Date: 2026-10-19 12:40:12.184311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4187a671ccc3'
+down_revision = '444c89e7f4e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_mangas_titulo_id', 'mangas', ['titulo_manga', 'id_manga'], unique=False)
+    op.create_index('ix_mangas_data_criacao_id', 'mangas', ['data_criacao', 'id_manga'], unique=False)
+    op.create_index('ix_mangas_status_titulo_id', 'mangas', ['status', 'titulo_manga', 'id_manga'], unique=False)
+    op.create_index('ix_mangas_status_data_criacao_id', 'mangas', ['status', 'data_criacao', 'id_manga'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_mangas_status_data_criacao_id', table_name='mangas')
+    op.drop_index('ix_mangas_status_titulo_id', table_name='mangas')
+    op.drop_index('ix_mangas_data_criacao_id', table_name='mangas')
+    op.drop_index('ix_mangas_titulo_id', table_name='mangas')
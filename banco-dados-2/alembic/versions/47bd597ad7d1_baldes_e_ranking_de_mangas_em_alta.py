@@ -0,0 +1,53 @@
+"""Baldes e ranking de mangás em alta
+
+Revision ID: 47bd597ad7d1
+Revises: eff84c9dd82c
+Create Date: 2026-10-19 13:07:27.760205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '47bd597ad7d1'
+down_revision = 'eff84c9dd82c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('mangas_em_alta',
+    sa.Column('janela', sa.String(length=10), nullable=False),
+    sa.Column('id_manga', sa.Integer(), nullable=False),
+    sa.Column('pontuacao', sa.Float(), nullable=False),
+    sa.Column('leituras', sa.Integer(), nullable=False),
+    sa.Column('avaliacoes', sa.Integer(), nullable=False),
+    sa.Column('comentarios', sa.Integer(), nullable=False),
+    sa.Column('curtidas', sa.Integer(), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['id_manga'], ['mangas.id_manga'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('janela', 'id_manga')
+    )
+    op.create_index('ix_mangas_em_alta_id_manga', 'mangas_em_alta', ['id_manga'], unique=False)
+    op.create_index('ix_mangas_em_alta_janela_pontuacao', 'mangas_em_alta', ['janela', 'pontuacao'], unique=False)
+    op.create_table('tendencia_baldes',
+    sa.Column('id_manga', sa.Integer(), nullable=False),
+    sa.Column('balde', sa.Integer(), nullable=False),
+    sa.Column('leituras', sa.Integer(), nullable=False),
+    sa.Column('avaliacoes', sa.Integer(), nullable=False),
+    sa.Column('comentarios', sa.Integer(), nullable=False),
+    sa.Column('curtidas', sa.Integer(), nullable=False),
+    sa.Column('pontos', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['id_manga'], ['mangas.id_manga'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_manga', 'balde')
+    )
+    op.create_index('ix_tendencia_baldes_balde', 'tendencia_baldes', ['balde'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tendencia_baldes_balde', table_name='tendencia_baldes')
+    op.drop_table('tendencia_baldes')
+    op.drop_index('ix_mangas_em_alta_janela_pontuacao', table_name='mangas_em_alta')
+    op.drop_index('ix_mangas_em_alta_id_manga', table_name='mangas_em_alta')
+    op.drop_table('mangas_em_alta')
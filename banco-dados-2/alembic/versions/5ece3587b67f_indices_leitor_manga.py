@@ -0,0 +1,33 @@
+"""Índices de leitor_manga criados sem bloquear a tabela
+
+As FKs de leitor_manga (ON DELETE CASCADE desde 17d8c4df57e2) não tinham
+índice: excluir um mangá ou leitor varria a tabela inteira, assim como as
+consultas de favoritos e progresso por leitor. Os índices são criados com
+CREATE INDEX CONCURRENTLY (migracao_online)
+
+Revision ID: 5ece3587b67f
+Revises: 17d8c4df57e2
+Create Date: 2026-10-19 15:02:11.481203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migracao_online import criar_indice, remover_indice
+
+
+# revision identifiers, used by Alembic.
+revision = '5ece3587b67f'
+down_revision = '17d8c4df57e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    criar_indice('ix_leitor_manga_id_leitor_id_manga', 'leitor_manga', ['id_leitor', 'id_manga'])
+    criar_indice('ix_leitor_manga_id_manga', 'leitor_manga', ['id_manga'])
+
+
+def downgrade():
+    remover_indice('ix_leitor_manga_id_manga', 'leitor_manga')
+    remover_indice('ix_leitor_manga_id_leitor_id_manga', 'leitor_manga')
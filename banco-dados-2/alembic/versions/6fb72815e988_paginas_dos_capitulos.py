@@ -0,0 +1,37 @@
+"""Páginas dos capítulos
+
+paginas_capitulo liga cada capítulo importado (importacao_capitulos) às
+páginas no armazenamento por conteúdo, pelo sha256
+
+Revision ID: 6fb72815e988
+Revises: 0050a8346dc5
+Create Date: 2026-10-19 13:17:41.322618
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6fb72815e988'
+down_revision = '0050a8346dc5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('paginas_capitulo',
+    sa.Column('id_capitulo', sa.Integer(), nullable=False),
+    sa.Column('numero_pagina', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('formato', sa.String(length=10), nullable=False),
+    sa.Column('tamanho_bytes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_capitulo'], ['capitulos.id_capitulo'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_capitulo', 'numero_pagina')
+    )
+    op.create_index('ix_paginas_capitulo_sha256', 'paginas_capitulo', ['sha256'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_paginas_capitulo_sha256', table_name='paginas_capitulo')
+    op.drop_table('paginas_capitulo')
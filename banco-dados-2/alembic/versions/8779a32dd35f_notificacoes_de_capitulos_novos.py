@@ -0,0 +1,78 @@
+"""Notificações de capítulos novos
+
+Caixa de entrada, contadores de não lidas e envios em lotes. O índice
+parcial dos favoritos em leitor_manga (tabela grande, em uso) é criado com
+CREATE INDEX CONCURRENTLY (migracao_online)
+
+Revision ID: 8779a32dd35f
+Revises: 47bd597ad7d1
+Create Date: 2026-10-19 13:09:36.844364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migracao_online import criar_indice, remover_indice
+
+
+# revision identifiers, used by Alembic.
+revision = '8779a32dd35f'
+down_revision = '47bd597ad7d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('envios_notificacao',
+    sa.Column('id_envio', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_manga', sa.Integer(), nullable=False),
+    sa.Column('id_capitulo', sa.Integer(), nullable=True),
+    sa.Column('tipo', sa.String(length=30), nullable=False),
+    sa.Column('ultimo_id_leitor', sa.Integer(), nullable=False),
+    sa.Column('notificacoes', sa.BigInteger(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('concluido_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_capitulo'], ['capitulos.id_capitulo'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['id_manga'], ['mangas.id_manga'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_envio')
+    )
+    op.create_index('ix_envios_notificacao_id_capitulo', 'envios_notificacao', ['id_capitulo'], unique=False)
+    op.create_index('ix_envios_notificacao_id_manga', 'envios_notificacao', ['id_manga'], unique=False)
+    op.create_table('notificacoes',
+    sa.Column('id_notificacao', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('id_leitor', sa.Integer(), nullable=False),
+    sa.Column('id_manga', sa.Integer(), nullable=False),
+    sa.Column('id_capitulo', sa.Integer(), nullable=True),
+    sa.Column('tipo', sa.String(length=30), nullable=False),
+    sa.Column('criada_em', sa.DateTime(), nullable=False),
+    sa.Column('lida_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_capitulo'], ['capitulos.id_capitulo'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['id_leitor'], ['leitores.id_usuario'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['id_manga'], ['mangas.id_manga'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_notificacao')
+    )
+    op.create_index('ix_notificacoes_id_capitulo', 'notificacoes', ['id_capitulo'], unique=False)
+    op.create_index('ix_notificacoes_id_leitor_id_notificacao', 'notificacoes', ['id_leitor', 'id_notificacao'], unique=False)
+    op.create_index('ix_notificacoes_id_manga', 'notificacoes', ['id_manga'], unique=False)
+    op.create_index('ix_notificacoes_nao_lidas', 'notificacoes', ['id_leitor', 'id_notificacao'], unique=False, postgresql_where=sa.text('lida_em IS NULL'), sqlite_where=sa.text('lida_em IS NULL'))
+    op.create_table('notificacoes_nao_lidas',
+    sa.Column('id_leitor', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_leitor'], ['leitores.id_usuario'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_leitor')
+    )
+    criar_indice('ix_leitor_manga_favoritos', 'leitor_manga', ['id_manga', 'id_leitor'],
+                 where='data_favorito IS NOT NULL')
+
+
+def downgrade():
+    remover_indice('ix_leitor_manga_favoritos', 'leitor_manga')
+    op.drop_table('notificacoes_nao_lidas')
+    op.drop_index('ix_notificacoes_nao_lidas', table_name='notificacoes', postgresql_where=sa.text('lida_em IS NULL'), sqlite_where=sa.text('lida_em IS NULL'))
+    op.drop_index('ix_notificacoes_id_manga', table_name='notificacoes')
+    op.drop_index('ix_notificacoes_id_leitor_id_notificacao', table_name='notificacoes')
+    op.drop_index('ix_notificacoes_id_capitulo', table_name='notificacoes')
+    op.drop_table('notificacoes')
+    op.drop_index('ix_envios_notificacao_id_manga', table_name='envios_notificacao')
+    op.drop_index('ix_envios_notificacao_id_capitulo', table_name='envios_notificacao')
+    op.drop_table('envios_notificacao')
@@ -0,0 +1,34 @@
+"""Progresso de backfills
+
+Revision ID: 98d55070aab5
+Revises: 5ece3587b67f
+Create Date: 2026-10-19 15:31:44.208615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '98d55070aab5'
+down_revision = '5ece3587b67f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('backfills_progresso',
+    sa.Column('nome', sa.String(length=100), nullable=False),
+    sa.Column('ultimo_id', sa.BigInteger(), nullable=True),
+    sa.Column('id_maximo', sa.BigInteger(), nullable=True),
+    sa.Column('linhas_processadas', sa.BigInteger(), nullable=False),
+    sa.Column('lotes', sa.Integer(), nullable=False),
+    sa.Column('iniciado_em', sa.DateTime(), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+    sa.Column('concluido_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('nome')
+    )
+
+
+def downgrade():
+    op.drop_table('backfills_progresso')
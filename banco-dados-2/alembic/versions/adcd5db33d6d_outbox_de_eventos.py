@@ -0,0 +1,45 @@
+"""Outbox de eventos e offsets dos consumidores
+
+Revision ID: adcd5db33d6d
+Revises: 98d55070aab5
+Create Date: 2026-10-19 16:05:19.772340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'adcd5db33d6d'
+down_revision = '98d55070aab5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_eventos',
+    sa.Column('id_evento', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('id_transacao', sa.BigInteger(), nullable=False),
+    sa.Column('entidade', sa.String(length=30), nullable=False),
+    sa.Column('id_entidade', sa.Integer(), nullable=False),
+    sa.Column('operacao', sa.String(length=10), nullable=False),
+    sa.Column('id_manga', sa.Integer(), nullable=True),
+    sa.Column('id_leitor', sa.Integer(), nullable=True),
+    sa.Column('dados', sa.JSON(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id_evento')
+    )
+    op.create_index('ix_outbox_eventos_transacao_evento', 'outbox_eventos', ['id_transacao', 'id_evento'], unique=False)
+    op.create_table('outbox_offsets',
+    sa.Column('consumidor', sa.String(length=100), nullable=False),
+    sa.Column('id_transacao', sa.BigInteger(), nullable=False),
+    sa.Column('id_evento', sa.BigInteger(), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('consumidor')
+    )
+
+
+def downgrade():
+    op.drop_table('outbox_offsets')
+    op.drop_index('ix_outbox_eventos_transacao_evento', table_name='outbox_eventos')
+    op.drop_table('outbox_eventos')
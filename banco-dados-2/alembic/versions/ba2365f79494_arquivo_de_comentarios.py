@@ -0,0 +1,43 @@
+"""Arquivo de comentários
+
+Revision ID: ba2365f79494
+Revises: e78ca723f449
+Create Date: 2026-10-19 14:02:51.094317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ba2365f79494'
+down_revision = 'e78ca723f449'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('comentarios_arquivo',
+    sa.Column('id_comentario', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('texto_comentario', sa.String(length=1000), nullable=False),
+    sa.Column('numero_curtidas', sa.Integer(), nullable=True),
+    sa.Column('data_criacao', sa.DateTime(), nullable=False),
+    sa.Column('arquivado_em', sa.DateTime(), nullable=False),
+    sa.Column('id_leitor', sa.Integer(), nullable=False),
+    sa.Column('id_manga', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_leitor'], ['leitores.id_usuario'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['id_manga'], ['mangas.id_manga'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_comentario')
+    )
+    op.create_index('ix_comentarios_arquivo_manga_data_id', 'comentarios_arquivo', ['id_manga', 'data_criacao', 'id_comentario'], unique=False)
+
+
+def downgrade():
+    # Devolve os comentários arquivados para a tabela principal
+    op.execute(
+        'INSERT INTO comentarios (id_comentario, texto_comentario, numero_curtidas, data_criacao, id_leitor, id_manga) '
+        'SELECT id_comentario, texto_comentario, numero_curtidas, data_criacao, id_leitor, id_manga '
+        'FROM comentarios_arquivo'
+    )
+    op.drop_index('ix_comentarios_arquivo_manga_data_id', table_name='comentarios_arquivo')
+    op.drop_table('comentarios_arquivo')
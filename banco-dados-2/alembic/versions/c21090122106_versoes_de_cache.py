@@ -0,0 +1,30 @@
+"""Versões de chaves de cache (barramento de invalidação sem NOTIFY)
+
+Revision ID: c21090122106
+Revises: adcd5db33d6d
+Create Date: 2026-10-19 16:40:02.117954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c21090122106'
+down_revision = 'adcd5db33d6d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('versoes_cache',
+    sa.Column('chave', sa.String(length=255), nullable=False),
+    sa.Column('versao', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('chave')
+    )
+    op.create_index('ix_versoes_cache_versao', 'versoes_cache', ['versao'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_versoes_cache_versao', table_name='versoes_cache')
+    op.drop_table('versoes_cache')
@@ -0,0 +1,40 @@
+"""Índice único de capítulos por mangá
+
+Um numero_capitulo por mangá: base da navegação entre capítulos e do
+"continuar lendo". Criado com CREATE UNIQUE INDEX CONCURRENTLY
+(migracao_online); números repetidos precisam ser corrigidos antes, e a
+migration para listando-os em vez de deixar um índice INVALID para trás
+
+Revision ID: cb7272b6b599
+Revises: 8779a32dd35f
+Create Date: 2026-10-19 13:11:37.137145
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migracao_online import criar_indice, remover_indice
+
+
+# revision identifiers, used by Alembic.
+revision = 'cb7272b6b599'
+down_revision = '8779a32dd35f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    repetidos = op.get_bind().execute(sa.text(
+        "SELECT id_manga, numero_capitulo, COUNT(*) FROM capitulos "
+        "GROUP BY id_manga, numero_capitulo HAVING COUNT(*) > 1 "
+        "ORDER BY id_manga, numero_capitulo LIMIT 20"
+    )).all()
+    if repetidos:
+        lista = ", ".join(f"mangá {m} cap. {n} ({total}x)" for m, n, total in repetidos)
+        raise RuntimeError(f"Capítulos com número repetido no mesmo mangá: {lista}")
+
+    criar_indice('ux_capitulos_id_manga_numero', 'capitulos', ['id_manga', 'numero_capitulo'], unique=True)
+
+
+def downgrade():
+    remover_indice('ux_capitulos_id_manga_numero', 'capitulos')
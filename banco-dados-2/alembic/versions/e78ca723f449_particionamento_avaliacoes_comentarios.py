@@ -0,0 +1,175 @@
+"""Particionamento de avaliacoes e comentarios
+
+avaliacoes passa a ser particionada por HASH(id_manga). comentarios usa
+HASH(id_manga) ou RANGE(data_criacao) mensal conforme
+PARTICIONAMENTO_COMENTARIOS. A chave de partição entra na chave primária
+(exigência do PostgreSQL); as sequências dos ids são preservadas.
+Em outros bancos apenas os índices são criados
+
+Revision ID: e78ca723f449
+Revises: 1b36b070b824
+Create Date: 2026-10-19 13:31:07.518240
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+from particionamento import (
+    ESTRATEGIAS, ESTRATEGIA_COMENTARIOS, PARTICOES_HASH, MESES_FUTUROS,
+    criar_particoes_hash, criar_particoes_mensais, criar_particao_padrao,
+    estrategia, somar_meses, inicio_mes,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = 'e78ca723f449'
+down_revision = '1b36b070b824'
+branch_labels = None
+depends_on = None
+
+
+INDICES = {
+    'avaliacoes': [
+        ('ix_avaliacoes_id_manga', ['id_manga']),
+        ('ix_avaliacoes_id_leitor', ['id_leitor']),
+    ],
+    'comentarios': [
+        ('ix_comentarios_id_manga_data_criacao', ['id_manga', 'data_criacao']),
+        ('ix_comentarios_id_leitor', ['id_leitor']),
+    ],
+}
+
+
+def _colunas_avaliacoes():
+    return [
+        sa.Column('id_avaliacao', sa.Integer(), nullable=False, autoincrement=False,
+                  server_default=sa.text("nextval('avaliacoes_id_avaliacao_seq'::regclass)")),
+        sa.Column('nota', sa.Float(), nullable=False),
+        sa.Column('id_leitor', sa.Integer(), nullable=False),
+        sa.Column('id_manga', sa.Integer(), nullable=False),
+        sa.CheckConstraint('nota >= 0.0 AND nota <= 5.0', name='check_nota_range'),
+        sa.ForeignKeyConstraint(['id_leitor'], ['leitores.id_usuario'], name='avaliacoes_id_leitor_fkey'),
+        sa.ForeignKeyConstraint(['id_manga'], ['mangas.id_manga'], name='avaliacoes_id_manga_fkey'),
+    ]
+
+
+def _colunas_comentarios():
+    return [
+        sa.Column('id_comentario', sa.Integer(), nullable=False, autoincrement=False,
+                  server_default=sa.text("nextval('comentarios_id_comentario_seq'::regclass)")),
+        sa.Column('texto_comentario', sa.String(length=1000), nullable=False),
+        sa.Column('numero_curtidas', sa.Integer(), nullable=True),
+        sa.Column('data_criacao', sa.DateTime(), nullable=False),
+        sa.Column('id_leitor', sa.Integer(), nullable=False),
+        sa.Column('id_manga', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['id_leitor'], ['leitores.id_usuario'], name='comentarios_id_leitor_fkey'),
+        sa.ForeignKeyConstraint(['id_manga'], ['mangas.id_manga'], name='comentarios_id_manga_fkey'),
+    ]
+
+
+def _recriar(tabela, id_coluna, colunas, chave_primaria, criar_particoes=None,
+             particionar_por=None, criar_indices=True):
+    """
+    Recria a tabela com outra estrutura copiando os dados
+    A tabela antiga é renomeada, a nova assume a sequência do id
+    """
+    antiga = f'{tabela}_antiga'
+    op.rename_table(tabela, antiga)
+    # Nome do índice da PK é único no schema: libera para a nova tabela
+    op.execute(f'ALTER TABLE {antiga} RENAME CONSTRAINT {tabela}_pkey TO {antiga}_pkey')
+    for nome, _ in INDICES[tabela]:
+        op.execute(f'DROP INDEX IF EXISTS {nome}')
+
+    kwargs = {'postgresql_partition_by': particionar_por} if particionar_por else {}
+    op.create_table(
+        tabela,
+        *colunas,
+        sa.PrimaryKeyConstraint(*chave_primaria, name=f'{tabela}_pkey'),
+        **kwargs
+    )
+    if criar_particoes:
+        criar_particoes(antiga)
+
+    nomes = ', '.join(c.name for c in colunas if isinstance(c, sa.Column))
+    op.execute(f'INSERT INTO {tabela} ({nomes}) SELECT {nomes} FROM {antiga}')
+    op.execute(f'ALTER SEQUENCE {tabela}_{id_coluna}_seq OWNED BY {tabela}.{id_coluna}')
+    op.drop_table(antiga)
+
+    if criar_indices:
+        for nome, colunas_indice in INDICES[tabela]:
+            op.create_index(nome, tabela, colunas_indice, unique=False)
+
+
+def _particoes_mensais_comentarios(antiga):
+    conexao = op.get_bind()
+    primeira = conexao.execute(sa.text(f'SELECT min(data_criacao) FROM {antiga}')).scalar()
+    hoje = date.today()
+    criar_particoes_mensais(
+        conexao, 'comentarios', primeira or hoje, somar_meses(inicio_mes(hoje), MESES_FUTUROS)
+    )
+    criar_particao_padrao(conexao, 'comentarios')
+
+
+def _criar_indices():
+    for tabela, indices in INDICES.items():
+        for nome, colunas in indices:
+            op.create_index(nome, tabela, colunas, unique=False)
+
+
+def _remover_indices():
+    for tabela, indices in INDICES.items():
+        for nome, _ in indices:
+            op.drop_index(nome, table_name=tabela)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # Particionamento declarativo só existe no PostgreSQL
+        _criar_indices()
+        return
+
+    if ESTRATEGIA_COMENTARIOS not in ESTRATEGIAS:
+        raise ValueError(
+            f"PARTICIONAMENTO_COMENTARIOS inválido: {ESTRATEGIA_COMENTARIOS} "
+            f"(use {' ou '.join(ESTRATEGIAS)})"
+        )
+
+    _recriar(
+        'avaliacoes', 'id_avaliacao', _colunas_avaliacoes(),
+        chave_primaria=['id_avaliacao', 'id_manga'],
+        criar_particoes=lambda _: criar_particoes_hash(op.get_bind(), 'avaliacoes', PARTICOES_HASH),
+        particionar_por='HASH (id_manga)',
+    )
+
+    if ESTRATEGIA_COMENTARIOS == 'hash':
+        _recriar(
+            'comentarios', 'id_comentario', _colunas_comentarios(),
+            chave_primaria=['id_comentario', 'id_manga'],
+            criar_particoes=lambda _: criar_particoes_hash(op.get_bind(), 'comentarios', PARTICOES_HASH),
+            particionar_por='HASH (id_manga)',
+        )
+    else:
+        _recriar(
+            'comentarios', 'id_comentario', _colunas_comentarios(),
+            chave_primaria=['id_comentario', 'data_criacao'],
+            criar_particoes=_particoes_mensais_comentarios,
+            particionar_por='RANGE (data_criacao)',
+        )
+
+
+def downgrade():
+    conexao = op.get_bind()
+    if conexao.dialect.name != 'postgresql':
+        _remover_indices()
+        return
+
+    for tabela, id_coluna, colunas in (
+        ('comentarios', 'id_comentario', _colunas_comentarios()),
+        ('avaliacoes', 'id_avaliacao', _colunas_avaliacoes()),
+    ):
+        if estrategia(conexao, tabela) is None:
+            continue
+        # Os índices não existiam antes desta revisão
+        _recriar(tabela, id_coluna, colunas, chave_primaria=[id_coluna], criar_indices=False)
@@ -0,0 +1,81 @@
+"""Datas das avaliações e agregados diários
+
+avaliacoes ganha criado_em/atualizado_em. No PostgreSQL as colunas entram
+com DEFAULT now() (sem reescrever a tabela, o valor é calculado uma vez)
+e o default é removido em seguida: avaliações anteriores ficam com a data
+da migração. avaliacoes_diarias é preenchida aqui, com SQL escrito para o
+schema desta revisão (o código atual dos modelos pode não corresponder a ele)
+
+Revision ID: eff84c9dd82c
+Revises: c21090122106
+Create Date: 2026-10-19 17:12:40.503318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migracao_online import executar
+
+
+# revision identifiers, used by Alembic.
+revision = 'eff84c9dd82c'
+down_revision = 'c21090122106'
+branch_labels = None
+depends_on = None
+
+
+COLUNAS = ('criado_em', 'atualizado_em')
+
+# Faixa n do histograma: nota em [n, n + 1), a última inclui 5.0
+_FAIXAS = [f'nota >= {n} AND nota < {n + 1}' for n in range(5)] + ['nota >= 5']
+
+PREENCHER_AGREGADOS = (
+    'INSERT INTO avaliacoes_diarias (id_manga, dia, total, soma_notas, '
+    + ', '.join(f'notas_{n}' for n in range(6)) + ') '
+    'SELECT id_manga, date(criado_em), count(*), sum(nota), '
+    + ', '.join(f'sum(CASE WHEN {faixa} THEN 1 ELSE 0 END)' for faixa in _FAIXAS)
+    + ' FROM avaliacoes GROUP BY id_manga, date(criado_em)'
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        executar('ALTER TABLE avaliacoes '
+                 + ', '.join(f'ADD COLUMN {c} TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()' for c in COLUNAS))
+        executar('ALTER TABLE avaliacoes ' + ', '.join(f'ALTER COLUMN {c} DROP DEFAULT' for c in COLUNAS))
+    else:
+        # O SQLite só aceita default constante no ADD COLUMN: recria a tabela
+        with op.batch_alter_table('avaliacoes', recreate='always') as batch_op:
+            for coluna in COLUNAS:
+                batch_op.add_column(sa.Column(coluna, sa.DateTime(), nullable=False,
+                                              server_default=sa.func.current_timestamp()))
+        with op.batch_alter_table('avaliacoes', recreate='always') as batch_op:
+            for coluna in COLUNAS:
+                batch_op.alter_column(coluna, server_default=None)
+
+    op.create_table('avaliacoes_diarias',
+    sa.Column('id_manga', sa.Integer(), nullable=False),
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('soma_notas', sa.Float(), nullable=False),
+    sa.Column('notas_0', sa.Integer(), nullable=False),
+    sa.Column('notas_1', sa.Integer(), nullable=False),
+    sa.Column('notas_2', sa.Integer(), nullable=False),
+    sa.Column('notas_3', sa.Integer(), nullable=False),
+    sa.Column('notas_4', sa.Integer(), nullable=False),
+    sa.Column('notas_5', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_manga'], ['mangas.id_manga'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_manga', 'dia')
+    )
+
+    op.execute(PREENCHER_AGREGADOS)
+
+
+def downgrade():
+    op.drop_table('avaliacoes_diarias')
+    if op.get_bind().dialect.name == 'postgresql':
+        executar('ALTER TABLE avaliacoes ' + ', '.join(f'DROP COLUMN {c}' for c in COLUNAS))
+    else:
+        with op.batch_alter_table('avaliacoes') as batch_op:
+            for coluna in COLUNAS:
+                batch_op.drop_column(coluna)
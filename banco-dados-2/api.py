@@ -0,0 +1,229 @@
+"""
+API HTTP de leitura (FastAPI)
+Catálogo, detalhe, capítulos, comentários, rankings e mangás em alta
+(tendencias) sobre sessões do pool (database.get_db), com paginação por
+keyset e itens lidos como DTOs (leitura_dto), sem objetos ORM. Cada
+resposta JSON é serializada uma vez e guardada em cache junto com o ETag
+(hash do corpo): If-None-Match igual ao ETag responde 304 sem tocar no
+banco.
+
+Respostas de um mangá usam a chave do detalhe (manga:{id}) e são
+invalidadas junto com ele, inclusive nos outros processos
+(barramento_invalidacao); listas e rankings expiram em API_TTL_LISTAS.
+
+    uv sync --extra api
+    uv run api --workers 4
+"""
+import argparse
+import hashlib
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from database import get_db, engine
+from models import Manga
+from cache import obter_cache, AUSENTE
+from paginacao import codificar_cursor, decodificar_cursor, ORDENACOES
+from dados_referencia import resolver_status
+from detalhe_manga import obter_detalhe_manga, chave_manga
+from leitura_dto import (
+    listar_catalogo, listar_capitulos, listar_comentarios, listar_ranking, para_json, RANKINGS
+)
+from barramento_invalidacao import iniciar_barramento, parar_barramento
+from tendencias import em_alta, iniciar_tendencias, parar_tendencias, JANELAS
+
+
+TAMANHO_CACHE = int(os.getenv("API_CACHE_TAMANHO", 4096))
+TTL_MANGA = float(os.getenv("API_TTL_MANGA", 3600))  # invalidado por chave
+TTL_LISTAS = float(os.getenv("API_TTL_LISTAS", 10))
+
+# Desligado quando o ranking em alta é atualizado por outro processo (tendencias.py --acompanhar)
+ATUALIZAR_TENDENCIAS = os.getenv("API_ATUALIZAR_TENDENCIAS", "1") != "0"
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 100
+
+# Um cache por recurso: a mesma chave manga:{id} invalida todos
+cache_detalhe = obter_cache("api_detalhe", TAMANHO_CACHE, TTL_MANGA)
+cache_capitulos = obter_cache("api_capitulos", TAMANHO_CACHE, TTL_MANGA)
+cache_comentarios = obter_cache("api_comentarios", TAMANHO_CACHE, TTL_MANGA)
+cache_listas = obter_cache("api_listas", TAMANHO_CACHE, TTL_LISTAS)
+
+@dataclass(frozen=True)
+class RespostaCacheada:
+    """Corpo JSON já serializado e seu ETag"""
+    corpo: bytes
+    etag: str
+
+
+def serializar(dados) -> RespostaCacheada:
+    """Serializa uma vez; o ETag é o hash do corpo"""
+    corpo = para_json(dados)
+    return RespostaCacheada(corpo, f'"{hashlib.blake2b(corpo, digest_size=12).hexdigest()}"')
+
+
+def _em_cache(cache, chave, construir) -> RespostaCacheada:
+    resposta = cache.obter(chave)
+    if resposta is AUSENTE:
+        dados = construir()
+        if dados is None:
+            raise HTTPException(status_code=404, detail="Não encontrado")
+        resposta = serializar(dados)
+        cache.definir(chave, resposta)
+    return resposta
+
+
+def _etag_confere(request: Request, etag: str) -> bool:
+    cabecalho = request.headers.get("if-none-match")
+    if not cabecalho:
+        return False
+    candidatos = {c.strip().removeprefix("W/") for c in cabecalho.split(",")}
+    return "*" in candidatos or etag in candidatos
+
+
+def responder(request: Request, resposta: RespostaCacheada) -> Response:
+    """200 com o corpo ou 304 quando o cliente já tem esta versão"""
+    # no-cache: o cliente guarda, mas revalida sempre pelo ETag
+    cabecalhos = {"ETag": resposta.etag, "Cache-Control": "no-cache"}
+    if _etag_confere(request, resposta.etag):
+        return Response(status_code=304, headers=cabecalhos)
+    return Response(resposta.corpo, media_type="application/json", headers=cabecalhos)
+
+
+@asynccontextmanager
+async def _ciclo_de_vida(app: FastAPI):
+    engine.echo = False
+    iniciar_barramento()
+    if ATUALIZAR_TENDENCIAS:
+        iniciar_tendencias()
+    yield
+    parar_tendencias()
+    parar_barramento()
+
+
+app = FastAPI(title="Mangás - API de leitura", lifespan=_ciclo_de_vida)
+
+
+@app.get("/saude")
+def saude():
+    """Verificação de vida (sem banco), também usada como base no teste de carga"""
+    return Response(b'{"ok":true}', media_type="application/json")
+
+
+@app.get("/mangas")
+def listar_mangas(request: Request,
+                  ordenacao: str = Query("titulo", enum=list(ORDENACOES)),
+                  status: Optional[str] = None,
+                  limite: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+                  cursor: Optional[str] = None,
+                  db: Session = Depends(get_db)):
+    """Catálogo paginado por cursor (proximo_cursor da página anterior)"""
+    def construir():
+        try:
+            filtro = resolver_status(status) if status else None
+            apos = decodificar_cursor(cursor, ordenacao) if cursor else None
+            pagina = listar_catalogo(db, ordenacao, filtro, limite, apos)
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {
+            "itens": pagina.itens,
+            "proximo_cursor": codificar_cursor(pagina.proximo_cursor) if pagina.proximo_cursor else None,
+        }
+
+    chave = f"catalogo:{ordenacao}:{status}:{limite}:{cursor}"
+    return responder(request, _em_cache(cache_listas, chave, construir))
+
+
+@app.get("/mangas/{id_manga}")
+def detalhe(request: Request, id_manga: int, db: Session = Depends(get_db)):
+    """Detalhe do mangá (gêneros, capítulos, avaliações, comentários em destaque)"""
+    return responder(request, _em_cache(
+        cache_detalhe, chave_manga(id_manga), lambda: obter_detalhe_manga(db, id_manga)
+    ))
+
+
+@app.get("/mangas/{id_manga}/capitulos")
+def capitulos(request: Request, id_manga: int, db: Session = Depends(get_db)):
+    """Capítulos do mangá em ordem"""
+    def construir():
+        # Só os capítulos (CapituloResumo), sem montar o detalhe inteiro
+        capitulos = listar_capitulos(db, id_manga)
+        if not capitulos and db.get(Manga, id_manga) is None:
+            return None
+        return {"id_manga": id_manga, "capitulos": capitulos}
+
+    return responder(request, _em_cache(cache_capitulos, chave_manga(id_manga), construir))
+
+
+@app.get("/mangas/{id_manga}/comentarios")
+def comentarios(request: Request, id_manga: int,
+                limite: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+                cursor: Optional[str] = None,
+                db: Session = Depends(get_db)):
+    """Comentários do mais recente ao mais antigo, por cursor"""
+    def construir():
+        try:
+            apos = decodificar_cursor(cursor, "data_criacao") if cursor else None
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        pagina = listar_comentarios(db, id_manga, limite, apos)
+        return {
+            "itens": pagina.itens,
+            "proximo_cursor": codificar_cursor(pagina.proximo_cursor) if pagina.proximo_cursor else None,
+        }
+
+    # Só a primeira página padrão (a mais acessada) fica em cache
+    if cursor is None and limite == LIMITE_PADRAO:
+        return responder(request, _em_cache(cache_comentarios, chave_manga(id_manga), construir))
+    return responder(request, serializar(construir()))
+
+
+@app.get("/rankings/{nome}")
+def ranking(request: Request, nome: str,
+            limite: int = Query(10, ge=1, le=LIMITE_MAXIMO),
+            db: Session = Depends(get_db)):
+    """Rankings de mangás (ver leitura_dto.RANKINGS)"""
+    if nome not in RANKINGS:
+        raise HTTPException(status_code=404, detail=f"Ranking desconhecido. Use {', '.join(RANKINGS)}")
+
+    return responder(request, _em_cache(
+        cache_listas, f"ranking:{nome}:{limite}",
+        lambda: {"ranking": nome, "itens": listar_ranking(db, nome, limite)},
+    ))
+
+
+@app.get("/tendencias/{janela}")
+def tendencias(request: Request, janela: str,
+               genero: Optional[int] = None,
+               limite: int = Query(10, ge=1, le=LIMITE_MAXIMO),
+               db: Session = Depends(get_db)):
+    """Mangás em alta na janela (1h, 24h, 7d), global ou por id de gênero"""
+    if janela not in JANELAS:
+        raise HTTPException(status_code=404, detail=f"Janela desconhecida. Use {', '.join(JANELAS)}")
+
+    return responder(request, _em_cache(
+        cache_listas, f"tendencias:{janela}:{genero}:{limite}",
+        lambda: {"janela": janela, "itens": em_alta(db, janela, genero, limite)},
+    ))
+
+
+def main():
+    """Sobe a API com uvicorn"""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API HTTP de leitura")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "127.0.0.1"))
+    parser.add_argument("--porta", type=int, default=int(os.getenv("API_PORTA", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", 1)))
+    args = parser.parse_args()
+
+    uvicorn.run("api:app", host=args.host, port=args.porta, workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
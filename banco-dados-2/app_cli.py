@@ -13,12 +13,30 @@ from models import (
     Status
 )
 from sqlalchemy import func, desc
+from paginacao import listar_mangas_pagina, contar_mangas
+from detalhe_manga import obter_detalhe_manga, aquecer_cache
+import biblioteca  # noqa: F401 (invalida as bibliotecas em cache ao ler/criar capítulos)
+from cache import caches_registrados
+from barramento_invalidacao import iniciar_barramento, parar_barramento
+from dados_referencia import catalogo_generos
+from progresso_paginas import paginas_lidas
+from leitura_dto import listar_capitulos
+
+# Mangás exibidos por página na listagem
+TAMANHO_PAGINA = 20
+
+# Mangás mais lidos pré-carregados no cache ao iniciar
+CACHE_AQUECER_TOP_N = int(os.getenv("CACHE_AQUECER_TOP_N", 10))
 
 
 class MangaApp:
     def __init__(self):
         self.session = get_session()
         self.usuario_logado = None
+        # Invalidações de outros processos (API, outros terminais) chegam aos
+        # caches deste; iniciado antes do aquecimento para não perder nenhuma
+        iniciar_barramento()
+        aquecer_cache(self.session, CACHE_AQUECER_TOP_N)
     
     def limpar_tela(self):
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -68,6 +86,7 @@ class MangaApp:
             elif escolha == "0":
                 print("\n👋 Até logo!")
                 self.session.close()
+                parar_barramento()
                 break
     
     # ==================== CRUD MANGÁS ====================
@@ -83,6 +102,7 @@ class MangaApp:
             print("3. Atualizar Mangá")
             print("4. Excluir Mangá")
             print("5. Ver Detalhes do Mangá")
+            print("6. Estatísticas do Cache")
             print("0. Voltar")
             
             escolha = input("\nEscolha uma opção: ")
@@ -97,25 +117,63 @@ class MangaApp:
                 self.excluir_manga()
             elif escolha == "5":
                 self.ver_detalhes_manga()
+            elif escolha == "6":
+                self.estatisticas_cache()
             elif escolha == "0":
                 break
     
     def listar_mangas(self):
         print("\n LISTA DE MANGÁS\n")
-        print("-" * 80)
         
-        mangas = self.session.query(Manga).all()
-        
-        if not mangas:
-            print("Nenhum mangá cadastrado.")
+        print("Filtrar por status:")
+        print("1. Em Andamento")
+        print("2. Concluído")
+        print("3. Pausado")
+        print("Enter. Todos")
+        status_map = {
+            "1": Status.EM_ANDAMENTO,
+            "2": Status.CONCLUIDO,
+            "3": Status.HIATO
+        }
+        status = status_map.get(input("Escolha: "))
+        
+        print("\nOrdenar por:")
+        print("1. Título")
+        print("2. Mais recentes")
+        if input("Escolha: ") == "2":
+            ordenacao, decrescente = "data_criacao", True
         else:
-            print(f"{'ID':<5} {'Título':<30} {'Autor':<20} {'Status':<15}")
-            print("-" * 80)
-            for manga in mangas:
-                print(f"{manga.id_manga:<5} {manga.titulo_manga:<30} {manga.autor:<20} {manga.status.value:<15}")
+            ordenacao, decrescente = "titulo", False
         
-        print(f"\nTotal: {len(mangas)} mangás")
-        self.pausar()
+        total, estimado = contar_mangas(self.session, status)
+        cursores = [None]  # Cursor de início de cada página visitada
+        
+        while True:
+            self.limpar_tela()
+            pagina = listar_mangas_pagina(
+                self.session, ordenacao, status, TAMANHO_PAGINA, cursores[-1], decrescente
+            )
+            
+            print("\n LISTA DE MANGÁS\n")
+            print("-" * 80)
+            
+            if not pagina.itens:
+                print("Nenhum mangá cadastrado.")
+            else:
+                print(f"{'ID':<5} {'Título':<30} {'Autor':<20} {'Status':<15}")
+                print("-" * 80)
+                for manga in pagina.itens:
+                    print(f"{manga.id_manga:<5} {manga.titulo_manga:<30} {manga.autor:<20} {manga.status.value:<15}")
+            
+            print(f"\nPágina {len(cursores)} | Total: {'~' if estimado else ''}{total} mangás")
+            
+            escolha = input("\n[P]róxima, [A]nterior, Enter para voltar: ").strip().lower()
+            if escolha == "p" and pagina.proximo_cursor:
+                cursores.append(pagina.proximo_cursor)
+            elif escolha == "a" and len(cursores) > 1:
+                cursores.pop()
+            elif escolha == "":
+                break
     
     def criar_manga(self):
         print("\n CRIAR NOVO MANGÁ\n")
@@ -151,11 +209,11 @@ class MangaApp:
             self.session.add(manga)
             self.session.flush()  # Para obter o ID
             
-            # Adicionar gêneros
+            # Adicionar gêneros (lista vem do cache de referência)
             print("\nGêneros disponíveis:")
-            generos = self.session.query(Genero).all()
-            for i, g in enumerate(generos, 1):
-                print(f"{i}. {g.tipo_genero}")
+            generos = catalogo_generos(self.session).generos
+            for i, (_, nome_genero) in enumerate(generos, 1):
+                print(f"{i}. {nome_genero}")
             
             generos_escolhidos = input("\nEscolha os gêneros (separados por vírgula): ").split(",")
             principal_idx = input("Qual é o principal? (número): ")
@@ -163,10 +221,10 @@ class MangaApp:
             for idx in generos_escolhidos:
                 idx = idx.strip()
                 if idx.isdigit() and 1 <= int(idx) <= len(generos):
-                    genero = generos[int(idx) - 1]
+                    id_genero, _ = generos[int(idx) - 1]
                     manga_genero = MangaGenero(
                         id_manga=manga.id_manga,
-                        id_genero=genero.id_genero,
+                        id_genero=id_genero,
                         principal=(idx == principal_idx)
                     )
                     self.session.add(manga_genero)
@@ -225,7 +283,7 @@ class MangaApp:
             elif status_escolha == "2":
                 manga.status = Status.CONCLUIDO
             elif status_escolha == "3":
-                manga.status = Status.PAUSADO
+                manga.status = Status.HIATO
             
             self.session.commit()
             print(f"\n Mangá atualizado com sucesso!")
@@ -278,7 +336,7 @@ class MangaApp:
         
         try:
             manga_id = int(input("ID do mangá: "))
-            manga = self.session.query(Manga).get(manga_id)
+            manga = obter_detalhe_manga(self.session, manga_id)
             
             if not manga:
                 print("❌ Mangá não encontrado!")
@@ -293,8 +351,8 @@ class MangaApp:
             print(f"Data de Criação: {manga.data_criacao.strftime('%d/%m/%Y %H:%M')}")
             
             # Gêneros
-            generos = [f"{mg.genero.tipo_genero}" + (" ⭐Principal" if mg.principal else "") 
-                      for mg in manga.manga_generos]
+            generos = [f"{g.tipo_genero}" + (" ⭐Principal" if g.principal else "") 
+                      for g in manga.generos]
             print(f"Gêneros: {', '.join(generos) if generos else 'Nenhum'}")
             
             # Capítulos
@@ -303,16 +361,15 @@ class MangaApp:
                 print(f"   {cap.numero_capitulo}. {cap.titulo_capitulo} ({cap.numero_paginas} páginas)")
             
             # Avaliações
-            if manga.avaliacoes:
-                media = sum(av.nota for av in manga.avaliacoes) / len(manga.avaliacoes)
-                print(f"\n Avaliações: {len(manga.avaliacoes)} (Média: {media:.2f})")
+            if manga.total_avaliacoes:
+                print(f"\n Avaliações: {manga.total_avaliacoes} (Média: {manga.media_avaliacoes:.2f})")
             else:
                 print("\n Sem avaliações")
             
             # Comentários
-            print(f"\n Comentários: {len(manga.comentarios)}")
-            for com in manga.comentarios[:3]:
-                print(f"   - {com.leitor.codinome}: {com.texto_comentario[:50]}...")
+            print(f"\n Comentários: {manga.total_comentarios}")
+            for com in manga.comentarios_destaque:
+                print(f"   - {com.codinome}: {com.texto_comentario[:50]}...")
             
         except ValueError:
             print(" ID inválido!")
@@ -321,6 +378,18 @@ class MangaApp:
         
         self.pausar()
     
+    def estatisticas_cache(self):
+        print("\n ESTATÍSTICAS DO CACHE\n")
+        print(f"{'Cache':<20} {'Entradas':>10} {'Acertos':>10} {'Falhas':>10} {'Expulsões':>10} {'Invalidações':>13} {'Taxa':>8}")
+        print("-" * 90)
+        
+        for nome, backend in caches_registrados().items():
+            est = backend.estatisticas
+            print(f"{nome:<20} {len(backend):>10} {est.acertos:>10} {est.falhas:>10} "
+                  f"{est.expulsoes:>10} {est.invalidacoes:>13} {est.taxa_acerto:>7.1f}%")
+        
+        self.pausar()
+    
     # ==================== CRUD CAPÍTULOS ====================
     
     def menu_capitulos(self):
@@ -364,10 +433,18 @@ class MangaApp:
             print(f"{'Nº':<5} {'Título':<40} {'Páginas':<10} {'Lidas':<10}")
             print("-" * 70)
             
-            for cap in manga.capitulos:
-                print(f"{cap.numero_capitulo:<5} {cap.titulo_capitulo:<40} {cap.numero_paginas:<10} {cap.paginas_lidas:<10}")
+            capitulos = listar_capitulos(self.session, manga_id)
+            
+            # Páginas lidas pelo leitor logado, em uma consulta
+            lidas = {}
+            if isinstance(self.usuario_logado, Leitor):
+                lidas = paginas_lidas(self.session, self.usuario_logado.id_usuario,
+                                      [cap.id_capitulo for cap in capitulos])
+            
+            for cap in capitulos:
+                print(f"{cap.numero_capitulo:<5} {cap.titulo_capitulo:<40} {cap.numero_paginas:<10} {lidas.get(cap.id_capitulo, '-'):<10}")
             
-            print(f"\nTotal: {len(manga.capitulos)} capítulos")
+            print(f"\nTotal: {len(capitulos)} capítulos")
             
         except ValueError:
             print(" ID inválido!")
@@ -435,7 +512,7 @@ class MangaApp:
                 return
             
             # Usar o método concluir()
-            capitulo.concluir()
+            capitulo.concluir(self.usuario_logado.id_usuario, self.session)
             
             # Atualizar progresso do leitor
             leitor_manga = self.session.query(LeitorManga).filter_by(
@@ -453,6 +530,7 @@ class MangaApp:
             
             # Calcular progresso
             total_caps = len(capitulo.manga.capitulos)
+            leitor_manga.marcar_lidos(capitulo.numero_capitulo, capitulo.numero_capitulo)
             leitor_manga.ultimo_capitulo_lido = capitulo.numero_capitulo
             leitor_manga.progresso_leitura = (capitulo.numero_capitulo / total_caps) * 100
             
@@ -533,16 +611,19 @@ class MangaApp:
     def listar_generos(self):
         print("\n LISTA DE GÊNEROS\n")
         
-        generos = self.session.query(
-            Genero,
-            func.count(MangaGenero.id_manga).label('total_mangas')
-        ).outerjoin(MangaGenero).group_by(Genero.id_genero).all()
+        # Nomes vêm do cache de referência; só a contagem vai ao banco
+        generos = catalogo_generos(self.session).generos
+        totais = dict(
+            self.session.query(MangaGenero.id_genero, func.count(MangaGenero.id_manga))
+            .group_by(MangaGenero.id_genero)
+            .all()
+        )
         
         print(f"{'ID':<5} {'Gênero':<25} {'Total Mangás':<15}")
         print("-" * 50)
         
-        for genero, total in generos:
-            print(f"{genero.id_genero:<5} {genero.tipo_genero:<25} {total:<15}")
+        for id_genero, nome_genero in generos:
+            print(f"{id_genero:<5} {nome_genero:<25} {totais.get(id_genero, 0):<15}")
         
         print(f"\nTotal: {len(generos)} gêneros")
         self.pausar()
@@ -0,0 +1,241 @@
+"""
+Arquivamento de comentários antigos
+Comentários com mais de ARQUIVAMENTO_IDADE_DIAS dias saem de `comentarios`
+para `comentarios_arquivo`, exceto os ARQUIVAMENTO_MANTER_TOP mais curtidos
+de cada mangá. O job percorre os mangás em ordem de id e move lotes
+pequenos, cada um em sua própria transação (INSERT ... SELECT + DELETE):
+interrompido, basta rodar de novo (ou continuar a partir do último mangá).
+
+A leitura do feed consulta o arquivo apenas quando a página alcança a data
+do comentário arquivado mais recente do mangá
+"""
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, insert, delete, func, tuple_, literal
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import Manga, Comentario, ComentarioArquivado, Leitor
+from cache import marcar_para_invalidacao
+from detalhe_manga import chave_manga
+
+
+IDADE_DIAS = int(os.getenv("ARQUIVAMENTO_IDADE_DIAS", 180))
+MANTER_TOP = int(os.getenv("ARQUIVAMENTO_MANTER_TOP", 10))
+TAMANHO_LOTE = int(os.getenv("ARQUIVAMENTO_LOTE", 1000))
+
+# Mangás lidos por vez ao percorrer o catálogo
+_LOTE_MANGAS = 500
+
+_COLUNAS = (
+    "id_comentario", "texto_comentario", "numero_curtidas",
+    "data_criacao", "id_leitor", "id_manga",
+)
+
+
+@dataclass
+class ResultadoArquivamento:
+    """Resumo de uma execução do job"""
+    mangas: int = 0
+    lotes: int = 0
+    arquivados: int = 0
+    ultimo_manga: Optional[int] = None  # para retomar com a_partir_de_manga
+    concluido: bool = False
+    segundos: float = 0.0
+
+
+@dataclass
+class PaginaComentarios:
+    """Uma página do feed de comentários e o cursor para a próxima"""
+    itens: list
+    proximo_cursor: Optional[tuple]  # (data_criacao, id_comentario)
+    consultou_arquivo: bool = False
+
+
+def _ids_para_arquivar(id_manga: int, limite_data: datetime, manter_top: int, tamanho_lote: int):
+    """Próximo lote de ids do mangá: antigos e fora do top de curtidas"""
+    top_curtidos = (
+        select(Comentario.id_comentario)
+        .where(Comentario.id_manga == id_manga)
+        .order_by(func.coalesce(Comentario.numero_curtidas, 0).desc(), Comentario.id_comentario)
+        .limit(manter_top)
+    )
+
+    return (
+        select(Comentario.id_comentario)
+        .where(
+            Comentario.id_manga == id_manga,
+            Comentario.data_criacao < limite_data,
+            Comentario.id_comentario.not_in(top_curtidos),
+        )
+        .order_by(Comentario.id_comentario)
+        .limit(tamanho_lote)
+    )
+
+
+def _mover_lote(session: Session, id_manga: int, ids: list):
+    """Copia o lote para o arquivo e remove da tabela quente"""
+    origem = (
+        select(*(getattr(Comentario, c) for c in _COLUNAS))
+        .where(Comentario.id_manga == id_manga, Comentario.id_comentario.in_(ids))
+    )
+    session.execute(insert(ComentarioArquivado).from_select(_COLUNAS, origem))
+    session.execute(
+        delete(Comentario)
+        .where(Comentario.id_manga == id_manga, Comentario.id_comentario.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    # Total de comentários e destaques do detalhe podem mudar
+    marcar_para_invalidacao(session, [chave_manga(id_manga)])
+
+
+def arquivar_comentarios(idade_dias: int = IDADE_DIAS, manter_top: int = MANTER_TOP,
+                         tamanho_lote: int = TAMANHO_LOTE,
+                         a_partir_de_manga: Optional[int] = None,
+                         max_lotes: Optional[int] = None) -> ResultadoArquivamento:
+    """
+    Move os comentários antigos para comentarios_arquivo
+    `a_partir_de_manga`: retoma a partir deste id de mangá (inclusive)
+    `max_lotes`: encerra após este número de lotes (execuções curtas)
+    """
+    resultado = ResultadoArquivamento()
+    inicio = time.perf_counter()
+    limite_data = datetime.now() - timedelta(days=idade_dias)
+    proximo_id = a_partir_de_manga or 0
+
+    session = SessionLocal()
+    try:
+        while True:
+            ids_manga = session.execute(
+                select(Manga.id_manga)
+                .where(Manga.id_manga >= proximo_id)
+                .order_by(Manga.id_manga)
+                .limit(_LOTE_MANGAS)
+            ).scalars().all()
+            session.rollback()  # não segura a transação entre lotes
+
+            if not ids_manga:
+                resultado.concluido = True
+                break
+
+            for id_manga in ids_manga:
+                resultado.ultimo_manga = id_manga
+                resultado.mangas += 1
+
+                while True:
+                    if max_lotes is not None and resultado.lotes >= max_lotes:
+                        return resultado
+
+                    ids = session.execute(
+                        _ids_para_arquivar(id_manga, limite_data, manter_top, tamanho_lote)
+                    ).scalars().all()
+                    if not ids:
+                        session.rollback()
+                        break
+
+                    _mover_lote(session, id_manga, ids)
+                    session.commit()
+
+                    resultado.lotes += 1
+                    resultado.arquivados += len(ids)
+                    if len(ids) < tamanho_lote:
+                        break
+
+            proximo_id = ids_manga[-1] + 1
+
+        return resultado
+
+    except Exception:
+        session.rollback()
+        raise
+
+    finally:
+        session.close()
+        resultado.segundos = time.perf_counter() - inicio
+
+
+def _consulta_feed(modelo, id_manga: int, apos: Optional[tuple], limite: int):
+    chave = tuple_(modelo.data_criacao, modelo.id_comentario)
+    consulta = (
+        select(
+            modelo.id_comentario,
+            Leitor.codinome,
+            modelo.texto_comentario,
+            modelo.numero_curtidas,
+            modelo.data_criacao,
+        )
+        .join(Leitor, Leitor.id_usuario == modelo.id_leitor)
+        .where(modelo.id_manga == id_manga)
+    )
+    if apos is not None:
+        consulta = consulta.where(chave < tuple_(*(literal(v) for v in apos)))
+
+    return (
+        consulta
+        .order_by(modelo.data_criacao.desc(), modelo.id_comentario.desc())
+        .limit(limite)
+    )
+
+
+def pagina_comentarios(session: Session, id_manga: int, limite: int = 20,
+                       apos: Optional[tuple] = None) -> PaginaComentarios:
+    """
+    Comentários do mangá, do mais recente ao mais antigo, por cursor keyset
+    O arquivo só é lido quando a página chega à data do comentário
+    arquivado mais recente do mangá (ou quando a tabela quente acaba)
+    """
+    # Uma linha a mais para saber se existe próxima página
+    linhas = session.execute(_consulta_feed(Comentario, id_manga, apos, limite + 1)).all()
+
+    fronteira = session.execute(
+        select(func.max(ComentarioArquivado.data_criacao))
+        .where(ComentarioArquivado.id_manga == id_manga)
+    ).scalar()
+
+    consultou_arquivo = False
+    if fronteira is not None and (len(linhas) <= limite or linhas[-1].data_criacao <= fronteira):
+        arquivadas = session.execute(
+            _consulta_feed(ComentarioArquivado, id_manga, apos, limite + 1)
+        ).all()
+        linhas = sorted(
+            linhas + arquivadas,
+            key=lambda linha: (linha.data_criacao, linha.id_comentario),
+            reverse=True,
+        )[:limite + 1]
+        consultou_arquivo = True
+
+    itens = linhas[:limite]
+    proximo_cursor = None
+    if len(linhas) > limite:
+        ultima = itens[-1]
+        proximo_cursor = (ultima.data_criacao, ultima.id_comentario)
+
+    return PaginaComentarios(itens, proximo_cursor, consultou_arquivo)
+
+
+def main():
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Arquiva comentários antigos")
+    parser.add_argument("--idade-dias", type=int, default=IDADE_DIAS)
+    parser.add_argument("--manter-top", type=int, default=MANTER_TOP, help="Mais curtidos mantidos por mangá")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Comentários por transação")
+    parser.add_argument("--a-partir-de", type=int, default=None, help="Id do mangá para retomar")
+    parser.add_argument("--max-lotes", type=int, default=None)
+    args = parser.parse_args()
+
+    resultado = arquivar_comentarios(
+        args.idade_dias, args.manter_top, args.lote, args.a_partir_de, args.max_lotes
+    )
+
+    print(f"✓ {resultado.arquivados} comentário(s) arquivado(s) em {resultado.lotes} lote(s), "
+          f"{resultado.mangas} mangá(s), {resultado.segundos:.2f}s")
+    if not resultado.concluido:
+        print(f"⏸ Interrompido: retome com --a-partir-de {resultado.ultimo_manga}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Backfill em lotes, retomável
+Percorre a tabela em faixas da chave primária (TAMANHO_LOTE linhas por
+lote). Cada lote roda em sua própria transação junto com o checkpoint em
+backfills_progresso: interrompido, o backfill continua do último lote
+confirmado. A vazão é limitada a BACKFILL_LINHAS_POR_SEGUNDO e o runner
+pausa enquanto o atraso de replicação passar de BACKFILL_ATRASO_MAXIMO.
+
+Cada backfill é uma função registrada que atualiza as linhas da faixa
+(expressão booleana sobre a chave) e retorna quantas alterou:
+
+    @registrar_backfill("soma_notas", Manga.id_manga)
+    def backfill_soma_notas(conexao, faixa):
+        return conexao.execute(update(Manga).where(faixa).values(...)).rowcount
+
+Linha de comando:  python backfill.py soma_notas --lote 5000
+Em uma migration, depois do DDL:  executar_na_migration("soma_notas")
+"""
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import select, insert, update, func, cast, and_, text, bindparam, Numeric
+from sqlalchemy.engine import Connection, Engine
+from database import engine
+from models import BackfillProgresso, Capitulo, LeitorManga, Manga
+from models.avaliacao_diaria import recalcular_agregados
+from models.leitor_manga import int_para_bitmap, mascara_faixa
+
+
+TAMANHO_LOTE = int(os.getenv("BACKFILL_LOTE", 1000))
+
+# 0 = sem limite
+LINHAS_POR_SEGUNDO = float(os.getenv("BACKFILL_LINHAS_POR_SEGUNDO", 0))
+
+# Atraso máximo das réplicas (s) antes de pausar; 0 = não verifica
+ATRASO_MAXIMO = float(os.getenv("BACKFILL_ATRASO_MAXIMO", 0))
+
+# Intervalo entre as linhas de progresso (s)
+INTERVALO_RELATORIO = 5.0
+
+
+@dataclass
+class Backfill:
+    """Backfill registrado: chave percorrida e função que processa uma faixa"""
+    nome: str
+    chave: object  # coluna da chave primária (InstrumentedAttribute)
+    processar: Callable[[Connection, object], Optional[int]]
+    descricao: str = ""
+
+
+@dataclass
+class ResultadoBackfill:
+    """Resumo de uma execução"""
+    nome: str
+    lotes: int = 0
+    linhas: int = 0
+    ultimo_id: Optional[int] = None
+    id_maximo: Optional[int] = None
+    concluido: bool = False
+    segundos: float = 0.0
+
+
+# Nome do backfill -> Backfill
+BACKFILLS = {}
+
+
+def registrar_backfill(nome: str, chave):
+    """Decorator que registra a função `processar(conexao, faixa) -> linhas`"""
+    def decorator(funcao):
+        BACKFILLS[nome] = Backfill(nome, chave, funcao, (funcao.__doc__ or "").strip())
+        return funcao
+    return decorator
+
+
+def obter_backfill(nome: str) -> Backfill:
+    """Retorna um backfill registrado"""
+    if nome not in BACKFILLS:
+        raise KeyError(f"Backfill desconhecido: {nome}")
+    return BACKFILLS[nome]
+
+
+def _iniciar(conexao: Connection, backfill: Backfill, reiniciar: bool):
+    """Cria (ou reinicia) o checkpoint; o id máximo é fixado na primeira execução"""
+    progresso = conexao.execute(
+        select(BackfillProgresso).where(BackfillProgresso.nome == backfill.nome)
+    ).first()
+    if progresso and not reiniciar:
+        return
+
+    # Linhas criadas depois daqui já devem ser gravadas completas pela aplicação
+    valores = {
+        "ultimo_id": None,
+        "id_maximo": conexao.execute(select(func.max(backfill.chave))).scalar(),
+        "linhas_processadas": 0,
+        "lotes": 0,
+        "iniciado_em": datetime.now(),
+        "atualizado_em": datetime.now(),
+        "concluido_em": None,
+    }
+    if progresso:
+        conexao.execute(
+            update(BackfillProgresso).where(BackfillProgresso.nome == backfill.nome).values(**valores)
+        )
+    else:
+        conexao.execute(insert(BackfillProgresso).values(nome=backfill.nome, **valores))
+
+
+def _fim_lote(conexao: Connection, backfill: Backfill, ultimo_id, id_maximo, tamanho_lote: int):
+    """Último id do próximo lote (faixas com `tamanho_lote` linhas mesmo com buracos na chave)"""
+    if id_maximo is None or (ultimo_id is not None and ultimo_id >= id_maximo):
+        return None
+
+    consulta = select(backfill.chave).where(backfill.chave <= id_maximo)
+    if ultimo_id is not None:
+        consulta = consulta.where(backfill.chave > ultimo_id)
+    fim = conexao.execute(
+        consulta.order_by(backfill.chave).offset(tamanho_lote - 1).limit(1)
+    ).scalar()
+    return id_maximo if fim is None else fim
+
+
+def atraso_replicacao(conexao: Connection) -> float:
+    """Maior atraso de replay entre as réplicas (s); 0 fora do PostgreSQL"""
+    if conexao.dialect.name != "postgresql":
+        return 0.0
+    return float(conexao.execute(text(
+        "SELECT COALESCE(MAX(EXTRACT(EPOCH FROM replay_lag)), 0) FROM pg_stat_replication"
+    )).scalar())
+
+
+def _aguardar_replicacao(bind: Engine, atraso_maximo: float):
+    if not atraso_maximo:
+        return
+    while True:
+        with bind.connect() as conexao:
+            atraso = atraso_replicacao(conexao)
+        if atraso <= atraso_maximo:
+            return
+        print(f"   ⏸ Réplicas {atraso:.1f}s atrasadas (máx. {atraso_maximo:.1f}s), aguardando...")
+        time.sleep(min(atraso, 5.0))
+
+
+def _relatar(resultado: ResultadoBackfill, id_inicial, segundos: float):
+    percentual = 100.0 * (resultado.ultimo_id or 0) / resultado.id_maximo if resultado.id_maximo else 100.0
+    percorridos = (resultado.ultimo_id or 0) - (id_inicial or 0)
+    eta = ""
+    if percorridos > 0 and segundos > 0:
+        restante = (resultado.id_maximo - resultado.ultimo_id) * segundos / percorridos
+        eta = f", ETA {restante:.0f}s"
+    print(f"   {resultado.nome}: id {resultado.ultimo_id}/{resultado.id_maximo} ({percentual:.1f}%), "
+          f"{resultado.linhas} linha(s), {resultado.linhas / max(segundos, 1e-9):.0f} linhas/s{eta}")
+
+
+def executar_backfill(nome: str, tamanho_lote: int = TAMANHO_LOTE,
+                      linhas_por_segundo: float = LINHAS_POR_SEGUNDO,
+                      atraso_maximo: float = ATRASO_MAXIMO,
+                      max_lotes: Optional[int] = None, reiniciar: bool = False,
+                      bind: Optional[Engine] = None, relatar: bool = True) -> ResultadoBackfill:
+    """
+    Executa (ou retoma) um backfill registrado
+    `max_lotes`: encerra após este número de lotes (execuções curtas)
+    `reiniciar`: descarta o checkpoint e recomeça do primeiro id
+    Vários processos podem rodar o mesmo backfill: o checkpoint é lido com
+    FOR UPDATE, então cada lote é processado uma única vez
+    """
+    backfill = obter_backfill(nome)
+    bind = bind or engine
+    resultado = ResultadoBackfill(nome)
+    inicio = time.perf_counter()
+    ultimo_relatorio = inicio
+    id_inicial = None
+
+    with bind.begin() as conexao:
+        _iniciar(conexao, backfill, reiniciar)
+
+    while max_lotes is None or resultado.lotes < max_lotes:
+        _aguardar_replicacao(bind, atraso_maximo)
+        inicio_lote = time.perf_counter()
+
+        with bind.begin() as conexao:
+            progresso = conexao.execute(
+                select(BackfillProgresso.ultimo_id, BackfillProgresso.id_maximo)
+                .where(BackfillProgresso.nome == nome)
+                .with_for_update()
+            ).one()
+            if id_inicial is None:
+                id_inicial = progresso.ultimo_id
+            resultado.id_maximo = progresso.id_maximo
+
+            fim = _fim_lote(conexao, backfill, progresso.ultimo_id, progresso.id_maximo, tamanho_lote)
+            if fim is None:
+                conexao.execute(
+                    update(BackfillProgresso)
+                    .where(BackfillProgresso.nome == nome, BackfillProgresso.concluido_em.is_(None))
+                    .values(concluido_em=datetime.now(), atualizado_em=datetime.now())
+                )
+                resultado.concluido = True
+                break
+
+            faixa = backfill.chave <= fim
+            if progresso.ultimo_id is not None:
+                faixa = and_(backfill.chave > progresso.ultimo_id, faixa)
+            linhas = backfill.processar(conexao, faixa)
+            linhas = tamanho_lote if linhas is None or linhas < 0 else linhas
+
+            conexao.execute(
+                update(BackfillProgresso)
+                .where(BackfillProgresso.nome == nome)
+                .values(
+                    ultimo_id=fim,
+                    linhas_processadas=BackfillProgresso.linhas_processadas + linhas,
+                    lotes=BackfillProgresso.lotes + 1,
+                    atualizado_em=datetime.now(),
+                )
+            )
+
+        resultado.lotes += 1
+        resultado.linhas += linhas
+        resultado.ultimo_id = fim
+
+        agora = time.perf_counter()
+        if relatar and agora - ultimo_relatorio >= INTERVALO_RELATORIO:
+            _relatar(resultado, id_inicial, agora - inicio)
+            ultimo_relatorio = agora
+
+        if linhas_por_segundo:
+            # Lote com N linhas deve levar ao menos N / alvo segundos
+            espera = linhas / linhas_por_segundo - (agora - inicio_lote)
+            if espera > 0:
+                time.sleep(espera)
+
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+
+def executar_na_migration(nome: str, **opcoes) -> ResultadoBackfill:
+    """
+    Roda o backfill dentro de upgrade(), depois do DDL
+    O DDL é confirmado antes (autocommit_block) e os lotes usam conexões
+    próprias, cada um com seu commit
+    """
+    from alembic import op
+
+    with op.get_context().autocommit_block():
+        return executar_backfill(nome, bind=op.get_bind().engine, **opcoes)
+
+
+@registrar_backfill("progresso_leitura", LeitorManga.id)
+def backfill_progresso_leitura(conexao: Connection, faixa) -> int:
+    """Recalcula leitor_manga.progresso_leitura pelo total atual de capítulos"""
+    total_capitulos = (
+        select(func.count(Capitulo.id_capitulo))
+        .where(Capitulo.id_manga == LeitorManga.id_manga)
+        .scalar_subquery()
+    )
+    progresso = func.round(cast(LeitorManga.ultimo_capitulo_lido * 100.0 / total_capitulos, Numeric), 2)
+
+    return conexao.execute(
+        update(LeitorManga)
+        .where(faixa, total_capitulos > 0, LeitorManga.progresso_leitura.is_distinct_from(progresso))
+        .values(progresso_leitura=progresso)
+    ).rowcount
+
+
+@registrar_backfill("avaliacoes_diarias", Manga.id_manga)
+def backfill_avaliacoes_diarias(conexao: Connection, faixa) -> int:
+    """Recalcula os agregados diários de avaliações dos mangás da faixa"""
+    return recalcular_agregados(conexao, select(Manga.id_manga).where(faixa))
+
+
+@registrar_backfill("capitulos_lidos", LeitorManga.id)
+def backfill_capitulos_lidos(conexao: Connection, faixa) -> int:
+    """Preenche o bitmap leitor_manga.capitulos_lidos com 1..ultimo_capitulo_lido"""
+    # Só o último capítulo era guardado: assume leitura em sequência
+    linhas = [
+        {"id_linha": id_linha, "bitmap": int_para_bitmap(mascara_faixa(1, ultimo))}
+        for id_linha, ultimo in conexao.execute(
+            select(LeitorManga.id, LeitorManga.ultimo_capitulo_lido)
+            .where(faixa, LeitorManga.capitulos_lidos.is_(None), LeitorManga.ultimo_capitulo_lido > 0)
+        )
+    ]
+    if not linhas:
+        return 0
+    conexao.execute(
+        update(LeitorManga.__table__)
+        .where(LeitorManga.id == bindparam("id_linha"))
+        .values(capitulos_lidos=bindparam("bitmap")),
+        linhas,
+    )
+    return len(linhas)
+
+
+def main():
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Backfill em lotes, retomável")
+    parser.add_argument("nome", nargs="?", help="Backfill registrado")
+    parser.add_argument("--listar", action="store_true", help="Lista backfills e progresso")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Linhas por transação")
+    parser.add_argument("--linhas-por-segundo", type=float, default=LINHAS_POR_SEGUNDO)
+    parser.add_argument("--atraso-maximo", type=float, default=ATRASO_MAXIMO,
+                        help="Atraso de replicação (s) que pausa o backfill")
+    parser.add_argument("--max-lotes", type=int, default=None)
+    parser.add_argument("--reiniciar", action="store_true", help="Descarta o checkpoint")
+    args = parser.parse_args()
+
+    engine.echo = False
+    if args.listar or not args.nome:
+        with engine.connect() as conexao:
+            progresso = {
+                p.nome: p for p in conexao.execute(select(BackfillProgresso)).all()
+            }
+        for nome, backfill in BACKFILLS.items():
+            p = progresso.get(nome)
+            situacao = ("concluído" if p.concluido_em else f"id {p.ultimo_id}/{p.id_maximo}") if p else "não iniciado"
+            print(f"{nome:<25} {situacao:<22} {backfill.descricao}")
+        return
+
+    resultado = executar_backfill(
+        args.nome, args.lote, args.linhas_por_segundo, args.atraso_maximo,
+        args.max_lotes, args.reiniciar,
+    )
+    print(f"✓ {resultado.linhas} linha(s) em {resultado.lotes} lote(s), {resultado.segundos:.2f}s")
+    if not resultado.concluido:
+        print(f"⏸ Interrompido no id {resultado.ultimo_id}/{resultado.id_maximo}: rode de novo para continuar")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Barramento de invalidação de cache entre processos
+Publicação: cada chave marcada com cache.marcar_para_invalidacao é enviada
+na própria transação da sessão, então só chega aos outros processos se o
+commit acontecer:
+- PostgreSQL: pg_notify no canal CACHE_CANAL
+- Demais bancos (SQLite): a chave recebe uma nova versão em versoes_cache
+
+Recepção: iniciar_barramento() sobe uma thread que escuta o canal (LISTEN)
+ou consulta versoes_cache a cada CACHE_INTERVALO_CONSULTA segundos e
+remove as chaves dos caches do processo. Se a conexão cai, os caches são
+limpos ao reconectar (notificações podem ter sido perdidas). Com o
+barramento ativo os caches podem usar TTLs longos.
+
+    python barramento_invalidacao.py   # mostra as invalidações recebidas
+"""
+import json
+import os
+import select
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from sqlalchemy import select as consulta, delete, insert, func
+from sqlalchemy.engine import Connection, Engine
+from database import engine
+from models import VersaoCache
+from cache import registrar_publicador, invalidar, TODAS
+
+
+CANAL = os.getenv("CACHE_CANAL", "cache_invalidacao")
+
+# Espera máxima por notificações / intervalo de consulta sem NOTIFY (s)
+INTERVALO_CONSULTA = float(os.getenv("CACHE_INTERVALO_CONSULTA", 1))
+
+# Payload do NOTIFY é limitado a 8000 bytes
+_TAMANHO_PAYLOAD = 7500
+
+# Espera máxima entre tentativas de reconexão (s)
+_ESPERA_MAXIMA = 30.0
+
+_ID_PROCESSO = uuid.uuid4().hex[:8]
+
+
+def _origem() -> str:
+    # Inclui o pid: processos filhos (fork) herdam o módulo já importado
+    return f"{_ID_PROCESSO}-{os.getpid()}"
+
+
+def _payloads(chaves: list):
+    """Divide as chaves em payloads JSON dentro do limite do NOTIFY"""
+    lote, tamanho = [], 0
+    for chave in chaves:
+        if lote and tamanho + len(chave) + 4 > _TAMANHO_PAYLOAD:
+            yield json.dumps({"origem": _origem(), "chaves": lote})
+            lote, tamanho = [], 0
+        lote.append(chave)
+        tamanho += len(chave) + 4
+    if lote:
+        yield json.dumps({"origem": _origem(), "chaves": lote})
+
+
+def publicar(conexao: Connection, chaves):
+    """Publica as chaves na transação da conexão (entregues no commit)"""
+    chaves = sorted(set(chaves))
+    if not chaves:
+        return
+
+    if conexao.dialect.name == "postgresql":
+        for payload in _payloads(chaves):
+            conexao.execute(consulta(func.pg_notify(CANAL, payload)))
+        return
+
+    # Escritas serializadas no SQLite: max + 1 é uma versão única
+    versao = conexao.execute(consulta(func.coalesce(func.max(VersaoCache.versao), 0))).scalar() + 1
+    conexao.execute(delete(VersaoCache).where(VersaoCache.chave.in_(chaves)))
+    conexao.execute(insert(VersaoCache), [{"chave": chave, "versao": versao} for chave in chaves])
+
+
+@registrar_publicador
+def _publicar_na_sessao(session, chaves):
+    publicar(session.connection(), chaves)
+
+
+class BarramentoInvalidacao:
+    """Thread que recebe as invalidações dos outros processos"""
+
+    def __init__(self, bind: Optional[Engine] = None, ao_receber: Optional[Callable[[set], None]] = None):
+        self.bind = bind or engine
+        self.ao_receber = ao_receber
+        self.recebidas = 0
+        self._parar = threading.Event()
+        self._thread = None
+        self._versao = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self):
+        if self.ativo:
+            return self
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="barramento-invalidacao", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self, timeout: float = 5.0):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _aplicar(self, chaves):
+        chaves = set(chaves)
+        if not chaves:
+            return
+        invalidar(chaves)
+        self.recebidas += len(chaves)
+        if self.ao_receber:
+            self.ao_receber(chaves)
+
+    def _executar(self):
+        espera = INTERVALO_CONSULTA
+        primeira = True
+        while not self._parar.is_set():
+            try:
+                if not primeira:
+                    # Invalidações podem ter sido perdidas enquanto desconectado
+                    self._aplicar({TODAS})
+                primeira = False
+                if self.bind.dialect.name == "postgresql":
+                    self._escutar()
+                else:
+                    self._consultar()
+                espera = INTERVALO_CONSULTA
+            except Exception as e:
+                print(f"⚠ Barramento de invalidação desconectado ({e}); nova tentativa em {espera:.0f}s")
+                self._parar.wait(espera)
+                espera = min(espera * 2, _ESPERA_MAXIMA)
+
+    def _escutar(self):
+        """LISTEN em uma conexão dedicada (fora do pool)"""
+        conexao = self.bind.raw_connection()
+        conexao.detach()
+        try:
+            dbapi = conexao.driver_connection
+            dbapi.autocommit = True
+            with dbapi.cursor() as cursor:
+                cursor.execute(f'LISTEN "{CANAL}"')
+
+            while not self._parar.is_set():
+                if not select.select([dbapi], [], [], INTERVALO_CONSULTA)[0]:
+                    continue
+                dbapi.poll()
+                chaves = set()
+                while dbapi.notifies:
+                    mensagem = json.loads(dbapi.notifies.pop(0).payload)
+                    if mensagem.get("origem") != _origem():  # o próprio processo já invalidou no commit
+                        chaves.update(mensagem.get("chaves", ()))
+                self._aplicar(chaves)
+        finally:
+            conexao.close()
+
+    def _consultar(self):
+        """Consulta periódica de versoes_cache"""
+        while not self._parar.is_set():
+            with self.bind.connect() as conexao:
+                maxima = conexao.execute(consulta(func.coalesce(func.max(VersaoCache.versao), 0))).scalar()
+                if self._versao is None:
+                    self._versao = maxima
+                elif maxima < self._versao:
+                    # Tabela recriada (ex.: snapshot restaurado): recomeça do zero
+                    self._versao = maxima
+                    self._aplicar({TODAS})
+                elif maxima > self._versao:
+                    chaves = conexao.execute(
+                        consulta(VersaoCache.chave).where(VersaoCache.versao > self._versao)
+                    ).scalars().all()
+                    self._versao = maxima
+                    self._aplicar(chaves)
+            self._parar.wait(INTERVALO_CONSULTA)
+
+
+_barramento = None
+_barramento_lock = threading.Lock()
+
+
+def iniciar_barramento(bind: Optional[Engine] = None) -> BarramentoInvalidacao:
+    """Inicia (uma vez por processo) a thread de recepção de invalidações"""
+    global _barramento
+    with _barramento_lock:
+        if _barramento is None:
+            _barramento = BarramentoInvalidacao(bind)
+        return _barramento.iniciar()
+
+
+def parar_barramento():
+    """Encerra a thread de recepção"""
+    global _barramento
+    with _barramento_lock:
+        if _barramento is not None:
+            _barramento.parar()
+            _barramento = None
+
+
+def main():
+    """Escuta e mostra as invalidações recebidas"""
+    engine.echo = False
+    print(f"📡 Escutando invalidações ({engine.dialect.name}, canal {CANAL})... Ctrl+C para sair")
+    barramento = BarramentoInvalidacao(ao_receber=lambda chaves: print(f"   🗑 {', '.join(sorted(chaves))}"))
+    barramento.iniciar()
+    try:
+        while barramento.ativo:
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        barramento.parar()
+
+
+if __name__ == "__main__":
+    main()
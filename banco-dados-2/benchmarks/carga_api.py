@@ -0,0 +1,163 @@
+"""
+Teste de carga da API de leitura
+Sobe a API localmente (ou usa --url), dispara requisições de vários
+clientes com conexões keep-alive durante --segundos e mostra
+requisições/s e latências por rota. Com --condicional os clientes
+reenviam o ETag recebido (If-None-Match) e a maioria das respostas é 304.
+
+    python benchmarks/carga_api.py --clientes 16 --segundos 10
+    python benchmarks/carga_api.py --url http://127.0.0.1:8000 --condicional
+"""
+import argparse
+import http.client
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+DIRETORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRETORIO)
+
+
+def rotas(ids_manga: list) -> list:
+    """Mistura de leitura: detalhe e capítulos dominam, como no front end"""
+    mistura = []
+    for id_manga in ids_manga:
+        mistura += [f"/mangas/{id_manga}"] * 4
+        mistura += [f"/mangas/{id_manga}/capitulos"] * 2
+        mistura += [f"/mangas/{id_manga}/comentarios"]
+    mistura += ["/mangas?limite=20"] * 2
+    mistura += ["/rankings/mais_avaliados"]
+    return mistura
+
+
+def _grupo(rota: str) -> str:
+    partes = rota.split("?")[0].strip("/").split("/")
+    return "/".join("{id}" if p.isdigit() else p for p in partes)
+
+
+def cliente(host: str, porta: int, mistura: list, ate: float, condicional: bool, resultados: list):
+    conexao = http.client.HTTPConnection(host, porta, timeout=10)
+    etags = {}
+    latencias = defaultdict(list)
+    codigos = defaultdict(int)
+    while time.perf_counter() < ate:
+        rota = random.choice(mistura)
+        cabecalhos = {"If-None-Match": etags[rota]} if condicional and rota in etags else {}
+        inicio = time.perf_counter()
+        try:
+            conexao.request("GET", rota, headers=cabecalhos)
+            resposta = conexao.getresponse()
+            resposta.read()
+        except (OSError, http.client.HTTPException):
+            codigos["erro"] += 1
+            conexao.close()
+            conexao = http.client.HTTPConnection(host, porta, timeout=10)
+            continue
+        latencias[_grupo(rota)].append(time.perf_counter() - inicio)
+        codigos[resposta.status] += 1
+        if resposta.getheader("ETag"):
+            etags[rota] = resposta.getheader("ETag")
+    conexao.close()
+    resultados.append((latencias, codigos))
+
+
+def _aguardar(host: str, porta: int, timeout: float = 20):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            conexao = http.client.HTTPConnection(host, porta, timeout=1)
+            conexao.request("GET", "/saude")
+            if conexao.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("API não respondeu a tempo")
+
+
+def _ids_manga(limite: int) -> list:
+    from sqlalchemy import select
+    from database import engine
+    from models import Manga
+
+    engine.echo = False
+    with engine.connect() as conexao:
+        return conexao.execute(select(Manga.id_manga).order_by(Manga.id_manga).limit(limite)).scalars().all()
+
+
+def _percentil(valores: list, p: float) -> float:
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API de leitura")
+    parser.add_argument("--url", default=None, help="API já no ar (padrão: sobe uma local)")
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn local")
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--mangas", type=int, default=50, help="Mangás distintos consultados")
+    parser.add_argument("--condicional", action="store_true", help="Reenvia o ETag (If-None-Match)")
+    args = parser.parse_args()
+
+    servidor = None
+    if args.url:
+        destino = urlsplit(args.url)
+        host, porta = destino.hostname, destino.port or 80
+    else:
+        host, porta = "127.0.0.1", 8765
+        servidor = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api:app", "--host", host, "--port", str(porta),
+             "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+            cwd=DIRETORIO,
+        )
+
+    try:
+        _aguardar(host, porta)
+        ids = _ids_manga(args.mangas) or [1]
+        mistura = rotas(ids)
+
+        resultados = []
+        ate = time.perf_counter() + args.segundos
+        threads = [
+            threading.Thread(target=cliente, args=(host, porta, mistura, ate, args.condicional, resultados))
+            for _ in range(args.clientes)
+        ]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        segundos = time.perf_counter() - inicio
+    finally:
+        if servidor:
+            servidor.terminate()
+            servidor.wait()
+
+    latencias = defaultdict(list)
+    codigos = defaultdict(int)
+    for parciais, contagem in resultados:
+        for grupo, valores in parciais.items():
+            latencias[grupo].extend(valores)
+        for codigo, total in contagem.items():
+            codigos[codigo] += total
+
+    total = sum(len(v) for v in latencias.values())
+    print(f"\n{total} requisições em {segundos:.1f}s com {args.clientes} cliente(s): "
+          f"{total / segundos:.0f} req/s")
+    print(f"Respostas: {', '.join(f'{c}={n}' for c, n in sorted(codigos.items(), key=str))}\n")
+    print(f"{'Rota':<28} {'Req':>8} {'Média':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    print("-" * 76)
+    for grupo, valores in sorted(latencias.items()):
+        print(f"{grupo:<28} {len(valores):>8} {statistics.mean(valores) * 1000:>7.2f}ms "
+              f"{_percentil(valores, 0.5):>7.2f}ms {_percentil(valores, 0.95):>7.2f}ms "
+              f"{_percentil(valores, 0.99):>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark: exclusão de um mangá com muitos filhos
+Compara a exclusão pelo ORM carregando os filhos (comportamento antigo do
+cascade="all, delete-orphan") com o DELETE único apoiado no ON DELETE
+CASCADE do banco (Administrador.excluir_mangas). Roda no DATABASE_URL
+configurado e remove tudo o que cria.
+
+    python benchmarks/exclusao_manga.py --linhas 100000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert
+from database import SessionLocal, engine
+from models import (
+    Usuario, Leitor, Administrador, Manga,
+    Capitulo, Avaliacao, Comentario, LeitorManga
+)
+
+
+TAMANHO_LOTE_INSERCAO = 10000
+TOTAL_LEITORES = 20
+
+
+class ContadorComandos:
+    """Conta os comandos enviados ao banco enquanto ativo"""
+
+    def __init__(self):
+        self.total = 0
+
+    def _contar(self, *args):
+        self.total += 1
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self._contar)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._contar)
+
+
+def _inserir(session, modelo, linhas):
+    for inicio in range(0, len(linhas), TAMANHO_LOTE_INSERCAO):
+        session.execute(insert(modelo), linhas[inicio:inicio + TAMANHO_LOTE_INSERCAO])
+
+
+def criar_leitores(session, prefixo: str) -> list:
+    """Leitores de apoio (sem hash de senha: inserção direta)"""
+    ids = []
+    for i in range(TOTAL_LEITORES):
+        id_usuario = session.execute(
+            insert(Usuario).values(
+                email=f"{prefixo}{i}@bench.local", nome=f"Bench {i}",
+                senha="-", tipo="leitor",
+            ).returning(Usuario.id_usuario)
+        ).scalar_one()
+        session.execute(insert(Leitor.__table__).values(id_usuario=id_usuario, codinome=f"{prefixo}{i}"))
+        ids.append(id_usuario)
+    return ids
+
+
+def criar_manga(session, ids_leitor: list, linhas: int) -> int:
+    """Mangá com `linhas` filhos divididos entre capítulos, comentários, avaliações e leituras"""
+    manga = Manga(titulo_manga=f"Benchmark {datetime.now():%H%M%S%f}", autor="Benchmark")
+    session.add(manga)
+    session.flush()
+
+    por_tabela = linhas // 4
+    agora = datetime.now()
+    leitor = lambda i: ids_leitor[i % len(ids_leitor)]
+
+    _inserir(session, Capitulo, [
+        {"id_manga": manga.id_manga, "titulo_capitulo": f"Cap {i}", "numero_capitulo": i + 1,
+         "numero_paginas": 20, "data_publicacao": agora}
+        for i in range(por_tabela)
+    ])
+    _inserir(session, Comentario, [
+        {"id_manga": manga.id_manga, "id_leitor": leitor(i), "texto_comentario": f"Comentário {i}",
+         "numero_curtidas": 0, "data_criacao": agora}
+        for i in range(por_tabela)
+    ])
+    _inserir(session, Avaliacao, [
+        {"id_manga": manga.id_manga, "id_leitor": leitor(i), "nota": float(i % 6)}
+        for i in range(por_tabela)
+    ])
+    _inserir(session, LeitorManga, [
+        {"id_manga": manga.id_manga, "id_leitor": leitor(i), "progresso_leitura": 0.0,
+         "ultimo_capitulo_lido": 0}
+        for i in range(por_tabela)
+    ])
+    session.commit()
+    return manga.id_manga
+
+
+def excluir_pelo_orm(session, id_manga: int):
+    """Comportamento antigo: carrega todos os filhos e deixa o ORM excluí-los"""
+    manga = session.get(Manga, id_manga)
+    for colecao in ("capitulos", "comentarios", "avaliacoes", "leituras", "manga_generos"):
+        getattr(manga, colecao)
+    session.delete(manga)
+    session.commit()
+
+
+def excluir_em_massa(session, id_manga: int):
+    """DELETE único; o banco remove os filhos"""
+    Administrador().excluir_mangas([id_manga], session)
+    session.commit()
+
+
+def medir(nome: str, funcao, *args) -> dict:
+    session = SessionLocal()
+    try:
+        with ContadorComandos() as contador:
+            inicio = time.perf_counter()
+            funcao(session, *args)
+            segundos = time.perf_counter() - inicio
+    finally:
+        session.close()
+    return {"nome": nome, "segundos": segundos, "comandos": contador.total}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de exclusão de mangá")
+    parser.add_argument("--linhas", type=int, default=100000, help="Filhos por mangá")
+    args = parser.parse_args()
+
+    engine.echo = False
+    prefixo = f"bench{os.getpid()}_"
+
+    session = SessionLocal()
+    try:
+        ids_leitor = criar_leitores(session, prefixo)
+        session.commit()
+
+        resultados = []
+        for nome, funcao in (
+            ("ORM (carrega filhos)", excluir_pelo_orm),
+            ("DELETE + ON DELETE CASCADE", excluir_em_massa),
+        ):
+            id_manga = criar_manga(session, ids_leitor, args.linhas)
+            resultados.append(medir(nome, funcao, id_manga))
+
+        resultados.append(medir("Leitores (DELETE em massa)",
+                                lambda s: (Administrador().excluir_leitores(ids_leitor, s), s.commit())))
+    finally:
+        session.close()
+
+    print(f"\nExclusão de um mangá com {args.linhas} linhas filhas ({engine.dialect.name})\n")
+    print(f"{'Estratégia':<30} {'Tempo':>10} {'Comandos':>10}")
+    print("-" * 52)
+    for r in resultados:
+        print(f"{r['nome']:<30} {r['segundos']:>9.2f}s {r['comandos']:>10}")
+
+
+if __name__ == "__main__":
+    main()
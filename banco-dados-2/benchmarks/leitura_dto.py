@@ -0,0 +1,163 @@
+"""
+Benchmark: leitura de listas pelo ORM x DTOs (leitura_dto)
+Cria um mangá com --linhas capítulos e comentários e lê as duas listas de
+três formas: objetos ORM (identity map, relacionamento leitor carregado),
+linhas do Core e dataclasses com __slots__. Mede o tempo de construção e
+a memória alocada (tracemalloc) normalizados por 100 mil linhas, além da
+serialização em JSON. Roda no DATABASE_URL configurado e remove tudo o
+que cria.
+
+    python benchmarks/leitura_dto.py --linhas 100000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from database import SessionLocal, engine
+from models import Administrador, Capitulo, Comentario
+from arquivamento import _consulta_feed
+from leitura_dto import (
+    CapituloResumo, ComentarioResumo, consulta_capitulos, converter, para_json, orjson
+)
+from exclusao_manga import criar_leitores, criar_manga
+
+
+POR_LINHAS = 100000
+
+
+def capitulos_orm(session, id_manga):
+    return session.scalars(
+        select(Capitulo).where(Capitulo.id_manga == id_manga).order_by(Capitulo.numero_capitulo)
+    ).all()
+
+
+def capitulos_core(session, id_manga):
+    return session.execute(consulta_capitulos(id_manga)).all()
+
+
+def capitulos_dto(session, id_manga):
+    return converter(CapituloResumo, session.execute(consulta_capitulos(id_manga)))
+
+
+def comentarios_orm(session, id_manga):
+    return session.scalars(
+        select(Comentario)
+        .options(joinedload(Comentario.leitor))
+        .where(Comentario.id_manga == id_manga)
+        .order_by(Comentario.data_criacao.desc(), Comentario.id_comentario.desc())
+    ).all()
+
+
+def comentarios_core(session, id_manga):
+    return session.execute(_consulta_feed(Comentario, id_manga, None, None)).all()
+
+
+def comentarios_dto(session, id_manga):
+    return converter(ComentarioResumo, session.execute(_consulta_feed(Comentario, id_manga, None, None)))
+
+
+def _json_orm(objetos):
+    return para_json([
+        {"id_comentario": c.id_comentario, "codinome": c.leitor.codinome,
+         "texto_comentario": c.texto_comentario, "numero_curtidas": c.numero_curtidas,
+         "data_criacao": c.data_criacao}
+        if isinstance(c, Comentario) else
+        {"id_capitulo": c.id_capitulo, "numero_capitulo": c.numero_capitulo,
+         "titulo_capitulo": c.titulo_capitulo, "numero_paginas": c.numero_paginas,
+         "data_publicacao": c.data_publicacao}
+        for c in objetos
+    ])
+
+
+def _json_core(linhas):
+    return para_json([dict(linha._mapping) for linha in linhas])
+
+
+def medir(nome: str, carregar, serializar, id_manga: int, repeticoes: int) -> dict:
+    """Melhor tempo de `repeticoes` leituras, memória de uma leitura e tempo de serialização"""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        session = SessionLocal()
+        try:
+            gc.collect()
+            inicio = time.perf_counter()
+            resultado = carregar(session, id_manga)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        finally:
+            del resultado
+            session.close()
+
+    # Memória: o que continua alocado com a lista (e a sessão) vivas, e o pico
+    session = SessionLocal()
+    try:
+        gc.collect()
+        tracemalloc.start()
+        resultado = carregar(session, id_manga)
+        retida, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        inicio = time.perf_counter()
+        serializar(resultado)
+        segundos_json = time.perf_counter() - inicio
+        linhas = len(resultado)
+    finally:
+        del resultado
+        session.close()
+
+    return {"nome": nome, "linhas": linhas, "segundos": melhor, "retida": retida,
+            "pico": pico, "json": segundos_json}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de leitura ORM x DTO")
+    parser.add_argument("--linhas", type=int, default=POR_LINHAS, help="Capítulos e comentários do mangá")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    engine.echo = False
+    prefixo = f"dto{os.getpid()}_"
+
+    session = SessionLocal()
+    try:
+        ids_leitor = criar_leitores(session, prefixo)
+        session.commit()
+        # criar_manga divide as linhas entre 4 tabelas
+        id_manga = criar_manga(session, ids_leitor, args.linhas * 4)
+
+        resultados = []
+        for lista, estrategias in (
+            ("capitulos", (("ORM", capitulos_orm, _json_orm),
+                           ("Core (Row)", capitulos_core, _json_core),
+                           ("DTO (slots)", capitulos_dto, para_json))),
+            ("comentarios", (("ORM", comentarios_orm, _json_orm),
+                             ("Core (Row)", comentarios_core, _json_core),
+                             ("DTO (slots)", comentarios_dto, para_json))),
+        ):
+            for nome, carregar, serializar in estrategias:
+                resultados.append((lista, medir(nome, carregar, serializar, id_manga, args.repeticoes)))
+    finally:
+        Administrador().excluir_mangas([id_manga], session)
+        Administrador().excluir_leitores(ids_leitor, session)
+        session.commit()
+        session.close()
+
+    print(f"\nLeitura de {args.linhas} linhas por lista ({engine.dialect.name}, "
+          f"JSON: {'orjson' if orjson else 'json'}); valores por {POR_LINHAS} linhas\n")
+    print(f"{'Lista':<12} {'Estratégia':<12} {'Construção':>11} {'Retida':>10} {'Pico':>10} {'JSON':>9}")
+    print("-" * 69)
+    for lista, r in resultados:
+        escala = POR_LINHAS / max(r["linhas"], 1)
+        print(f"{lista:<12} {r['nome']:<12} {r['segundos'] * escala:>10.3f}s "
+              f"{r['retida'] * escala / 2**20:>7.1f} MB {r['pico'] * escala / 2**20:>7.1f} MB "
+              f"{r['json'] * escala:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Biblioteca do leitor: mangás favoritos com progresso e capítulos não lidos
+Um único SELECT agrupado (leitor_manga + mangas + capitulos) monta a lista
+inteira, em vez de percorrer leitor.leituras e manga.capitulos por item.
+O resultado fica no cache "biblioteca" por leitor, etiquetado com os
+mangás da lista: uma leitura do leitor invalida a chave dele; um capítulo
+novo (ou removido) invalida a etiqueta do mangá e, com ela, a biblioteca
+de todos os leitores que o seguem.
+
+    python biblioteca.py 2
+"""
+import argparse
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, func, case, event, inspect
+from sqlalchemy.orm import Session
+from database import SessionLocal, engine
+from models import Manga, Capitulo, LeitorManga, Leitor
+from cache import obter_cache, marcar_para_invalidacao, AUSENTE
+from leitura_dto import converter
+import barramento_invalidacao  # noqa: F401 (publica as invalidações para outros processos)
+
+
+cache_biblioteca = obter_cache(
+    "biblioteca",
+    tamanho_maximo=int(os.getenv("CACHE_BIBLIOTECA_TAMANHO", 4096)),
+    ttl=float(os.getenv("CACHE_BIBLIOTECA_TTL", 600)),
+)
+
+
+@dataclass(slots=True, frozen=True)
+class ItemBiblioteca:
+    id_manga: int
+    titulo_manga: str
+    progresso_leitura: float
+    ultimo_capitulo_lido: int
+    total_capitulos: int
+    capitulos_nao_lidos: int
+    ultimo_capitulo_em: Optional[datetime]
+    data_favorito: datetime
+
+
+def chave_leitor(id_leitor: int) -> str:
+    """Chave de cache/invalidação da biblioteca de um leitor"""
+    return f"biblioteca:{id_leitor}"
+
+
+def etiqueta_manga(id_manga: int) -> str:
+    """Etiqueta das bibliotecas que contêm o mangá"""
+    return f"biblioteca_manga:{id_manga}"
+
+
+def consulta_biblioteca(id_leitor: int):
+    """
+    SELECT da biblioteca, colunas na ordem de ItemBiblioteca
+    Mangás com capítulo mais recente primeiro; sem capítulos, por último
+    """
+    ultimo_lido = func.coalesce(LeitorManga.ultimo_capitulo_lido, 0)
+    ultimo_capitulo_em = func.max(Capitulo.data_publicacao)
+    return (
+        select(
+            LeitorManga.id_manga,
+            Manga.titulo_manga,
+            func.coalesce(LeitorManga.progresso_leitura, 0.0),
+            ultimo_lido,
+            func.count(Capitulo.id_capitulo),
+            func.coalesce(func.sum(case((Capitulo.numero_capitulo > ultimo_lido, 1), else_=0)), 0),
+            ultimo_capitulo_em,
+            LeitorManga.data_favorito,
+        )
+        .join(Manga, Manga.id_manga == LeitorManga.id_manga)
+        .outerjoin(Capitulo, Capitulo.id_manga == LeitorManga.id_manga)
+        .where(LeitorManga.id_leitor == id_leitor, LeitorManga.data_favorito.is_not(None))
+        .group_by(LeitorManga.id, LeitorManga.id_manga, Manga.titulo_manga)
+        .order_by(ultimo_capitulo_em.desc().nulls_last(), Manga.titulo_manga, LeitorManga.id_manga)
+    )
+
+
+def montar_biblioteca(session: Session, id_leitor: int) -> tuple:
+    """Lê a biblioteca do banco (sem cache)"""
+    return tuple(converter(ItemBiblioteca, session.execute(consulta_biblioteca(id_leitor))))
+
+
+def obter_biblioteca(session: Session, id_leitor: int, usar_cache: bool = True) -> tuple:
+    """Biblioteca do leitor (tupla de ItemBiblioteca), do cache quando possível"""
+    if not usar_cache:
+        return montar_biblioteca(session, id_leitor)
+
+    chave = chave_leitor(id_leitor)
+    itens = cache_biblioteca.obter(chave)
+    if itens is not AUSENTE:
+        return itens
+
+    itens = montar_biblioteca(session, id_leitor)
+    cache_biblioteca.definir(chave, itens, etiquetas=[etiqueta_manga(i.id_manga) for i in itens])
+    return itens
+
+
+def _chaves_afetadas(objeto) -> set:
+    """Chaves e etiquetas de biblioteca que dependem do objeto alterado"""
+    if isinstance(objeto, LeitorManga):
+        historico = inspect(objeto).attrs.id_leitor.history
+        return {chave_leitor(i) for i in (objeto.id_leitor, *historico.deleted) if i is not None}
+
+    if isinstance(objeto, Capitulo):
+        # Inclui o mangá anterior caso o capítulo tenha mudado de mangá
+        historico = inspect(objeto).attrs.id_manga.history
+        return {etiqueta_manga(i) for i in (objeto.id_manga, *historico.deleted) if i is not None}
+
+    if isinstance(objeto, Manga) and objeto.id_manga is not None:
+        return {etiqueta_manga(objeto.id_manga)}
+
+    return set()
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _coletar_invalidacoes(session, contexto_flush):
+    chaves = set()
+    for objeto in (*session.new, *session.dirty, *session.deleted):
+        chaves |= _chaves_afetadas(objeto)
+    if chaves:
+        marcar_para_invalidacao(session, chaves)
+
+
+def main():
+    """Mostra a biblioteca de um leitor"""
+    parser = argparse.ArgumentParser(description="Biblioteca do leitor (favoritos e não lidos)")
+    parser.add_argument("id_leitor", type=int)
+    args = parser.parse_args()
+
+    engine.echo = False
+    session = SessionLocal()
+    try:
+        leitor = session.get(Leitor, args.id_leitor)
+        if leitor is None:
+            print(f"❌ Leitor {args.id_leitor} não encontrado")
+            return
+
+        itens = obter_biblioteca(session, args.id_leitor)
+        print(f"\n📚 Biblioteca de {leitor.codinome}: {len(itens)} mangá(s)\n")
+        for item in itens:
+            novo = f"🆕 {item.capitulos_nao_lidos} não lido(s)" if item.capitulos_nao_lidos else "em dia"
+            data = f"{item.ultimo_capitulo_em:%d/%m/%Y}" if item.ultimo_capitulo_em else "-"
+            print(f"   {item.titulo_manga:<30} cap. {item.ultimo_capitulo_lido}/{item.total_capitulos} "
+                  f"({item.progresso_leitura:.0f}%)  último: {data}  {novo}")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
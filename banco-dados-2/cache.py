@@ -0,0 +1,230 @@
+"""
+Cache em memória com backend plugável
+O backend padrão é um LRU com TTL e limite de tamanho. Outros backends
+(ex.: Redis) só precisam implementar a interface de BackendCache e ser
+registrados com registrar_cache()
+
+Etiquetas: uma entrada pode ser guardada com etiquetas (definir(...,
+etiquetas=[...])); invalidar uma etiqueta remove todas as entradas
+marcadas com ela, como se fosse uma chave
+
+Invalidação: os módulos que usam cache marcam chaves na sessão durante o
+flush (marcar_para_invalidacao); as chaves são removidas de todos os
+caches registrados quando a transação termina. Publicadores registrados
+(barramento_invalidacao) repassam as chaves aos outros processos
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from database import SessionLocal
+
+
+# Sentinela para diferenciar "não está no cache" de um valor None
+AUSENTE = object()
+
+# Chave em session.info com as chaves a invalidar ao fim da transação
+_CHAVES_PENDENTES = "cache_invalidar"
+
+# Chave especial: limpa todos os caches
+TODAS = "*"
+
+
+@dataclass
+class EstatisticasCache:
+    """Contadores de uso de um cache"""
+    acertos: int = 0
+    falhas: int = 0
+    expulsoes: int = 0
+    invalidacoes: int = 0
+
+    @property
+    def taxa_acerto(self) -> float:
+        total = self.acertos + self.falhas
+        return round(self.acertos / total * 100, 2) if total else 0.0
+
+
+class BackendCache(ABC):
+    """Interface de um backend de cache"""
+
+    def __init__(self):
+        self.estatisticas = EstatisticasCache()
+
+    @abstractmethod
+    def obter(self, chave):
+        """Retorna o valor ou AUSENTE"""
+
+    @abstractmethod
+    def definir(self, chave, valor, ttl: float = None, etiquetas=()):
+        """Guarda o valor (ttl None = TTL padrão do backend)"""
+
+    @abstractmethod
+    def remover(self, chave) -> bool:
+        """Remove a chave e as entradas com essa etiqueta; retorna True se algo existia"""
+
+    @abstractmethod
+    def limpar(self):
+        """Remove todas as entradas"""
+
+    @abstractmethod
+    def __len__(self):
+        """Quantidade de entradas"""
+
+
+class CacheLRU(BackendCache):
+    """
+    Cache LRU em memória do processo, com TTL e limite de entradas
+    Seguro para uso entre threads
+    """
+
+    def __init__(self, tamanho_maximo: int = 1024, ttl: float = 300):
+        super().__init__()
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._dados = OrderedDict()  # chave -> (expira_em, valor, etiquetas)
+        self._etiquetas = {}  # etiqueta -> chaves marcadas com ela
+        self._lock = threading.Lock()
+
+    def _descartar(self, chave):
+        """Remove a entrada e suas etiquetas (com o lock)"""
+        _, _, etiquetas = self._dados.pop(chave)
+        for etiqueta in etiquetas:
+            chaves = self._etiquetas.get(etiqueta)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._etiquetas[etiqueta]
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+
+            if item is None:
+                self.estatisticas.falhas += 1
+                return AUSENTE
+
+            expira_em, valor, _ = item
+            if expira_em < time.monotonic():
+                self._descartar(chave)
+                self.estatisticas.falhas += 1
+                self.estatisticas.expulsoes += 1
+                return AUSENTE
+
+            self._dados.move_to_end(chave)
+            self.estatisticas.acertos += 1
+            return valor
+
+    def definir(self, chave, valor, ttl: float = None, etiquetas=()):
+        expira_em = time.monotonic() + (self.ttl if ttl is None else ttl)
+        etiquetas = frozenset(etiquetas)
+
+        with self._lock:
+            if chave in self._dados:
+                self._descartar(chave)
+            self._dados[chave] = (expira_em, valor, etiquetas)
+            for etiqueta in etiquetas:
+                self._etiquetas.setdefault(etiqueta, set()).add(chave)
+
+            # Expulsa as entradas usadas há mais tempo
+            while len(self._dados) > self.tamanho_maximo:
+                self._descartar(next(iter(self._dados)))
+                self.estatisticas.expulsoes += 1
+
+    def remover(self, chave) -> bool:
+        with self._lock:
+            chaves = set(self._etiquetas.get(chave, ()))
+            if chave in self._dados:
+                chaves.add(chave)
+            for removida in chaves:
+                self._descartar(removida)
+            self.estatisticas.invalidacoes += len(chaves)
+            return bool(chaves)
+
+    def limpar(self):
+        with self._lock:
+            self.estatisticas.invalidacoes += len(self._dados)
+            self._dados.clear()
+            self._etiquetas.clear()
+
+    def __len__(self):
+        return len(self._dados)
+
+
+# Caches do processo, por nome
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def registrar_cache(nome: str, backend: BackendCache) -> BackendCache:
+    """Registra (ou substitui) o backend usado por um cache nomeado"""
+    with _caches_lock:
+        _caches[nome] = backend
+    return backend
+
+
+def obter_cache(nome: str, tamanho_maximo: int = 1024, ttl: float = 300) -> BackendCache:
+    """Retorna o cache nomeado, criando um CacheLRU se ainda não existir"""
+    with _caches_lock:
+        if nome not in _caches:
+            _caches[nome] = CacheLRU(tamanho_maximo=tamanho_maximo, ttl=ttl)
+        return _caches[nome]
+
+
+def caches_registrados() -> dict:
+    """Cópia do dicionário nome -> backend"""
+    with _caches_lock:
+        return dict(_caches)
+
+
+def invalidar(chaves):
+    """Remove as chaves de todos os caches registrados (TODAS limpa tudo)"""
+    for backend in caches_registrados().values():
+        if TODAS in chaves:
+            backend.limpar()
+            continue
+        for chave in chaves:
+            backend.remover(chave)
+
+
+# Funções publicar(session, chaves) chamadas a cada nova chave marcada
+_publicadores = []
+
+
+def registrar_publicador(funcao):
+    """Registra um publicador de invalidações para outros processos"""
+    if funcao not in _publicadores:
+        _publicadores.append(funcao)
+    return funcao
+
+
+def marcar_para_invalidacao(session, chaves):
+    """
+    Agenda a invalidação das chaves para o fim da transação da sessão
+    Deve ser chamado nos eventos de flush
+    """
+    pendentes = session.info.setdefault(_CHAVES_PENDENTES, set())
+    novas = set(chaves) - pendentes
+    if not novas:
+        return
+    pendentes.update(novas)
+    for publicar in _publicadores:
+        publicar(session, novas)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidar_apos_commit(session):
+    chaves = session.info.pop(_CHAVES_PENDENTES, None)
+    if chaves:
+        invalidar(chaves)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _invalidar_apos_rollback(session):
+    # Um leitor da mesma sessão pode ter guardado dados ainda não
+    # confirmados; por segurança as chaves também saem no rollback
+    chaves = session.info.pop(_CHAVES_PENDENTES, None)
+    if chaves:
+        invalidar(chaves)
@@ -0,0 +1,120 @@
+"""
+Cache de dados de referência do processo (gêneros e status)
+Os gêneros são carregados uma única vez em um mapa imutável id <-> nome.
+Cada alteração em Genero incrementa a linha 'generos' de versoes_referencia
+na mesma transação; os processos conferem essa versão no máximo a cada
+REFERENCIA_INTERVALO_VERIFICACAO segundos e só recarregam quando ela muda
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from sqlalchemy import select, event
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import Genero, Status, VersaoReferencia
+from cache import obter_cache, marcar_para_invalidacao, AUSENTE
+import barramento_invalidacao  # noqa: F401 (publica as invalidações para outros processos)
+
+
+CHAVE_GENEROS = "referencia:generos"
+
+# Intervalo mínimo (s) entre consultas à versão dos gêneros
+INTERVALO_VERIFICACAO = float(os.getenv("REFERENCIA_INTERVALO_VERIFICACAO", 30))
+
+# Status é um enum fixo: basta um mapa imutável para resolver nomes
+STATUS_POR_NOME = MappingProxyType({
+    **{status.name: status for status in Status},
+    **{status.value: status for status in Status},
+})
+
+cache_referencia = obter_cache("referencia", tamanho_maximo=16, ttl=float("inf"))
+
+_lock = threading.Lock()
+_verificado_em = 0.0
+
+
+@dataclass(frozen=True)
+class CatalogoGeneros:
+    """Mapa imutável dos gêneros cadastrados"""
+    versao: int
+    generos: tuple  # ((id_genero, tipo_genero), ...) em ordem de id
+    por_id: MappingProxyType
+    por_nome: MappingProxyType
+
+    def id_por_nome(self, nome: str) -> int:
+        """Resolve o id do gênero pelo nome"""
+        if nome not in self.por_nome:
+            raise ValueError(f"Gênero desconhecido: {nome}")
+        return self.por_nome[nome]
+
+    def nome_por_id(self, id_genero: int) -> str:
+        """Resolve o nome do gênero pelo id"""
+        return self.por_id[id_genero]
+
+
+def resolver_status(nome: str) -> Status:
+    """Converte o nome ('CONCLUIDO') ou valor ('Concluido') em Status"""
+    if nome not in STATUS_POR_NOME:
+        raise ValueError(f"Status desconhecido: {nome}")
+    return STATUS_POR_NOME[nome]
+
+
+def _versao_atual(session: Session) -> int:
+    versao = session.execute(
+        select(VersaoReferencia.versao).where(VersaoReferencia.nome == "generos")
+    ).scalar()
+    return versao or 0
+
+
+def _carregar(session: Session, versao: int) -> CatalogoGeneros:
+    generos = tuple(session.execute(
+        select(Genero.id_genero, Genero.tipo_genero).order_by(Genero.id_genero)
+    ).tuples())
+
+    return CatalogoGeneros(
+        versao=versao,
+        generos=generos,
+        por_id=MappingProxyType(dict(generos)),
+        por_nome=MappingProxyType({nome: id_genero for id_genero, nome in generos}),
+    )
+
+
+def catalogo_generos(session: Session = None) -> CatalogoGeneros:
+    """
+    Retorna o catálogo de gêneros do processo
+    Só vai ao banco na primeira chamada, quando o intervalo de verificação
+    expira (uma leitura da versão) ou quando a versão mudou (recarga)
+    """
+    global _verificado_em
+
+    catalogo = cache_referencia.obter(CHAVE_GENEROS)
+    if catalogo is not AUSENTE and time.monotonic() - _verificado_em < INTERVALO_VERIFICACAO:
+        return catalogo
+
+    with _lock:
+        sessao_propria = session is None
+        if sessao_propria:
+            session = SessionLocal()
+
+        try:
+            versao = _versao_atual(session)
+            if catalogo is AUSENTE or catalogo.versao != versao:
+                catalogo = _carregar(session, versao)
+                cache_referencia.definir(CHAVE_GENEROS, catalogo)
+            _verificado_em = time.monotonic()
+        finally:
+            if sessao_propria:
+                session.close()
+
+    return catalogo
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _invalidar_catalogo_local(session, contexto_flush):
+    # A versão no banco é incrementada por models.genero; aqui apenas
+    # evitamos que o processo atual espere o intervalo de verificação
+    if any(isinstance(o, Genero) for o in (*session.new, *session.dirty, *session.deleted)):
+        marcar_para_invalidacao(session, [CHAVE_GENEROS])
@@ -0,0 +1,220 @@
+"""
+Detalhe de mangá com cache read-through
+O detalhe (gêneros, capítulos, avaliação e comentários em destaque) é
+montado uma vez em um DTO imutável e guardado no cache "detalhe_manga".
+A invalidação é feita pelos eventos de flush/commit da sessão sempre que
+o mangá, seus capítulos, avaliações, comentários ou gêneros mudam
+"""
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, func, event, inspect
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import (
+    Manga, Status, Capitulo, Genero, MangaGenero,
+    Avaliacao, Comentario, ComentarioArquivado, Leitor, LeitorManga
+)
+from cache import obter_cache, marcar_para_invalidacao, AUSENTE
+import barramento_invalidacao  # noqa: F401 (publica as invalidações para outros processos)
+
+
+# Comentários exibidos no detalhe
+TOTAL_COMENTARIOS_DESTAQUE = 3
+
+cache_detalhes = obter_cache(
+    "detalhe_manga",
+    tamanho_maximo=int(os.getenv("CACHE_DETALHE_TAMANHO", 1024)),
+    ttl=float(os.getenv("CACHE_DETALHE_TTL", 300)),
+)
+
+
+@dataclass(frozen=True)
+class GeneroDetalhe:
+    tipo_genero: str
+    principal: bool
+
+
+@dataclass(frozen=True)
+class CapituloDetalhe:
+    id_capitulo: int
+    numero_capitulo: int
+    titulo_capitulo: str
+    numero_paginas: int
+
+
+@dataclass(frozen=True)
+class ComentarioDetalhe:
+    codinome: str
+    texto_comentario: str
+    numero_curtidas: int
+
+
+@dataclass(frozen=True)
+class DetalheManga:
+    """Visão consolidada de um mangá (imutável, segura para compartilhar)"""
+    id_manga: int
+    titulo_manga: str
+    autor: str
+    status: Status
+    data_criacao: datetime
+    generos: tuple
+    capitulos: tuple
+    total_avaliacoes: int
+    media_avaliacoes: Optional[float]
+    total_comentarios: int
+    comentarios_destaque: tuple
+
+
+def chave_manga(id_manga: int) -> str:
+    """Chave de cache/invalidação de um mangá"""
+    return f"manga:{id_manga}"
+
+
+def montar_detalhe_manga(session: Session, id_manga: int) -> Optional[DetalheManga]:
+    """Monta o detalhe direto do banco (4 consultas, sem objetos ORM)"""
+    total_avaliacoes = (
+        select(func.count(Avaliacao.id_avaliacao))
+        .where(Avaliacao.id_manga == id_manga)
+        .scalar_subquery()
+    )
+    media_avaliacoes = (
+        select(func.avg(Avaliacao.nota))
+        .where(Avaliacao.id_manga == id_manga)
+        .scalar_subquery()
+    )
+    total_comentarios = (
+        select(func.count(Comentario.id_comentario))
+        .where(Comentario.id_manga == id_manga)
+        .scalar_subquery()
+    )
+    total_arquivados = (
+        select(func.count(ComentarioArquivado.id_comentario))
+        .where(ComentarioArquivado.id_manga == id_manga)
+        .scalar_subquery()
+    )
+
+    manga = session.execute(
+        select(
+            Manga.id_manga,
+            Manga.titulo_manga,
+            Manga.autor,
+            Manga.status,
+            Manga.data_criacao,
+            total_avaliacoes.label("total_avaliacoes"),
+            media_avaliacoes.label("media_avaliacoes"),
+            (total_comentarios + total_arquivados).label("total_comentarios"),
+        ).where(Manga.id_manga == id_manga)
+    ).first()
+
+    if manga is None:
+        return None
+
+    generos = session.execute(
+        select(Genero.tipo_genero, MangaGenero.principal)
+        .join(MangaGenero, MangaGenero.id_genero == Genero.id_genero)
+        .where(MangaGenero.id_manga == id_manga)
+        .order_by(MangaGenero.principal.desc(), Genero.tipo_genero)
+    ).all()
+
+    capitulos = session.execute(
+        select(
+            Capitulo.id_capitulo,
+            Capitulo.numero_capitulo,
+            Capitulo.titulo_capitulo,
+            Capitulo.numero_paginas,
+        )
+        .where(Capitulo.id_manga == id_manga)
+        .order_by(Capitulo.numero_capitulo)
+    ).all()
+
+    comentarios = session.execute(
+        select(Leitor.codinome, Comentario.texto_comentario, Comentario.numero_curtidas)
+        .join(Leitor, Leitor.id_usuario == Comentario.id_leitor)
+        .where(Comentario.id_manga == id_manga)
+        .order_by(Comentario.numero_curtidas.desc(), Comentario.data_criacao.desc())
+        .limit(TOTAL_COMENTARIOS_DESTAQUE)
+    ).all()
+
+    media = manga.media_avaliacoes
+    return DetalheManga(
+        id_manga=manga.id_manga,
+        titulo_manga=manga.titulo_manga,
+        autor=manga.autor,
+        status=manga.status,
+        data_criacao=manga.data_criacao,
+        generos=tuple(GeneroDetalhe(g.tipo_genero, bool(g.principal)) for g in generos),
+        capitulos=tuple(CapituloDetalhe(*c) for c in capitulos),
+        total_avaliacoes=manga.total_avaliacoes,
+        media_avaliacoes=round(float(media), 2) if media is not None else None,
+        total_comentarios=manga.total_comentarios,
+        comentarios_destaque=tuple(
+            ComentarioDetalhe(c.codinome, c.texto_comentario, c.numero_curtidas or 0)
+            for c in comentarios
+        ),
+    )
+
+
+def obter_detalhe_manga(session: Session, id_manga: int) -> Optional[DetalheManga]:
+    """Retorna o detalhe do mangá, do cache quando possível"""
+    chave = chave_manga(id_manga)
+
+    detalhe = cache_detalhes.obter(chave)
+    if detalhe is not AUSENTE:
+        return detalhe
+
+    detalhe = montar_detalhe_manga(session, id_manga)
+    if detalhe is not None:
+        cache_detalhes.definir(chave, detalhe)
+    return detalhe
+
+
+def aquecer_cache(session: Session, top_n: int = 10) -> int:
+    """
+    Pré-carrega no cache os `top_n` mangás com mais leitores
+    Retorna quantos detalhes foram carregados
+    """
+    ids = session.execute(
+        select(LeitorManga.id_manga)
+        .group_by(LeitorManga.id_manga)
+        .order_by(func.count(LeitorManga.id).desc())
+        .limit(top_n)
+    ).scalars().all()
+
+    for id_manga in ids:
+        detalhe = montar_detalhe_manga(session, id_manga)
+        if detalhe is not None:
+            cache_detalhes.definir(chave_manga(id_manga), detalhe)
+
+    return len(ids)
+
+
+def _ids_manga_afetados(session, objeto) -> set:
+    """Mangás cujo detalhe depende do objeto alterado"""
+    if isinstance(objeto, Manga):
+        return {objeto.id_manga}
+
+    if isinstance(objeto, (Capitulo, Avaliacao, Comentario, MangaGenero)):
+        # Inclui o mangá anterior caso o objeto tenha mudado de mangá
+        historico = inspect(objeto).attrs.id_manga.history
+        return {objeto.id_manga, *historico.deleted}
+
+    if isinstance(objeto, Genero) and objeto.id_genero is not None:
+        return set(session.connection().execute(
+            select(MangaGenero.id_manga).where(MangaGenero.id_genero == objeto.id_genero)
+        ).scalars())
+
+    return set()
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _coletar_invalidacoes(session, contexto_flush):
+    ids = set()
+    for objeto in (*session.new, *session.dirty, *session.deleted):
+        ids |= _ids_manga_afetados(session, objeto)
+
+    ids.discard(None)
+    if ids:
+        marcar_para_invalidacao(session, [chave_manga(i) for i in ids])
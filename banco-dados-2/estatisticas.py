@@ -0,0 +1,171 @@
+"""
+Estatísticas gerais do sistema em uma única ida ao banco
+Todos os contadores, a quebra por status e por gênero e o mangá mais bem
+avaliado vêm de um único SELECT com UNION ALL. No modo estimado, as
+tabelas grandes usam pg_class.reltuples em vez de COUNT(*) (nas
+particionadas, a soma das partições: a tabela mãe nunca é analisada
+pelo autovacuum e fica com reltuples -1). Comentários
+somam a tabela quente e o arquivo (arquivamento.py). O resultado fica em
+cache por ESTATISTICAS_TTL segundos
+"""
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    select, union_all, func, literal, cast, null, case,
+    String, Float, BigInteger, table, column
+)
+from sqlalchemy.orm import Session
+from models import (
+    Usuario, Manga, Status, Genero, MangaGenero,
+    Capitulo, Avaliacao, Comentario, ComentarioArquivado
+)
+from cache import obter_cache, AUSENTE
+
+
+# Contadores de tabelas que crescem sem limite (aceitam contagem
+# aproximada) -> tabelas somadas no contador
+TABELAS_GRANDES = {
+    "capitulos": (Capitulo,),
+    "avaliacoes": (Avaliacao,),
+    "comentarios": (Comentario, ComentarioArquivado),
+}
+
+cache_estatisticas = obter_cache(
+    "estatisticas",
+    tamanho_maximo=4,
+    ttl=float(os.getenv("ESTATISTICAS_TTL", 30)),
+)
+
+_pg_class = table("pg_class", column("oid"), column("reltuples"))
+_pg_inherits = table("pg_inherits", column("inhrelid"), column("inhparent"))
+
+
+@dataclass
+class EstatisticasGerais:
+    """Contadores do painel de estatísticas"""
+    total_usuarios: int = 0
+    total_leitores: int = 0
+    total_administradores: int = 0
+    total_mangas: int = 0
+    total_capitulos: int = 0
+    total_avaliacoes: int = 0
+    total_comentarios: int = 0
+    por_status: dict = field(default_factory=dict)
+    por_genero: dict = field(default_factory=dict)
+    manga_top: Optional[tuple] = None  # (titulo, media)
+    estimado: bool = False
+    gerado_em: datetime = field(default_factory=datetime.now)
+
+
+def _linha(categoria: str, chave, total, valor=None):
+    """Padroniza as colunas de cada parte do UNION ALL"""
+    return (
+        literal(categoria).label("categoria"),
+        cast(chave, String).label("chave"),
+        cast(total, BigInteger).label("total"),
+        cast(valor if valor is not None else null(), Float).label("valor"),
+    )
+
+
+def _contagem_tabela(nome: str, modelos, estimar: bool):
+    """COUNT(*) exato ou estimativa do planner, somados sobre as tabelas do contador"""
+    partes = [_estimativa(modelo) if estimar else _contagem_exata(modelo) for modelo in modelos]
+    return select(*_linha("tabela", literal(nome), sum(partes[1:], partes[0])))
+
+
+def _contagem_exata(modelo):
+    return select(func.count()).select_from(modelo).scalar_subquery()
+
+
+def _estimativa(modelo):
+    oid = func.to_regclass(modelo.__tablename__)
+    particao = _pg_class.alias("particao")
+    # Partições ainda não analisadas contam 0; nenhuma analisada -> NULL
+    soma_particoes = (
+        select(func.sum(func.greatest(particao.c.reltuples, 0)))
+        .select_from(_pg_inherits.join(particao, particao.c.oid == _pg_inherits.c.inhrelid))
+        .where(_pg_inherits.c.inhparent == oid)
+        .having(func.max(particao.c.reltuples) >= 0)
+        .scalar_subquery()
+    )
+    propria = select(_pg_class.c.reltuples).where(_pg_class.c.oid == oid).scalar_subquery()
+    reltuples = func.coalesce(soma_particoes, propria)
+    # reltuples < 0: tabela nunca analisada, cai para a contagem exata
+    return case((reltuples >= 0, reltuples), else_=_contagem_exata(modelo))
+
+
+def consulta_estatisticas(estimar: bool = False):
+    """Monta o SELECT único com todas as partes do painel"""
+    media = func.avg(Avaliacao.nota)
+    top = (
+        select(Manga.titulo_manga.label("titulo"), media.label("media"))
+        .join(Avaliacao, Avaliacao.id_manga == Manga.id_manga)
+        .group_by(Manga.id_manga, Manga.titulo_manga)
+        .order_by(media.desc())
+        .limit(1)
+        .subquery()
+    )
+
+    partes = [
+        # Usuários por tipo (leitor/administrador)
+        select(*_linha("usuario", Usuario.tipo, func.count()))
+        .group_by(Usuario.tipo),
+        # Mangás por status
+        select(*_linha("status", Manga.status, func.count()))
+        .group_by(Manga.status),
+        # Mangás por gênero
+        select(*_linha("genero", Genero.tipo_genero, func.count(MangaGenero.id_manga)))
+        .select_from(Genero)
+        .outerjoin(MangaGenero, MangaGenero.id_genero == Genero.id_genero)
+        .group_by(Genero.id_genero, Genero.tipo_genero),
+        # Mangá mais bem avaliado
+        select(*_linha("top", top.c.titulo, literal(1), top.c.media)),
+    ]
+    partes += [
+        _contagem_tabela(nome, modelos, estimar)
+        for nome, modelos in TABELAS_GRANDES.items()
+    ]
+
+    return union_all(*partes)
+
+
+def coletar_estatisticas(session: Session, estimar: bool = False,
+                         usar_cache: bool = True) -> EstatisticasGerais:
+    """
+    Retorna as estatísticas gerais (do cache quando ainda válidas)
+    `estimar` só tem efeito no PostgreSQL
+    """
+    estimar = estimar and session.get_bind().dialect.name == "postgresql"
+    chave = f"estatisticas:{'estimado' if estimar else 'exato'}"
+
+    if usar_cache:
+        estatisticas = cache_estatisticas.obter(chave)
+        if estatisticas is not AUSENTE:
+            return estatisticas
+
+    estatisticas = EstatisticasGerais(estimado=estimar)
+
+    for categoria, chave_linha, total, valor in session.execute(consulta_estatisticas(estimar)):
+        total = int(total or 0)
+
+        if categoria == "usuario":
+            estatisticas.total_usuarios += total
+            if chave_linha == "leitor":
+                estatisticas.total_leitores = total
+            elif chave_linha == "administrador":
+                estatisticas.total_administradores = total
+        elif categoria == "status":
+            estatisticas.por_status[Status[chave_linha]] = total
+            estatisticas.total_mangas += total
+        elif categoria == "genero":
+            estatisticas.por_genero[chave_linha] = total
+        elif categoria == "top":
+            estatisticas.manga_top = (chave_linha, round(float(valor), 2))
+        elif categoria == "tabela":
+            setattr(estatisticas, f"total_{chave_linha}", total)
+
+    cache_estatisticas.definir(chave, estatisticas)
+    return estatisticas
@@ -0,0 +1,274 @@
+"""
+Execução concorrente de relatórios
+Cada relatório registrado roda em uma thread própria, com sua própria sessão
+(e conexão do pool) em transação somente leitura. No PostgreSQL o limite de
+tempo é aplicado no servidor (statement_timeout) e, como garantia, o
+coordenador cancela a consulta com pg_cancel_backend quando o prazo vence.
+No SQLite o cancelamento usa o interrupt() do driver
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from database import SessionLocal, engine
+from relatorios import RELATORIOS
+
+
+# Limite de tempo (s) de cada relatório
+TIMEOUT_PADRAO = float(os.getenv("RELATORIO_TIMEOUT", 30))
+
+# Relatórios executados ao mesmo tempo (cada um ocupa uma conexão do pool)
+PARALELOS_PADRAO = int(os.getenv("RELATORIOS_PARALELOS", 4))
+
+# SQLSTATE de consulta cancelada (statement_timeout ou pg_cancel_backend)
+_PG_CONSULTA_CANCELADA = "57014"
+
+
+@dataclass
+class ResultadoRelatorio:
+    """Resultado de um relatório executado pelo executor"""
+    nome: str
+    situacao: str = "pendente"  # ok | erro | timeout | cancelado
+    colunas: tuple = ()
+    linhas: list = field(default_factory=list)
+    segundos: float = 0.0
+    erro: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.situacao == "ok"
+
+
+@dataclass
+class ExecucaoRelatorios:
+    """Resultados de uma rodada do executor, na ordem em que foram pedidos"""
+    resultados: dict
+    segundos: float
+
+    def __getitem__(self, nome: str) -> ResultadoRelatorio:
+        return self.resultados[nome]
+
+    def __iter__(self):
+        return iter(self.resultados.values())
+
+
+class _Execucao:
+    """Estado compartilhado entre a thread do relatório e o coordenador"""
+
+    def __init__(self, nome: str, parametros: dict, timeout: float):
+        self.nome = nome
+        self.parametros = parametros
+        self.timeout = timeout
+        self.inicio = None         # time.monotonic() ao começar
+        self.pid = None            # pg_backend_pid() da conexão (PostgreSQL)
+        self.conexao_dbapi = None  # conexão do driver (SQLite)
+        self.motivo_cancelamento = None
+        self.lock = threading.Lock()
+
+    @property
+    def prazo(self) -> Optional[float]:
+        return None if self.inicio is None else self.inicio + self.timeout
+
+
+def _descrever_erro(erro: Exception) -> str:
+    mensagem = str(getattr(erro, "orig", None) or erro).strip()
+    return mensagem.splitlines()[0] if mensagem else type(erro).__name__
+
+
+def _executar(execucao: _Execucao) -> ResultadoRelatorio:
+    """Roda um relatório em uma sessão própria (executado na thread do pool)"""
+    resultado = ResultadoRelatorio(execucao.nome)
+    inicio = time.perf_counter()
+
+    with execucao.lock:
+        if execucao.motivo_cancelamento:
+            resultado.situacao = execucao.motivo_cancelamento
+            return resultado
+        execucao.inicio = time.monotonic()
+
+    session = SessionLocal()
+    try:
+        conexao = session.connection()
+
+        if conexao.dialect.name == "postgresql":
+            # Precisam ser os primeiros comandos da transação
+            conexao.exec_driver_sql("SET TRANSACTION READ ONLY")
+            conexao.exec_driver_sql(
+                f"SET LOCAL statement_timeout = {max(1, int(execucao.timeout * 1000))}"
+            )
+            pid = conexao.exec_driver_sql("SELECT pg_backend_pid()").scalar()
+            with execucao.lock:
+                execucao.pid = pid
+        else:
+            with execucao.lock:
+                execucao.conexao_dbapi = conexao.connection.dbapi_connection
+
+        consulta = RELATORIOS[execucao.nome](**execucao.parametros)
+        linhas = session.execute(consulta)
+        resultado.colunas = tuple(linhas.keys())
+        resultado.linhas = linhas.all()
+        resultado.situacao = "ok"
+
+    except DBAPIError as e:
+        if execucao.motivo_cancelamento:
+            resultado.situacao = execucao.motivo_cancelamento
+        elif getattr(e.orig, "pgcode", None) == _PG_CONSULTA_CANCELADA:
+            resultado.situacao = "timeout"
+        else:
+            resultado.situacao = "erro"
+        resultado.erro = _descrever_erro(e)
+
+    except Exception as e:
+        resultado.situacao = "erro"
+        resultado.erro = _descrever_erro(e)
+
+    finally:
+        with execucao.lock:
+            execucao.pid = None
+            execucao.conexao_dbapi = None
+        # Somente leitura: nada a confirmar
+        session.rollback()
+        session.close()
+        resultado.segundos = time.perf_counter() - inicio
+
+    return resultado
+
+
+def _cancelar(execucao: _Execucao, motivo: str):
+    """Interrompe a consulta em andamento de um relatório"""
+    with execucao.lock:
+        if execucao.motivo_cancelamento:
+            return
+        execucao.motivo_cancelamento = motivo
+
+        if execucao.pid is not None:
+            # A conexão do relatório está ocupada: o cancelamento vai por outra
+            with engine.connect() as conexao:
+                conexao.execute(text("SELECT pg_cancel_backend(:pid)"), {"pid": execucao.pid})
+        elif execucao.conexao_dbapi is not None and hasattr(execucao.conexao_dbapi, "interrupt"):
+            execucao.conexao_dbapi.interrupt()
+
+
+def executar_relatorios(nomes=None, parametros: dict = None,
+                        timeout: float = TIMEOUT_PADRAO,
+                        max_workers: int = PARALELOS_PADRAO) -> ExecucaoRelatorios:
+    """
+    Executa relatórios registrados em paralelo
+    `nomes` padrão: todos os relatórios de RELATORIOS
+    `parametros`: argumentos por relatório, ex. {"top_mangas_avaliados": {"limite": 10}}
+    """
+    nomes = list(nomes or RELATORIOS)
+    parametros = parametros or {}
+
+    desconhecidos = [nome for nome in nomes if nome not in RELATORIOS]
+    if desconhecidos:
+        raise KeyError(f"Relatórios desconhecidos: {', '.join(desconhecidos)}")
+
+    execucoes = [_Execucao(nome, parametros.get(nome, {}), timeout) for nome in nomes]
+    inicio = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="relatorio") as executor:
+        futuros = {executor.submit(_executar, execucao): execucao for execucao in execucoes}
+        pendentes = set(futuros)
+
+        try:
+            while pendentes:
+                prazos = [
+                    futuros[f].prazo for f in pendentes
+                    if futuros[f].prazo is not None and not futuros[f].motivo_cancelamento
+                ]
+                espera = max(0.01, min(prazos) - time.monotonic()) if prazos else 0.05
+                _, pendentes = wait(pendentes, timeout=espera, return_when=FIRST_COMPLETED)
+
+                agora = time.monotonic()
+                for futuro in pendentes:
+                    execucao = futuros[futuro]
+                    if execucao.prazo is not None and agora >= execucao.prazo:
+                        _cancelar(execucao, "timeout")
+
+        except KeyboardInterrupt:
+            for futuro, execucao in futuros.items():
+                futuro.cancel()
+                _cancelar(execucao, "cancelado")
+            raise
+
+    resultados = {}
+    for futuro, execucao in futuros.items():
+        if futuro.cancelled():
+            resultados[execucao.nome] = ResultadoRelatorio(execucao.nome, situacao="cancelado")
+        else:
+            resultados[execucao.nome] = futuro.result()
+
+    return ExecucaoRelatorios(resultados, time.perf_counter() - inicio)
+
+
+def _formatar(valor) -> str:
+    if isinstance(valor, Enum):
+        return str(valor.value)
+    if isinstance(valor, float):
+        return f"{valor:.2f}"
+    return "" if valor is None else str(valor)
+
+
+def imprimir_resultado(resultado: ResultadoRelatorio):
+    """Imprime um relatório em formato de tabela"""
+    titulo = (RELATORIOS[resultado.nome].__doc__ or resultado.nome).strip().splitlines()[0]
+    print("\n" + "=" * 80)
+    print(f"  {titulo}")
+    print("=" * 80 + "\n")
+
+    if not resultado.ok:
+        print(f"✗ {resultado.situacao}: {resultado.erro or 'sem resultado'}")
+        return
+
+    linhas = [[_formatar(v) for v in linha] for linha in resultado.linhas]
+    larguras = [
+        max([len(coluna)] + [len(linha[i]) for linha in linhas])
+        for i, coluna in enumerate(resultado.colunas)
+    ]
+
+    print("  ".join(c.ljust(l) for c, l in zip(resultado.colunas, larguras)))
+    print("-" * (sum(larguras) + 2 * (len(larguras) - 1)))
+    for linha in linhas:
+        print("  ".join(v.ljust(l) for v, l in zip(linha, larguras)))
+
+    print(f"\n✓ {len(linhas)} linha(s)")
+
+
+def imprimir_tempos(execucao: ExecucaoRelatorios):
+    """Imprime a tabela de tempos de uma rodada do executor"""
+    print(f"\n{'Relatório':<32} {'Situação':<10} {'Linhas':>8} {'Tempo':>10}")
+    print("-" * 64)
+    for r in execucao:
+        print(f"{r.nome:<32} {r.situacao:<10} {len(r.linhas):>8} {r.segundos * 1000:>8.1f}ms")
+    print("-" * 64)
+
+    soma = sum(r.segundos for r in execucao)
+    print(f"{'Soma dos relatórios':<52} {soma * 1000:>8.1f}ms")
+    print(f"{'Tempo total (paralelo)':<52} {execucao.segundos * 1000:>8.1f}ms")
+
+
+def main():
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Executa relatórios em paralelo")
+    parser.add_argument("relatorios", nargs="*", help="Relatórios registrados (padrão: todos)")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_PADRAO, help="Limite por relatório (s)")
+    parser.add_argument("--paralelo", type=int, default=PARALELOS_PADRAO, help="Relatórios simultâneos")
+    args = parser.parse_args()
+
+    execucao = executar_relatorios(args.relatorios, timeout=args.timeout, max_workers=args.paralelo)
+
+    for resultado in execucao:
+        imprimir_resultado(resultado)
+    imprimir_tempos(execucao)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Exportação em streaming de relatórios e tabelas
+Lê os resultados por cursor do lado do servidor (stream_results/yield_per)
+e grava CSV, JSON Lines ou Parquet em lotes de tamanho fixo, mantendo o uso
+de memória constante independentemente do tamanho do resultado
+
+Uso:
+    python exportacao.py comentarios avaliacoes leitor_manga --formato csv
+    python exportacao.py top_mangas_avaliados --formato jsonl --saida exportacoes
+"""
+import argparse
+import csv
+import enum
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import select, Integer, Float, Numeric, Boolean, DateTime, Date
+from database import Base, get_session
+from relatorios import RELATORIOS
+import models  # noqa: F401 - registra as tabelas no metadata
+
+
+# Tabelas que podem ser exportadas inteiras
+# (usuarios fica de fora por conter hashes de senha)
+TABELAS_EXPORTAVEIS = (
+    "comentarios", "avaliacoes", "leitor_manga",
+    "mangas", "capitulos", "generos", "manga_genero",
+)
+
+FORMATOS = ("csv", "jsonl", "parquet")
+TAMANHO_LOTE_PADRAO = 5000
+
+
+@dataclass
+class ResultadoExportacao:
+    """Resumo de uma exportação concluída"""
+    alvo: str
+    caminho: str
+    linhas: int
+    segundos: float
+
+
+def _valor_texto(valor):
+    """Converte um valor do banco para tipo serializável em CSV/JSON"""
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return valor
+
+
+def _valor_parquet(valor):
+    """Converte um valor do banco para tipo aceito pelo pyarrow"""
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return valor
+
+
+class EscritorCSV:
+    """Grava lotes em CSV com cabeçalho"""
+    extensao = "csv"
+
+    def __init__(self, caminho: str, colunas: list, tipos: list):
+        self.arquivo = open(caminho, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.arquivo)
+        self.writer.writerow(colunas)
+
+    def escrever_lote(self, linhas):
+        self.writer.writerows([_valor_texto(v) for v in linha] for linha in linhas)
+
+    def fechar(self):
+        self.arquivo.close()
+
+
+class EscritorJSONL:
+    """Grava lotes em JSON Lines (um objeto por linha)"""
+    extensao = "jsonl"
+
+    def __init__(self, caminho: str, colunas: list, tipos: list):
+        self.arquivo = open(caminho, "w", encoding="utf-8")
+        self.colunas = colunas
+
+    def escrever_lote(self, linhas):
+        self.arquivo.writelines(
+            json.dumps(
+                {coluna: _valor_texto(v) for coluna, v in zip(self.colunas, linha)},
+                ensure_ascii=False
+            ) + "\n"
+            for linha in linhas
+        )
+
+    def fechar(self):
+        self.arquivo.close()
+
+
+class EscritorParquet:
+    """Grava cada lote como um row group Parquet (requer pyarrow)"""
+    extensao = "parquet"
+
+    def __init__(self, caminho: str, colunas: list, tipos: list):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError(
+                "Exportação Parquet requer pyarrow: uv sync --extra parquet"
+            )
+
+        self.pa = pa
+        self.colunas = colunas
+        self.schema = pa.schema(
+            [(coluna, self._tipo_arrow(tipo)) for coluna, tipo in zip(colunas, tipos)]
+        )
+        self.writer = pq.ParquetWriter(caminho, self.schema)
+
+    def _tipo_arrow(self, tipo):
+        """Mapeia o tipo SQLAlchemy da coluna para o tipo Arrow"""
+        pa = self.pa
+        if isinstance(tipo, Boolean):
+            return pa.bool_()
+        if isinstance(tipo, Integer):
+            return pa.int64()
+        if isinstance(tipo, (Float, Numeric)):
+            return pa.float64()
+        if isinstance(tipo, DateTime):
+            return pa.timestamp("us")
+        if isinstance(tipo, Date):
+            return pa.date32()
+        return pa.string()
+
+    def escrever_lote(self, linhas):
+        dados = {
+            coluna: [_valor_parquet(linha[i]) for linha in linhas]
+            for i, coluna in enumerate(self.colunas)
+        }
+        self.writer.write_table(self.pa.Table.from_pydict(dados, schema=self.schema))
+
+    def fechar(self):
+        self.writer.close()
+
+
+ESCRITORES = {
+    "csv": EscritorCSV,
+    "jsonl": EscritorJSONL,
+    "parquet": EscritorParquet,
+}
+
+
+def consulta_do_alvo(alvo: str):
+    """Retorna o SELECT de um relatório registrado ou de uma tabela inteira"""
+    if alvo in RELATORIOS:
+        return RELATORIOS[alvo]()
+
+    if alvo in TABELAS_EXPORTAVEIS:
+        tabela = Base.metadata.tables[alvo]
+        # Ordenar pela PK mantém a saída determinística
+        return select(tabela).order_by(*tabela.primary_key.columns)
+
+    raise KeyError(
+        f"Alvo desconhecido: {alvo}. "
+        f"Use um relatório ({', '.join(RELATORIOS)}) "
+        f"ou uma tabela ({', '.join(TABELAS_EXPORTAVEIS)})"
+    )
+
+
+def exportar(alvo: str, formato: str = "csv", diretorio: str = "exportacoes",
+             tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> ResultadoExportacao:
+    """
+    Exporta um relatório ou tabela para arquivo
+
+    Os registros são lidos em lotes de `tamanho_lote` por cursor do lado
+    do servidor e gravados à medida que chegam; nenhum objeto ORM é criado
+    """
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato inválido: {formato}. Use {', '.join(FORMATOS)}")
+
+    consulta = consulta_do_alvo(alvo)
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, f"{alvo}.{ESCRITORES[formato].extensao}")
+
+    inicio = time.perf_counter()
+    linhas = 0
+    session = get_session()
+
+    try:
+        resultado = session.execute(
+            consulta.execution_options(stream_results=True, yield_per=tamanho_lote)
+        )
+        colunas = list(resultado.keys())
+        tipos = [coluna.type for coluna in consulta.selected_columns]
+
+        escritor = ESCRITORES[formato](caminho, colunas, tipos)
+        try:
+            for lote in resultado.partitions(tamanho_lote):
+                escritor.escrever_lote(lote)
+                linhas += len(lote)
+        finally:
+            escritor.fechar()
+
+    finally:
+        session.close()
+
+    return ResultadoExportacao(alvo, caminho, linhas, time.perf_counter() - inicio)
+
+
+def exportar_em_paralelo(alvos: list, formato: str = "csv", diretorio: str = "exportacoes",
+                         tamanho_lote: int = TAMANHO_LOTE_PADRAO, max_workers: int = 4) -> list:
+    """
+    Exporta vários alvos independentes em paralelo
+    Cada thread usa sua própria sessão (e conexão do pool)
+    """
+    resultados = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {
+            executor.submit(exportar, alvo, formato, diretorio, tamanho_lote): alvo
+            for alvo in alvos
+        }
+        for futuro in as_completed(futuros):
+            resultados.append(futuro.result())
+
+    return resultados
+
+
+def main():
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Exporta relatórios e tabelas em streaming")
+    parser.add_argument("alvos", nargs="+", help="Relatórios registrados ou tabelas")
+    parser.add_argument("--formato", choices=FORMATOS, default="csv")
+    parser.add_argument("--saida", default="exportacoes", help="Diretório de saída")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_PADRAO, help="Linhas por lote")
+    parser.add_argument("--paralelo", type=int, default=4, help="Exportações simultâneas")
+    args = parser.parse_args()
+
+    resultados = exportar_em_paralelo(
+        args.alvos, args.formato, args.saida, args.lote, args.paralelo
+    )
+
+    print(f"\n{'Alvo':<30} {'Linhas':>10} {'Tempo':>10}  Arquivo")
+    print("-" * 80)
+    for r in resultados:
+        print(f"{r.alvo:<30} {r.linhas:>10} {r.segundos:>9.2f}s  {r.caminho}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Evolução das avaliações de um mangá
+Lê apenas os agregados diários (avaliacoes_diarias): uma série de anos
+custa algumas centenas de linhas, sem varrer avaliacoes. Cada dia reúne as
+avaliações criadas nele com a nota atual (uma edição muda a nota no dia
+original da avaliação).
+
+    python historico_avaliacoes.py 1 --periodo mes --dias 365
+"""
+import argparse
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from database import SessionLocal, engine
+from models import AvaliacaoDiaria, Manga
+from models.avaliacao_diaria import CONTADORES, FAIXAS_NOTA
+
+
+PERIODOS = ("dia", "semana", "mes")
+
+
+@dataclass(slots=True, frozen=True)
+class PontoTendencia:
+    """Avaliações de um período e a média acumulada até o fim dele"""
+    inicio: date
+    total: int
+    media: Optional[float]
+    media_acumulada: Optional[float]
+    histograma: tuple
+
+
+@dataclass(slots=True, frozen=True)
+class VariacaoNota:
+    """Média antes e depois de uma janela e as avaliações recebidas nela"""
+    id_manga: int
+    desde: date
+    media_anterior: Optional[float]
+    media_atual: Optional[float]
+    total_periodo: int
+    media_periodo: Optional[float]
+
+    @property
+    def variacao(self) -> Optional[float]:
+        if self.media_anterior is None or self.media_atual is None:
+            return None
+        return self.media_atual - self.media_anterior
+
+
+def inicio_periodo(dia: date, periodo: str) -> date:
+    """Primeiro dia do período (semana começa na segunda)"""
+    if periodo == "semana":
+        return dia - timedelta(days=dia.weekday())
+    if periodo == "mes":
+        return dia.replace(day=1)
+    return dia
+
+
+def _media(soma_centesimos, total) -> Optional[float]:
+    return round(soma_centesimos / 100 / total, 2) if total else None
+
+
+def _totais_ate(session: Session, id_manga: int, antes_de: Optional[date]) -> tuple:
+    """(total, soma em centésimos) das avaliações criadas antes do dia"""
+    if antes_de is None:
+        return 0, 0
+    total, soma = session.execute(
+        select(func.coalesce(func.sum(AvaliacaoDiaria.total), 0),
+               func.coalesce(func.sum(AvaliacaoDiaria.soma_centesimos), 0))
+        .where(AvaliacaoDiaria.id_manga == id_manga, AvaliacaoDiaria.dia < antes_de)
+    ).one()
+    return total, soma
+
+
+def tendencia_nota(session: Session, id_manga: int, inicio: Optional[date] = None,
+                   fim: Optional[date] = None, periodo: str = "dia") -> list:
+    """
+    Série de PontoTendencia por dia, semana ou mês entre `inicio` e `fim`
+    (inclusive). Períodos sem avaliações não aparecem
+    """
+    if periodo not in PERIODOS:
+        raise ValueError(f"Período inválido: {periodo}. Use {', '.join(PERIODOS)}")
+
+    consulta = select(AvaliacaoDiaria).where(AvaliacaoDiaria.id_manga == id_manga)
+    if inicio is not None:
+        consulta = consulta.where(AvaliacaoDiaria.dia >= inicio)
+    if fim is not None:
+        consulta = consulta.where(AvaliacaoDiaria.dia <= fim)
+
+    # Poucas linhas por mangá: o agrupamento em períodos é feito aqui
+    periodos = {}
+    for dia in session.execute(consulta.order_by(AvaliacaoDiaria.dia)).scalars():
+        contadores = periodos.setdefault(inicio_periodo(dia.dia, periodo), dict.fromkeys(CONTADORES, 0))
+        for coluna in CONTADORES:
+            contadores[coluna] += getattr(dia, coluna)
+
+    total_acumulado, soma_acumulada = _totais_ate(session, id_manga, inicio)
+    pontos = []
+    for comeco, contadores in periodos.items():
+        total_acumulado += contadores["total"]
+        soma_acumulada += contadores["soma_centesimos"]
+        pontos.append(PontoTendencia(
+            comeco,
+            contadores["total"],
+            _media(contadores["soma_centesimos"], contadores["total"]),
+            _media(soma_acumulada, total_acumulado),
+            tuple(contadores[f"notas_{faixa}"] for faixa in FAIXAS_NOTA),
+        ))
+    return pontos
+
+
+def distribuicao_notas(session: Session, id_manga: int, inicio: Optional[date] = None,
+                       fim: Optional[date] = None) -> tuple:
+    """Histograma (avaliações por faixa 0..5) no intervalo"""
+    consulta = (
+        select(*(func.coalesce(func.sum(getattr(AvaliacaoDiaria, f"notas_{faixa}")), 0) for faixa in FAIXAS_NOTA))
+        .where(AvaliacaoDiaria.id_manga == id_manga)
+    )
+    if inicio is not None:
+        consulta = consulta.where(AvaliacaoDiaria.dia >= inicio)
+    if fim is not None:
+        consulta = consulta.where(AvaliacaoDiaria.dia <= fim)
+    return tuple(session.execute(consulta).one())
+
+
+def variacao_nota(session: Session, id_manga: int, dias: int = 30) -> VariacaoNota:
+    """Quanto a média do mangá mudou com as avaliações dos últimos `dias` dias"""
+    desde = date.today() - timedelta(days=dias - 1)
+    total_anterior, soma_anterior = _totais_ate(session, id_manga, desde)
+    total_periodo, soma_periodo = session.execute(
+        select(func.coalesce(func.sum(AvaliacaoDiaria.total), 0),
+               func.coalesce(func.sum(AvaliacaoDiaria.soma_centesimos), 0))
+        .where(AvaliacaoDiaria.id_manga == id_manga, AvaliacaoDiaria.dia >= desde)
+    ).one()
+    return VariacaoNota(
+        id_manga,
+        desde,
+        _media(soma_anterior, total_anterior),
+        _media(soma_anterior + soma_periodo, total_anterior + total_periodo),
+        total_periodo,
+        _media(soma_periodo, total_periodo),
+    )
+
+
+def main():
+    """Mostra a evolução da nota de um mangá"""
+    parser = argparse.ArgumentParser(description="Evolução das avaliações de um mangá")
+    parser.add_argument("id_manga", type=int)
+    parser.add_argument("--periodo", choices=PERIODOS, default="dia")
+    parser.add_argument("--dias", type=int, default=30, help="Janela a partir de hoje")
+    args = parser.parse_args()
+
+    engine.echo = False
+    session = SessionLocal()
+    try:
+        manga = session.get(Manga, args.id_manga)
+        if manga is None:
+            print(f"❌ Mangá {args.id_manga} não encontrado")
+            return
+
+        variacao = variacao_nota(session, args.id_manga, args.dias)
+        print(f"\n📈 {manga.titulo_manga}: últimos {args.dias} dia(s)")
+        print(f"   Média antes: {variacao.media_anterior if variacao.media_anterior is not None else '-'}"
+              f" | agora: {variacao.media_atual if variacao.media_atual is not None else '-'}"
+              f" | {variacao.total_periodo} avaliação(ões) no período\n")
+
+        print(f"{'Início':<12} {'Total':>6} {'Média':>6} {'Acumulada':>10}  Histograma (0..5)")
+        print("-" * 60)
+        for ponto in tendencia_nota(session, args.id_manga, variacao.desde, periodo=args.periodo):
+            media = f"{ponto.media:.2f}" if ponto.media is not None else "-"
+            print(f"{ponto.inicio.isoformat():<12} {ponto.total:>6} {media:>6} "
+                  f"{ponto.media_acumulada:>10.2f}  {' '.join(str(n) for n in ponto.histograma)}")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
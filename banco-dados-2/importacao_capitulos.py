@@ -0,0 +1,322 @@
+"""
+Importação de capítulos a partir de arquivos CBZ/ZIP
+Cada arquivo vira um capítulo: as entradas são lidas em streaming do ZIP
+(sem extrair o arquivo para um diretório temporário), validadas pelos
+bytes iniciais (JPEG, PNG, GIF, WebP) e gravadas no armazenamento por
+conteúdo em PAGINAS_DIR/ab/cd/<sha256>.<formato>. Uma página que já existe
+no armazenamento não é gravada de novo.
+
+Os arquivos são processados em paralelo (ProcessPoolExecutor, sem acesso ao
+banco nos processos filhos) e os capítulos resultantes entram em lote: um
+flush para os capítulos e um INSERT para todas as páginas. Se a transação
+falhar, os arquivos já gravados ficam no armazenamento sem referência
+(são reaproveitados numa nova importação).
+
+O número do capítulo vem do nome do arquivo ("cap 12.cbz", "ch012.zip",
+"One Piece 1044.cbz": o último número do nome).
+
+    python importacao_capitulos.py 1 capitulos/ --admin 1 --processos 4
+"""
+import argparse
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, insert
+from sqlalchemy.orm import Session
+from database import SessionLocal, engine
+from models import Manga, Capitulo, PaginaCapitulo, Administrador
+
+
+PAGINAS_DIR = os.getenv("PAGINAS_DIR", "paginas")
+
+# Páginas maiores que isso (descompactadas) invalidam o arquivo
+MAX_BYTES_PAGINA = int(os.getenv("IMPORTACAO_MAX_BYTES_PAGINA", 50 * 1024 * 1024))
+
+EXTENSOES_ARQUIVO = (".cbz", ".zip")
+EXTENSOES_IMAGEM = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+
+# Entradas que não são páginas (metadados de leitores de quadrinhos, lixo do SO)
+IGNORAR = re.compile(r"(^|/)(__MACOSX/|\.)|thumbs\.db$|\.(xml|txt|nfo|json)$", re.IGNORECASE)
+
+TAMANHO_BLOCO = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class PaginaImportada:
+    numero_pagina: int
+    nome: str
+    sha256: str
+    formato: str
+    tamanho_bytes: int
+
+
+@dataclass
+class ArquivoProcessado:
+    """Resultado de um arquivo no processo filho (sem objetos do banco)"""
+    caminho: str
+    numero_capitulo: Optional[int]
+    titulo_capitulo: str
+    paginas: tuple = ()
+    paginas_novas: int = 0
+    erro: Optional[str] = None
+
+    @property
+    def impressao_digital(self) -> str:
+        """Hash da sequência de páginas: mesmo conteúdo, mesmo valor"""
+        return hashlib.sha256("".join(p.sha256 for p in self.paginas).encode()).hexdigest()
+
+
+@dataclass
+class ResultadoImportacao:
+    capitulos: list = field(default_factory=list)
+    ignorados: list = field(default_factory=list)  # (caminho, motivo)
+    paginas: int = 0
+    paginas_novas: int = 0
+    segundos: float = 0.0
+
+
+def formato_imagem(inicio: bytes) -> Optional[str]:
+    """Formato pela assinatura (magic bytes), ou None se não for imagem aceita"""
+    if inicio.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if inicio.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if inicio[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if inicio[:4] == b"RIFF" and inicio[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def caminho_pagina(sha256: str, formato: str, diretorio: str = PAGINAS_DIR) -> str:
+    """Caminho da página no armazenamento por conteúdo"""
+    return os.path.join(diretorio, sha256[:2], sha256[2:4], f"{sha256}.{formato}")
+
+
+def ordem_natural(nome: str) -> list:
+    """Chave de ordenação natural (2.jpg antes de 10.jpg)"""
+    return [int(parte) if parte.isdigit() else parte.lower() for parte in re.split(r"(\d+)", nome)]
+
+
+def numero_do_nome(caminho: str) -> Optional[int]:
+    """Número do capítulo: o último número do nome do arquivo"""
+    numeros = re.findall(r"\d+", os.path.splitext(os.path.basename(caminho))[0])
+    return int(numeros[-1]) if numeros else None
+
+
+def listar_arquivos(caminhos) -> list:
+    """Arquivos CBZ/ZIP dos caminhos (diretórios sem recursão), em ordem natural"""
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos.extend(
+                os.path.join(caminho, nome) for nome in os.listdir(caminho)
+                if nome.lower().endswith(EXTENSOES_ARQUIVO)
+            )
+        else:
+            arquivos.append(caminho)
+    return sorted(arquivos, key=lambda c: ordem_natural(os.path.basename(c)))
+
+
+def _gravar_entrada(arquivo: zipfile.ZipFile, info: zipfile.ZipInfo, diretorio: str) -> tuple:
+    """
+    Lê uma entrada em blocos, calculando o sha256, para um temporário no
+    armazenamento; move para o caminho final só se o conteúdo ainda não
+    existir. Retorna (formato, sha256, tamanho, nova)
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    digest = hashlib.sha256()
+    tamanho = 0
+    formato = None
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix=".parcial")
+    try:
+        with os.fdopen(descritor, "wb") as saida, arquivo.open(info) as entrada:
+            while bloco := entrada.read(TAMANHO_BLOCO):
+                if formato is None:
+                    formato = formato_imagem(bloco[:16])
+                    if formato is None:
+                        raise ValueError(f"{info.filename}: não é JPEG, PNG, GIF nem WebP")
+                tamanho += len(bloco)
+                if tamanho > MAX_BYTES_PAGINA:
+                    raise ValueError(f"{info.filename}: maior que {MAX_BYTES_PAGINA} bytes")
+                digest.update(bloco)
+                saida.write(bloco)
+        if formato is None:
+            raise ValueError(f"{info.filename}: página vazia")
+
+        sha256 = digest.hexdigest()
+        destino = caminho_pagina(sha256, formato, diretorio)
+        if os.path.exists(destino):
+            return formato, sha256, tamanho, False
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(temporario, destino)
+        return formato, sha256, tamanho, True
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def processar_arquivo(caminho: str, diretorio: str = PAGINAS_DIR) -> ArquivoProcessado:
+    """
+    Valida, conta e armazena as páginas de um CBZ/ZIP (roda no processo filho)
+    Qualquer página inválida invalida o arquivo inteiro
+    """
+    resultado = ArquivoProcessado(
+        caminho, numero_do_nome(caminho), os.path.splitext(os.path.basename(caminho))[0]
+    )
+    try:
+        with zipfile.ZipFile(caminho) as arquivo:
+            entradas = sorted(
+                (info for info in arquivo.infolist()
+                 if not info.is_dir() and not IGNORAR.search(info.filename)),
+                key=lambda info: ordem_natural(info.filename),
+            )
+            paginas = []
+            for info in entradas:
+                if not info.filename.lower().endswith(EXTENSOES_IMAGEM):
+                    raise ValueError(f"{info.filename}: extensão não é de imagem")
+                if info.flag_bits & 0x1:
+                    raise ValueError(f"{info.filename}: entrada criptografada")
+                formato, sha256, tamanho, nova = _gravar_entrada(arquivo, info, diretorio)
+                paginas.append(PaginaImportada(len(paginas) + 1, info.filename, sha256, formato, tamanho))
+                resultado.paginas_novas += nova
+    except (zipfile.BadZipFile, ValueError, OSError) as e:
+        resultado.erro = str(e)
+        return resultado
+
+    resultado.paginas = tuple(paginas)
+    if not paginas:
+        resultado.erro = "nenhuma página"
+    elif resultado.numero_capitulo is None:
+        resultado.erro = "número do capítulo não encontrado no nome"
+    return resultado
+
+
+def processar_arquivos(caminhos: list, processos: Optional[int] = None,
+                       diretorio: str = PAGINAS_DIR) -> list:
+    """
+    ArquivoProcessado de cada caminho, na mesma ordem
+    Processos iniciados por spawn: o processo pai pode ter threads (buffer de
+    progresso, barramento) e conexões abertas
+    """
+    if len(caminhos) <= 1 or processos == 1:
+        return [processar_arquivo(c, diretorio) for c in caminhos]
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as executor:
+        return list(executor.map(processar_arquivo, caminhos, [diretorio] * len(caminhos)))
+
+
+def importar_capitulos(session: Session, manga: Manga, caminhos, processos: Optional[int] = None,
+                       diretorio: str = PAGINAS_DIR) -> ResultadoImportacao:
+    """
+    Importa os CBZ/ZIP (arquivos ou diretórios) como capítulos do mangá
+    Números já existentes no mangá, repetidos no lote ou com o mesmo
+    conteúdo de outro arquivo do lote são ignorados. Não faz commit
+    """
+    from notificacoes import agendar_envio
+
+    inicio = time.perf_counter()
+    resultado = ResultadoImportacao()
+    processados = processar_arquivos(listar_arquivos(caminhos), processos, diretorio)
+
+    numeros = set(session.execute(
+        select(Capitulo.numero_capitulo).where(Capitulo.id_manga == manga.id_manga)
+    ).scalars())
+    impressoes = set()
+    aceitos = []
+    for arquivo in processados:
+        resultado.paginas_novas += arquivo.paginas_novas
+        if arquivo.erro:
+            resultado.ignorados.append((arquivo.caminho, arquivo.erro))
+        elif arquivo.numero_capitulo in numeros:
+            resultado.ignorados.append((arquivo.caminho, f"capítulo {arquivo.numero_capitulo} já existe"))
+        elif arquivo.impressao_digital in impressoes:
+            resultado.ignorados.append((arquivo.caminho, "mesmo conteúdo de outro arquivo do lote"))
+        else:
+            numeros.add(arquivo.numero_capitulo)
+            impressoes.add(arquivo.impressao_digital)
+            aceitos.append(arquivo)
+
+    if not aceitos:
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+
+    agora = datetime.now()
+    capitulos = [
+        Capitulo(
+            id_manga=manga.id_manga,
+            titulo_capitulo=arquivo.titulo_capitulo[:255],
+            numero_capitulo=arquivo.numero_capitulo,
+            numero_paginas=len(arquivo.paginas),
+            data_publicacao=agora,
+        )
+        for arquivo in aceitos
+    ]
+    # Um flush para todos os capítulos (INSERT em lote com RETURNING dos ids)
+    session.add_all(capitulos)
+    session.flush()
+
+    linhas = [
+        {"id_capitulo": capitulo.id_capitulo, "numero_pagina": pagina.numero_pagina,
+         "sha256": pagina.sha256, "formato": pagina.formato, "tamanho_bytes": pagina.tamanho_bytes}
+        for capitulo, arquivo in zip(capitulos, aceitos)
+        for pagina in arquivo.paginas
+    ]
+    session.execute(insert(PaginaCapitulo), linhas)
+
+    # Leitores que favoritaram o mangá são notificados como em adicionar_capitulo
+    for capitulo in capitulos:
+        agendar_envio(session, capitulo)
+
+    resultado.capitulos = capitulos
+    resultado.paginas = len(linhas)
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+
+def main():
+    """Importa um diretório (ou lista) de CBZ/ZIP como capítulos de um mangá"""
+    parser = argparse.ArgumentParser(description="Importa capítulos de arquivos CBZ/ZIP")
+    parser.add_argument("id_manga", type=int)
+    parser.add_argument("caminhos", nargs="+", help="Arquivos .cbz/.zip ou diretórios com eles")
+    parser.add_argument("--admin", type=int, required=True, help="id do administrador responsável")
+    parser.add_argument("--processos", type=int, default=None, help="Processos (padrão: CPUs)")
+    parser.add_argument("--destino", default=PAGINAS_DIR, help="Armazenamento das páginas")
+    args = parser.parse_args()
+
+    engine.echo = False
+    session = SessionLocal()
+    try:
+        manga = session.get(Manga, args.id_manga)
+        administrador = session.get(Administrador, args.admin)
+        if manga is None or administrador is None:
+            print(f"❌ {'Mangá' if manga is None else 'Administrador'} não encontrado")
+            return
+
+        titulo = manga.titulo_manga
+        resultado = administrador.importar_capitulos(manga, args.caminhos, session,
+                                                      args.processos, args.destino)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    print(f"\n📦 {titulo}: {len(resultado.capitulos)} capítulo(s), {resultado.paginas} página(s) "
+          f"({resultado.paginas_novas} nova(s) no armazenamento) em {resultado.segundos:.2f}s")
+    for caminho, motivo in resultado.ignorados:
+        print(f"   ⚠ {os.path.basename(caminho)}: {motivo}")
+
+
+if __name__ == "__main__":
+    main()
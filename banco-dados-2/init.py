@@ -1,114 +1,209 @@
 #!/usr/bin/env python3
 """
 Script de inicialização do sistema
-Executa migrations, seed e aplicação principal
+Tudo em um único processo: aguarda o banco de DATABASE_URL (backoff
+exponencial), aplica migrations só quando o banco não está no head (banco
+vazio: cria o schema direto dos modelos e marca o head), popula apenas se
+não houver dados e executa a aplicação principal, informando o tempo de
+cada fase
 """
-import subprocess
+import argparse
+import importlib.util
+import os
 import sys
 import time
-import os
+from contextlib import contextmanager
 
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
 
-def wait_for_postgres():
-    """Aguarda PostgreSQL estar pronto"""
-    print("🔧 Aguardando PostgreSQL...")
-    
-    max_attempts = 30
-    attempt = 0
-    
-    # Importar aqui para não falhar se não estiver instalado
-    try:
-        import psycopg2
-    except ImportError:
-        print("⚠️  psycopg2 não instalado, pulando verificação")
-        time.sleep(5)  # Espera fixa
-        return True
-    
-    while attempt < max_attempts:
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Backoff da espera pelo banco (segundos)
+ESPERA_INICIAL = float(os.getenv("INIT_ESPERA_INICIAL", 0.1))
+ESPERA_MAXIMA = float(os.getenv("INIT_ESPERA_MAXIMA", 5))
+TIMEOUT_BANCO = float(os.getenv("INIT_TIMEOUT_BANCO", 60))
+
+
+class Fases:
+    """Cronometra as fases da inicialização"""
+
+    def __init__(self):
+        self.registros = []  # [nome, segundos, situacao]
+
+    @contextmanager
+    def fase(self, nome: str, icone: str):
+        print(f"{icone} {nome}...")
+        registro = [nome, 0.0, "ok"]
+        self.registros.append(registro)
+        inicio = time.perf_counter()
         try:
-            conn = psycopg2.connect(
-                host="db",
-                database="manga_db",
-                user="manga_user",
-                password="manga_pass",
-                connect_timeout=2
-            )
-            conn.close()
-            print("✓ PostgreSQL está pronto!\n")
-            return True
+            yield registro
         except Exception:
-            attempt += 1
-            time.sleep(1)
-    
-    print("✗ Timeout aguardando PostgreSQL")
-    return False
-
-
-def run_migrations():
-    """Executa migrations do Alembic"""
-    print("📦 Aplicando migrations...")
-    
-    result = subprocess.run(
-        ["uv", "run", "alembic", "upgrade", "head"],
-        capture_output=False
-    )
-    
-    if result.returncode == 0:
-        print("✓ Migrations aplicadas!\n")
-        return True
-    else:
-        print("✗ Erro ao aplicar migrations")
-        return False
-
-
-def run_seed():
-    """Executa seed do banco de dados"""
-    print("🌱 Populando banco de dados...")
-    
-    result = subprocess.run(
-        ["uv", "run", "seed"],
-        capture_output=False
-    )
-    
-    if result.returncode == 0:
-        print("✓ Seed concluído!\n")
-        return True
-    else:
-        print("⚠️  Aviso: Seed pode ter falhado (dados já existem?)\n")
-        return True  # Não falha se dados já existem
+            registro[2] = "erro"
+            raise
+        finally:
+            registro[1] = time.perf_counter() - inicio
+            print(f"   {registro[2]} ({registro[1]:.2f}s)\n")
 
+    def imprimir(self):
+        print(f"{'Fase':<22} {'Tempo':>9}  Situação")
+        print("-" * 70)
+        for nome, segundos, situacao in self.registros:
+            print(f"{nome:<22} {segundos:>8.2f}s  {situacao}")
+        print(f"{'Total':<22} {sum(r[1] for r in self.registros):>8.2f}s\n")
 
-def run_app():
-    """Executa aplicação principal"""
-    print("🚀 Executando aplicação...")
-    
-    result = subprocess.run(
-        ["uv", "run", "dev"]
+
+def _importar_alembic():
+    """
+    Importa a biblioteca alembic
+    A pasta local alembic/ (migrations) é um pacote e esconderia o alembic
+    instalado enquanto o diretório do projeto estiver no sys.path
+    """
+    caminho = sys.path[:]
+    sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != DIRETORIO]
+    for nome in [m for m in sys.modules if m == "alembic" or m.startswith("alembic.")]:
+        del sys.modules[nome]
+    try:
+        from alembic import command
+        from alembic.config import Config
+        from alembic.runtime.migration import MigrationContext
+        from alembic.script import ScriptDirectory
+    finally:
+        sys.path[:] = caminho
+    return command, Config, MigrationContext, ScriptDirectory
+
+
+def aguardar_banco(engine) -> int:
+    """Tenta conectar com backoff exponencial; retorna o número de tentativas"""
+    limite = time.monotonic() + TIMEOUT_BANCO
+    espera = ESPERA_INICIAL
+    tentativa = 0
+
+    while True:
+        tentativa += 1
+        try:
+            with engine.connect() as conexao:
+                conexao.execute(text("SELECT 1"))
+            return tentativa
+        except OperationalError:
+            if time.monotonic() + espera > limite:
+                raise
+            time.sleep(espera)
+            espera = min(espera * 2, ESPERA_MAXIMA)
+
+
+def preparar_schema(engine) -> str:
+    """
+    Leva o banco ao head das migrations pelo caminho mais curto
+    Usa uma conexão fora do pool da aplicação: o lock_timeout que o env.py
+    aplica à sessão da migração não chega às conexões reaproveitadas depois
+    """
+    engine_migracao = create_engine(engine.url, poolclass=NullPool)
+    try:
+        return _preparar_schema(engine_migracao)
+    finally:
+        engine_migracao.dispose()
+
+
+def _preparar_schema(engine) -> str:
+    from database import Base
+    from particionamento import particionar_tabelas
+
+    command, Config, MigrationContext, ScriptDirectory = _importar_alembic()
+
+    config = Config(os.path.join(DIRETORIO, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(DIRETORIO, "alembic"))
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    with engine.connect() as conexao:
+        atuais = set(MigrationContext.configure(conexao).get_current_heads())
+        tabelas = set(inspect(conexao).get_table_names()) - {"alembic_version"}
+        # Sem transação aberta: o Alembic abre uma por migration
+        conexao.commit()
+        if atuais == heads:
+            return f"já no head ({', '.join(heads)}), migrations puladas"
+
+        config.attributes["connection"] = conexao
+
+        if not atuais and not tabelas:
+            # Banco vazio: criar direto dos modelos é mais rápido que
+            # reproduzir todo o histórico de migrations
+            with conexao.begin():
+                Base.metadata.create_all(conexao)
+                if conexao.dialect.name == "postgresql":
+                    particionar_tabelas(conexao)
+            command.stamp(config, "head")
+            return "schema criado a partir dos modelos, head marcado"
+
+        command.upgrade(config, "head")
+        return f"migrado de {', '.join(atuais) or 'nenhuma revisão'} para {', '.join(heads)}"
+
+
+def popular_banco() -> str:
+    """Executa o seed apenas se o banco não tiver dados"""
+    from database import SessionLocal
+    from models import Usuario
+
+    session = SessionLocal()
+    try:
+        if session.execute(select(Usuario.id_usuario).limit(1)).first():
+            return "dados existentes, seed pulado"
+    finally:
+        session.close()
+
+    # alembic/seed_data.py pelo caminho: o pacote local não é importável
+    spec = importlib.util.spec_from_file_location(
+        "seed_data", os.path.join(DIRETORIO, "alembic", "seed_data.py")
     )
-    
-    return result.returncode
+    seed_data = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(seed_data)
+    seed_data.seed()
+    return "seed executado"
 
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Inicializa banco e aplicação")
+    parser.add_argument("--sem-app", action="store_true", help="Só prepara o banco")
+    args = parser.parse_args()
+
     print("="*80)
     print("  INICIALIZANDO SISTEMA DE GERENCIAMENTO DE MANGÁS")
     print("="*80)
     print()
-    
-    # Aguardar PostgreSQL
-    if not wait_for_postgres():
-        sys.exit(1)
-    
-    # Aplicar migrations
-    if not run_migrations():
+
+    fases = Fases()
+
+    with fases.fase("Importação", "📚") as registro:
+        from database import engine
+        import models  # noqa: F401 (registra os modelos no metadata)
+        registro[2] = engine.url.render_as_string(hide_password=True)
+
+    try:
+        with fases.fase("Aguardar banco", "🔧") as registro:
+            tentativas = aguardar_banco(engine)
+            registro[2] = f"{tentativas} tentativa(s)"
+    except OperationalError as e:
+        print(f"✗ Banco indisponível após {TIMEOUT_BANCO:.0f}s: {e}")
         sys.exit(1)
-    
-    # Popular banco (seed)
-    run_seed()
-    
-    # Executar aplicação
-    sys.exit(run_app())
+
+    with fases.fase("Migrations", "📦") as registro:
+        registro[2] = preparar_schema(engine)
+
+    with fases.fase("Seed", "🌱") as registro:
+        registro[2] = popular_banco()
+
+    fases.imprimir()
+
+    if args.sem_app:
+        return
+
+    print("🚀 Executando aplicação...")
+    from main import main as executar_app
+    executar_app()
 
 
 if __name__ == "__main__":
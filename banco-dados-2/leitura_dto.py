@@ -0,0 +1,222 @@
+"""
+Leitura de listas sem ORM (DTOs)
+Catálogo, capítulos, "continuar lendo", comentários e rankings lidos com SELECTs de colunas
+(SQLAlchemy Core) e convertidos em dataclasses com __slots__: sem
+instrumentação de atributos, sem identity map e sem carregamento de
+relacionamentos. Para telas e respostas que só exibem colunas.
+
+para_json usa orjson quando instalado (uv sync --extra api) e cai para
+o json da biblioteca padrão caso contrário.
+
+    python benchmarks/leitura_dto.py --linhas 100000
+"""
+import dataclasses
+import enum
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import select, func, true
+from sqlalchemy.orm import Session
+from models import Manga, Status, Capitulo, LeitorManga
+from paginacao import listar_mangas_pagina, PaginaMangas
+from arquivamento import pagina_comentarios, PaginaComentarios
+from relatorios import relatorio_top_mangas_avaliados, relatorio_mangas_bem_avaliados_engajados
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+
+@dataclass(slots=True, frozen=True)
+class MangaResumo:
+    id_manga: int
+    titulo_manga: str
+    autor: str
+    status: Status
+    data_criacao: datetime
+
+
+@dataclass(slots=True, frozen=True)
+class CapituloResumo:
+    id_capitulo: int
+    numero_capitulo: int
+    titulo_capitulo: str
+    numero_paginas: int
+    data_publicacao: datetime
+
+
+@dataclass(slots=True, frozen=True)
+class ItemContinuarLendo:
+    """Mangá em andamento do leitor e o próximo capítulo não lido"""
+    id_manga: int
+    titulo_manga: str
+    ultimo_capitulo_lido: int
+    progresso_leitura: float
+    id_capitulo: int
+    numero_capitulo: int
+    titulo_capitulo: str
+
+
+@dataclass(slots=True, frozen=True)
+class ComentarioResumo:
+    id_comentario: int
+    codinome: str
+    texto_comentario: str
+    numero_curtidas: int
+    data_criacao: datetime
+
+
+@dataclass(slots=True, frozen=True)
+class ItemRanking:
+    titulo_manga: str
+    autor: str
+    status: Status
+    media_avaliacao: float
+    total_avaliacoes: int
+    total_comentarios: Optional[int] = None
+
+
+# Nome do ranking -> SELECT com `limite` linhas, colunas na ordem de ItemRanking
+RANKINGS = {
+    "mais_avaliados": lambda limite: relatorio_top_mangas_avaliados(limite),
+    "bem_avaliados_engajados": lambda limite: relatorio_mangas_bem_avaliados_engajados().limit(limite),
+}
+
+
+def converter(classe, linhas) -> list:
+    """Linhas do Core -> DTOs (colunas na mesma ordem dos campos)"""
+    return [classe(*linha) for linha in linhas]
+
+
+def consulta_capitulos(id_manga: int):
+    """SELECT dos capítulos de um mangá, em ordem de leitura"""
+    return (
+        select(
+            Capitulo.id_capitulo,
+            Capitulo.numero_capitulo,
+            Capitulo.titulo_capitulo,
+            Capitulo.numero_paginas,
+            Capitulo.data_publicacao,
+        )
+        .where(Capitulo.id_manga == id_manga)
+        .order_by(Capitulo.numero_capitulo, Capitulo.id_capitulo)
+    )
+
+
+def consulta_continuar_lendo(id_leitor: int, postgres: bool = True):
+    """
+    SELECT dos mangás em andamento do leitor com o próximo capítulo não lido
+    (menor numero_capitulo acima de ultimo_capitulo_lido). No PostgreSQL um
+    JOIN LATERAL ... LIMIT 1 por mangá, que é uma busca no índice único
+    (id_manga, numero_capitulo); nos demais bancos, row_number() sobre os
+    capítulos restantes. Mangás sem capítulo novo (em dia) ficam de fora
+    """
+    leituras = (
+        select(LeitorManga.id, LeitorManga.id_manga, LeitorManga.ultimo_capitulo_lido,
+               LeitorManga.progresso_leitura)
+        .where(LeitorManga.id_leitor == id_leitor, LeitorManga.ultimo_capitulo_lido > 0)
+        .subquery("leituras")
+    )
+    if postgres:
+        proximo = (
+            select(Capitulo.id_capitulo, Capitulo.numero_capitulo, Capitulo.titulo_capitulo)
+            .where(
+                Capitulo.id_manga == leituras.c.id_manga,
+                Capitulo.numero_capitulo > leituras.c.ultimo_capitulo_lido,
+            )
+            .order_by(Capitulo.numero_capitulo)
+            .limit(1)
+            .lateral("proximo")
+        )
+        origem = leituras.join(proximo, true())
+    else:
+        proximo = (
+            select(
+                leituras.c.id,
+                Capitulo.id_capitulo,
+                Capitulo.numero_capitulo,
+                Capitulo.titulo_capitulo,
+                func.row_number().over(partition_by=leituras.c.id, order_by=Capitulo.numero_capitulo).label("ordem"),
+            )
+            .join(Capitulo, (Capitulo.id_manga == leituras.c.id_manga)
+                  & (Capitulo.numero_capitulo > leituras.c.ultimo_capitulo_lido))
+            .subquery("proximo")
+        )
+        origem = leituras.join(proximo, (proximo.c.id == leituras.c.id) & (proximo.c.ordem == 1))
+
+    return (
+        select(
+            leituras.c.id_manga,
+            Manga.titulo_manga,
+            leituras.c.ultimo_capitulo_lido,
+            leituras.c.progresso_leitura,
+            proximo.c.id_capitulo,
+            proximo.c.numero_capitulo,
+            proximo.c.titulo_capitulo,
+        )
+        .select_from(origem)
+        .join(Manga, Manga.id_manga == leituras.c.id_manga)
+        .order_by(leituras.c.id.desc())
+    )
+
+
+def listar_catalogo(session: Session, ordenacao: str = "titulo", status: Optional[Status] = None,
+                    limite: int = 20, apos: Optional[tuple] = None) -> PaginaMangas:
+    """Página do catálogo (paginacao.listar_mangas_pagina) com itens MangaResumo"""
+    pagina = listar_mangas_pagina(session, ordenacao, status, limite, apos)
+    return PaginaMangas(converter(MangaResumo, pagina.itens), pagina.proximo_cursor)
+
+
+def listar_capitulos(session: Session, id_manga: int) -> list:
+    """Capítulos do mangá como CapituloResumo"""
+    return converter(CapituloResumo, session.execute(consulta_capitulos(id_manga)))
+
+
+def listar_continuar_lendo(session: Session, id_leitor: int, limite: int = 20) -> list:
+    """Mangás em andamento do leitor com o próximo capítulo (ItemContinuarLendo), um único SELECT"""
+    postgres = session.get_bind().dialect.name == "postgresql"
+    return converter(
+        ItemContinuarLendo, session.execute(consulta_continuar_lendo(id_leitor, postgres).limit(limite))
+    )
+
+
+def listar_comentarios(session: Session, id_manga: int, limite: int = 20,
+                       apos: Optional[tuple] = None) -> PaginaComentarios:
+    """Feed de comentários (arquivamento.pagina_comentarios) com itens ComentarioResumo"""
+    pagina = pagina_comentarios(session, id_manga, limite, apos)
+    return PaginaComentarios(
+        converter(ComentarioResumo, pagina.itens), pagina.proximo_cursor, pagina.consultou_arquivo
+    )
+
+
+def listar_ranking(session: Session, nome: str, limite: int = 10) -> list:
+    """Ranking registrado em RANKINGS como ItemRanking"""
+    if nome not in RANKINGS:
+        raise KeyError(f"Ranking desconhecido: {nome}. Use {', '.join(RANKINGS)}")
+    return converter(ItemRanking, session.execute(RANKINGS[nome](limite)))
+
+
+def _json_padrao(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if dataclasses.is_dataclass(valor):
+        return {campo.name: getattr(valor, campo.name) for campo in dataclasses.fields(valor)}
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def para_json(dados) -> bytes:
+    """
+    Serializa DTOs, listas e dicionários em JSON compacto (UTF-8)
+    Datas em ISO 8601, enums pelo valor, Decimal como número
+    """
+    if orjson is not None:
+        return orjson.dumps(dados, default=_json_padrao)
+    return json.dumps(dados, default=_json_padrao, ensure_ascii=False, separators=(",", ":")).encode()
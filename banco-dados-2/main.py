@@ -17,6 +17,9 @@ from models import (
     Manga, Status, Genero,
     Capitulo, Avaliacao, Comentario, LeitorManga
 )
+from estatisticas import coletar_estatisticas
+from relatorios import relatorio_mangas_bem_avaliados_engajados, relatorio_leitores_engajados
+from executor_relatorios import executar_relatorios, imprimir_tempos
 
 
 def print_separator(title=""):
@@ -28,12 +31,13 @@ def print_separator(title=""):
     print()
 
 
-def consulta_complexa_1(session):
+def consulta_complexa_1(session, resultados=None):
     """
     CONSULTA COMPLEXA 1: 
     Encontrar mangás com média de avaliação >= 4.5, 
     que tenham mais de 1 comentário,
     ordenados por média de avaliação decrescente
+    `resultados`: linhas já obtidas pelo executor de relatórios
     """
     print_separator("CONSULTA COMPLEXA 1: Mangás Bem Avaliados com Engajamento")
     
@@ -43,56 +47,22 @@ def consulta_complexa_1(session):
     print("  - Ordenados por média de avaliação (decrescente)")
     print()
     
-    # Subconsulta para calcular média de avaliações
-    subquery_media = (
-        session.query(
-            Avaliacao.id_manga,
-            func.avg(Avaliacao.nota).label('media_nota'),
-            func.count(Avaliacao.id_avaliacao).label('total_avaliacoes')
-        )
-        .group_by(Avaliacao.id_manga)
-        .having(func.avg(Avaliacao.nota) >= 4.5)
-        .subquery()
-    )
-    
-    # Subconsulta para contar comentários
-    subquery_comentarios = (
-        session.query(
-            Comentario.id_manga,
-            func.count(Comentario.id_comentario).label('total_comentarios')
-        )
-        .group_by(Comentario.id_manga)
-        .having(func.count(Comentario.id_comentario) >= 2)
-        .subquery()
-    )
-    
-    # Consulta principal
-    resultados = (
-        session.query(
-            Manga,
-            subquery_media.c.media_nota,
-            subquery_media.c.total_avaliacoes,
-            subquery_comentarios.c.total_comentarios
-        )
-        .join(subquery_media, Manga.id_manga == subquery_media.c.id_manga)
-        .join(subquery_comentarios, Manga.id_manga == subquery_comentarios.c.id_manga)
-        .order_by(subquery_media.c.media_nota.desc())
-        .all()
-    )
+    # Subconsultas de média e de comentários (registradas em relatorios.py)
+    if resultados is None:
+        resultados = session.execute(relatorio_mangas_bem_avaliados_engajados()).all()
     
     print(f"Total de resultados: {len(resultados)}\n")
     
-    for manga, media, total_aval, total_coment in resultados:
-        print(f"📚 {manga.titulo_manga}")
-        print(f"   Autor: {manga.autor}")
-        print(f"   Gênero: {manga.genero.value}")
-        print(f"   Status: {manga.status.value}")
+    for titulo, autor, status, media, total_aval, total_coment in resultados:
+        print(f"📚 {titulo}")
+        print(f"   Autor: {autor}")
+        print(f"   Status: {status.value}")
         print(f"   ⭐ Média: {float(media):.2f} ({total_aval} avaliações)")
         print(f"   💬 Comentários: {total_coment}")
         print()
 
 
-def consulta_complexa_2(session):
+def consulta_complexa_2(session, resultados=None):
     """
     CONSULTA COMPLEXA 2:
     Encontrar leitores que:
@@ -100,6 +70,7 @@ def consulta_complexa_2(session):
     - Avaliaram pelo menos 2 mangás
     - Têm progresso de leitura > 50% em pelo menos um mangá
     Mostrar quantidade de favoritos, avaliações e progresso médio
+    `resultados`: linhas já obtidas pelo executor de relatórios
     """
     print_separator("CONSULTA COMPLEXA 2: Leitores Ativos e Engajados")
     
@@ -109,61 +80,15 @@ def consulta_complexa_2(session):
     print("  - Progresso > 50% em pelo menos um mangá")
     print()
     
-    # Subconsulta para favoritos
-    subquery_favoritos = (
-        session.query(
-            LeitorManga.id_leitor,
-            func.count(LeitorManga.id).label('total_favoritos')
-        )
-        .filter(LeitorManga.data_favorito.isnot(None))
-        .group_by(LeitorManga.id_leitor)
-        .having(func.count(LeitorManga.id) > 1)
-        .subquery()
-    )
-    
-    # Subconsulta para avaliações
-    subquery_avaliacoes = (
-        session.query(
-            Avaliacao.id_leitor,
-            func.count(Avaliacao.id_avaliacao).label('total_avaliacoes'),
-            func.avg(Avaliacao.nota).label('media_notas_dadas')
-        )
-        .group_by(Avaliacao.id_leitor)
-        .having(func.count(Avaliacao.id_avaliacao) >= 2)
-        .subquery()
-    )
-    
-    # Subconsulta para progresso
-    subquery_progresso = (
-        session.query(
-            LeitorManga.id_leitor,
-            func.avg(LeitorManga.progresso_leitura).label('progresso_medio')
-        )
-        .filter(LeitorManga.progresso_leitura > 50.0)
-        .group_by(LeitorManga.id_leitor)
-        .subquery()
-    )
-    
-    # Consulta principal
-    resultados = (
-        session.query(
-            Leitor,
-            subquery_favoritos.c.total_favoritos,
-            subquery_avaliacoes.c.total_avaliacoes,
-            subquery_avaliacoes.c.media_notas_dadas,
-            subquery_progresso.c.progresso_medio
-        )
-        .join(subquery_favoritos, Leitor.id_usuario == subquery_favoritos.c.id_leitor)
-        .join(subquery_avaliacoes, Leitor.id_usuario == subquery_avaliacoes.c.id_leitor)
-        .join(subquery_progresso, Leitor.id_usuario == subquery_progresso.c.id_leitor)
-        .all()
-    )
+    # Subconsultas de favoritos, avaliações e progresso (registradas em relatorios.py)
+    if resultados is None:
+        resultados = session.execute(relatorio_leitores_engajados()).all()
     
     print(f"Total de resultados: {len(resultados)}\n")
     
-    for leitor, favoritos, avaliacoes, media_notas, progresso in resultados:
-        print(f"👤 {leitor.codinome} ({leitor.nome})")
-        print(f"   Email: {leitor.email}")
+    for codinome, nome, email, favoritos, avaliacoes, media_notas, progresso in resultados:
+        print(f"👤 {codinome} ({nome})")
+        print(f"   Email: {email}")
         print(f"   ❤️ Favoritos: {favoritos}")
         print(f"   ⭐ Avaliações: {avaliacoes} (média dada: {float(media_notas):.2f})")
         print(f"   📖 Progresso médio: {float(progresso):.2f}%")
@@ -232,9 +157,9 @@ def demonstrar_relacionamentos(session):
     if leitor:
         print(f"👤 Leitor: {leitor.codinome}")
         print(f"\n📚 Mangás Favoritos:")
-        for leitura in leitor.leituras:
-            if leitura.data_favorito:
-                print(f"   - {leitura.manga.titulo_manga} (Progresso: {leitura.progresso_leitura}%)")
+        for item in leitor.biblioteca(session):
+            print(f"   - {item.titulo_manga} (Progresso: {item.progresso_leitura}%, "
+                  f"{item.capitulos_nao_lidos} de {item.total_capitulos} capítulo(s) não lido(s))")
         
         print(f"\n⭐ Avaliações:")
         for avaliacao in leitor.avaliacoes:
@@ -314,40 +239,32 @@ def demonstrar_transacoes(session):
         print(f"✗ Erro inesperado: {e}")
 
 
-def estatisticas_gerais(session):
-    """Mostra estatísticas gerais do sistema"""
+def estatisticas_gerais(session, estimar=False):
+    """Mostra estatísticas gerais do sistema (uma única consulta)"""
     print_separator("ESTATÍSTICAS GERAIS DO SISTEMA")
     
-    total_usuarios = session.query(Usuario).count()
-    total_leitores = session.query(Leitor).count()
-    total_admins = session.query(Administrador).count()
-    total_mangas = session.query(Manga).count()
-    total_capitulos = session.query(Capitulo).count()
-    total_avaliacoes = session.query(Avaliacao).count()
-    total_comentarios = session.query(Comentario).count()
+    estatisticas = coletar_estatisticas(session, estimar=estimar)
+    aprox = "~" if estatisticas.estimado else ""
     
-    print(f"👥 Usuários: {total_usuarios}")
-    print(f"   - Leitores: {total_leitores}")
-    print(f"   - Administradores: {total_admins}")
-    print(f"\n📚 Mangás: {total_mangas}")
-    print(f"📖 Capítulos: {total_capitulos}")
-    print(f"⭐ Avaliações: {total_avaliacoes}")
-    print(f"💬 Comentários: {total_comentarios}")
+    print(f"👥 Usuários: {estatisticas.total_usuarios}")
+    print(f"   - Leitores: {estatisticas.total_leitores}")
+    print(f"   - Administradores: {estatisticas.total_administradores}")
+    print(f"\n📚 Mangás: {estatisticas.total_mangas}")
+    for status, total in estatisticas.por_status.items():
+        print(f"   - {status.value}: {total}")
+    print(f"📖 Capítulos: {aprox}{estatisticas.total_capitulos}")
+    print(f"⭐ Avaliações: {aprox}{estatisticas.total_avaliacoes}")
+    print(f"💬 Comentários: {aprox}{estatisticas.total_comentarios}")
     
-    # Mangá mais bem avaliado
-    manga_top = (
-        session.query(
-            Manga.titulo_manga,
-            func.avg(Avaliacao.nota).label('media')
-        )
-        .join(Avaliacao)
-        .group_by(Manga.titulo_manga)
-        .order_by(func.avg(Avaliacao.nota).desc())
-        .first()
-    )
+    print("\n🏷️  Mangás por gênero:")
+    for genero, total in sorted(estatisticas.por_genero.items(), key=lambda item: -item[1]):
+        if total:
+            print(f"   - {genero}: {total}")
     
-    if manga_top:
-        print(f"\n🏆 Mangá mais bem avaliado: {manga_top[0]} ({float(manga_top[1]):.2f}/5.0)")
+    # Mangá mais bem avaliado
+    if estatisticas.manga_top:
+        titulo, media = estatisticas.manga_top
+        print(f"\n🏆 Mangá mais bem avaliado: {titulo} ({media:.2f}/5.0)")
 
 
 def main():
@@ -379,8 +296,19 @@ def main():
         estatisticas_gerais(session)
         demonstrar_heranca(session)
         demonstrar_relacionamentos(session)
-        consulta_complexa_1(session)
-        consulta_complexa_2(session)
+
+        # Consultas complexas em paralelo, cada uma com sua sessão
+        relatorios = executar_relatorios(["mangas_bem_avaliados_engajados", "leitores_engajados"])
+        for resultado, consulta in (
+            (relatorios["mangas_bem_avaliados_engajados"], consulta_complexa_1),
+            (relatorios["leitores_engajados"], consulta_complexa_2),
+        ):
+            if resultado.ok:
+                consulta(session, resultado.linhas)
+            else:
+                print(f"\n✗ {resultado.nome}: {resultado.situacao} ({resultado.erro})")
+        imprimir_tempos(relatorios)
+
         demonstrar_crud(session)
         demonstrar_transacoes(session)
         
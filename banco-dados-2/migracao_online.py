@@ -0,0 +1,211 @@
+"""
+Helpers para migrations com o sistema no ar (PostgreSQL)
+Usados dentro de upgrade()/downgrade() no lugar de op.create_index,
+op.create_foreign_key e op.drop_index quando a tabela recebe tráfego:
+
+- criar_indice / remover_indice: CREATE/DROP INDEX CONCURRENTLY fora da
+  transação da migração (em tabela particionada, partição por partição)
+- criar_chave_estrangeira: FK NOT VALID seguida de VALIDATE CONSTRAINT
+- com_retentativa: repete um comando quando o lock não sai dentro do
+  lock_timeout (MIGRATION_LOCK_TIMEOUT, definido em alembic/env.py)
+
+Cada migration roda na sua própria transação (transaction_per_migration):
+prefira uma operação que trava tabela por migration. Em outros bancos os
+helpers fazem a operação comum
+"""
+import os
+import time
+from typing import Optional
+
+from alembic import op
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from particionamento import estrategia, listar_particoes
+
+
+# Espera máxima por um lock antes de desistir (sintaxe do PostgreSQL)
+LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "3s")
+
+# Tentativas quando o lock não sai e espera inicial entre elas (dobra a cada uma)
+TENTATIVAS = int(os.getenv("MIGRATION_TENTATIVAS", 5))
+ESPERA_INICIAL = float(os.getenv("MIGRATION_ESPERA_INICIAL", 1))
+
+# SQLSTATE lock_not_available
+_PG_LOCK_INDISPONIVEL = "55P03"
+
+# O SQLite não nomeia as FKs: o modo batch as identifica por esta convenção
+CONVENCAO_SQLITE = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def configurar_conexao(conexao: Connection):
+    """
+    Aplica o lock_timeout à sessão da migração (chamado pelo env.py)
+    Nenhum ALTER fica na fila de locks segurando as consultas da aplicação.
+    O valor vale até a conexão fechar: não use uma conexão do pool da
+    aplicação (init.preparar_schema abre uma com NullPool)
+    """
+    if conexao.dialect.name != "postgresql":
+        return
+    conexao.execute(text("SELECT set_config('lock_timeout', :valor, false)"), {"valor": LOCK_TIMEOUT})
+    # Encerra a transação aberta pelo comando: o Alembic controla as transações
+    conexao.commit()
+
+
+def _postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _quote(nome: str) -> str:
+    return op.get_bind().dialect.identifier_preparer.quote(nome)
+
+
+def _autocommit(conexao: Connection) -> bool:
+    return conexao.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+def com_retentativa(funcao, tentativas: int = TENTATIVAS, espera: float = ESPERA_INICIAL):
+    """
+    Executa `funcao()` e a repete se o lock não for obtido no lock_timeout
+    Dentro de uma transação cada tentativa roda em um SAVEPOINT, para que a
+    falha não invalide o que a migration já fez
+    """
+    conexao = op.get_bind()
+    for tentativa in range(1, tentativas + 1):
+        try:
+            if _autocommit(conexao) or not conexao.in_transaction():
+                return funcao()
+            with conexao.begin_nested():
+                return funcao()
+        except DBAPIError as e:
+            if getattr(e.orig, "pgcode", None) != _PG_LOCK_INDISPONIVEL or tentativa == tentativas:
+                raise
+            print(f"⚠ Lock indisponível (tentativa {tentativa}/{tentativas}), "
+                  f"nova tentativa em {espera:.1f}s")
+            time.sleep(espera)
+            espera *= 2
+
+
+def executar(sql: str, parametros: Optional[dict] = None):
+    """op.execute com retentativa por lock_timeout"""
+    return com_retentativa(lambda: op.get_bind().execute(text(sql), parametros or {}))
+
+
+def _indice_invalido(nome: str) -> bool:
+    """True se existe um índice INVALID (sobra de um CONCURRENTLY interrompido)"""
+    return bool(op.get_bind().execute(
+        text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:nome)"),
+        {"nome": nome},
+    ).scalar())
+
+
+def _criar_indice_concorrente(nome: str, tabela: str, colunas: list, unique: bool, where: Optional[str]):
+    def criar():
+        if _indice_invalido(nome):
+            op.drop_index(nome, table_name=tabela, postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            nome, tabela, colunas, unique=unique, if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=text(where) if where else None,
+        )
+
+    com_retentativa(criar)
+
+
+def _nome_indice_particao(nome: str, tabela: str, particao: str) -> str:
+    # comentarios_p03 -> <nome>_p03 (limite de 63 caracteres do PostgreSQL)
+    sufixo = particao[len(tabela) + 1:] if particao.startswith(f"{tabela}_") else particao
+    return f"{nome}_{sufixo}"[:63]
+
+
+def criar_indice(nome: str, tabela: str, colunas: list, unique: bool = False, where: Optional[str] = None):
+    """
+    Cria um índice sem bloquear escritas na tabela
+    PostgreSQL: CREATE INDEX CONCURRENTLY fora da transação da migration;
+    tabelas particionadas não aceitam CONCURRENTLY no índice da mãe, então o
+    índice é criado em cada partição e anexado ao índice (ON ONLY) da mãe.
+    Idempotente: um índice INVALID de uma tentativa anterior é recriado
+    """
+    if not _postgres():
+        op.create_index(nome, tabela, colunas, unique=unique,
+                        sqlite_where=text(where) if where else None)
+        return
+
+    with op.get_context().autocommit_block():
+        conexao = op.get_bind()
+        if estrategia(conexao, tabela) is None:
+            _criar_indice_concorrente(nome, tabela, colunas, unique, where)
+            return
+
+        filtro = f" WHERE {where}" if where else ""
+        executar(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {_quote(nome)} "
+            f"ON ONLY {_quote(tabela)} ({', '.join(_quote(c) for c in colunas)}){filtro}"
+        )
+        for particao, _ in listar_particoes(conexao, tabela):
+            nome_particao = _nome_indice_particao(nome, tabela, particao)
+            _criar_indice_concorrente(nome_particao, particao, colunas, unique, where)
+            anexado = conexao.execute(
+                text("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:nome)"),
+                {"nome": nome_particao},
+            ).first()
+            if not anexado:
+                executar(f"ALTER INDEX {_quote(nome)} ATTACH PARTITION {_quote(nome_particao)}")
+        # Com todas as partições anexadas o índice da mãe fica válido sozinho
+
+
+def remover_indice(nome: str, tabela: str):
+    """
+    Remove um índice sem bloquear leituras da tabela
+    (DROP INDEX CONCURRENTLY; em tabela particionada, DROP comum sob lock_timeout)
+    """
+    if not _postgres():
+        op.drop_index(nome, table_name=tabela)
+        return
+
+    if estrategia(op.get_bind(), tabela) is not None:
+        executar(f"DROP INDEX IF EXISTS {_quote(nome)}")
+        return
+
+    with op.get_context().autocommit_block():
+        com_retentativa(lambda: op.drop_index(
+            nome, table_name=tabela, postgresql_concurrently=True, if_exists=True
+        ))
+
+
+def validar_restricao(nome: str, tabela: str):
+    """
+    VALIDATE CONSTRAINT em transação própria
+    Varre a tabela segurando só SHARE UPDATE EXCLUSIVE (não bloqueia escritas)
+    """
+    with op.get_context().autocommit_block():
+        executar(f"ALTER TABLE {_quote(tabela)} VALIDATE CONSTRAINT {_quote(nome)}")
+
+
+def criar_chave_estrangeira(nome: str, tabela: str, referida: str, colunas: list,
+                            colunas_referidas: list, ondelete: Optional[str] = None,
+                            validar: bool = True):
+    """
+    Adiciona uma FK sem varrer a tabela sob lock exclusivo
+    PostgreSQL: ADD CONSTRAINT ... NOT VALID (lock breve, com retentativa) e
+    VALIDATE CONSTRAINT em seguida; com validar=False a validação fica para
+    uma migration posterior (validar_restricao). Tabelas particionadas não
+    aceitam NOT VALID: a FK é criada validada, ainda sob lock_timeout
+    """
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table(tabela, naming_convention=CONVENCAO_SQLITE) as batch_op:
+            batch_op.create_foreign_key(nome, referida, colunas, colunas_referidas, ondelete=ondelete)
+        return
+
+    if not _postgres():
+        op.create_foreign_key(nome, tabela, referida, colunas, colunas_referidas, ondelete=ondelete)
+        return
+
+    particionada = estrategia(op.get_bind(), tabela) is not None
+    com_retentativa(lambda: op.create_foreign_key(
+        nome, tabela, referida, colunas, colunas_referidas,
+        ondelete=ondelete, postgresql_not_valid=not particionada,
+    ))
+    if validar and not particionada:
+        validar_restricao(nome, tabela)
@@ -7,8 +7,18 @@ from models.genero import Genero
 from models.manga_genero import MangaGenero
 from models.capitulo import Capitulo
 from models.avaliacao import Avaliacao
+from models.avaliacao_diaria import AvaliacaoDiaria
 from models.comentario import Comentario
+from models.comentario_arquivado import ComentarioArquivado
 from models.leitor_manga import LeitorManga
+from models.versao_referencia import VersaoReferencia
+from models.versao_cache import VersaoCache
+from models.backfill_progresso import BackfillProgresso
+from models.evento_outbox import EventoOutbox, OffsetOutbox
+from models.tendencia import TendenciaBalde, MangaEmAlta
+from models.notificacao import Notificacao, NotificacoesNaoLidas, EnvioNotificacao
+from models.progresso_pagina import ProgressoPagina
+from models.pagina_capitulo import PaginaCapitulo
 
 __all__ = [
     'Usuario',
@@ -20,6 +30,20 @@ __all__ = [
     'MangaGenero',
     'Capitulo',
     'Avaliacao',
+    'AvaliacaoDiaria',
     'Comentario',
+    'ComentarioArquivado',
     'LeitorManga',
+    'VersaoReferencia',
+    'VersaoCache',
+    'BackfillProgresso',
+    'EventoOutbox',
+    'OffsetOutbox',
+    'TendenciaBalde',
+    'MangaEmAlta',
+    'Notificacao',
+    'NotificacoesNaoLidas',
+    'EnvioNotificacao',
+    'ProgressoPagina',
+    'PaginaCapitulo',
 ]
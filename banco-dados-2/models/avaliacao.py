@@ -1,23 +1,30 @@
 """
 Modelo de Avaliação
 """
-from sqlalchemy import Column, Integer, Float, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from database import Base
+from datetime import datetime
 
 
 class Avaliacao(Base):
     """
     Modelo de Avaliação de Mangá
+    No PostgreSQL a tabela é particionada por HASH(id_manga) e a chave
+    primária é (id_avaliacao, id_manga): filtre sempre por id_manga para que
+    apenas uma partição seja lida
+    Cada flush também atualiza os agregados diários (avaliacoes_diarias)
     """
     __tablename__ = 'avaliacoes'
     
     id_avaliacao = Column(Integer, primary_key=True, autoincrement=True)
     nota = Column(Float, nullable=False)
+    criado_em = Column(DateTime, nullable=False, default=datetime.now)
+    atualizado_em = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
     
     # Chaves estrangeiras
-    id_leitor = Column(Integer, ForeignKey('leitores.id_usuario'), nullable=False)
-    id_manga = Column(Integer, ForeignKey('mangas.id_manga'), nullable=False)
+    id_leitor = Column(Integer, ForeignKey('leitores.id_usuario', ondelete='CASCADE'), nullable=False)
+    id_manga = Column(Integer, ForeignKey('mangas.id_manga', ondelete='CASCADE'), nullable=False)
     
     # Relacionamentos
     leitor = relationship("Leitor", back_populates="avaliacoes")
@@ -26,8 +33,13 @@ class Avaliacao(Base):
     # Constraint para nota entre 0.0 e 5.0
     __table_args__ = (
         CheckConstraint('nota >= 0.0 AND nota <= 5.0', name='check_nota_range'),
+        Index('ix_avaliacoes_id_manga', 'id_manga'),
+        Index('ix_avaliacoes_id_leitor', 'id_leitor'),
     )
     
+    # UPDATE/DELETE levam a chave de partição e atingem uma única partição
+    __mapper_args__ = {"primary_key": [id_avaliacao, id_manga]}
+    
     def editar_avaliacao(self, nova_nota: float) -> None:
         """Edita a nota da avaliação"""
         if 0.0 <= nova_nota <= 5.0:
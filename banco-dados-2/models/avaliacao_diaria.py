@@ -0,0 +1,216 @@
+"""
+Modelo de Agregado Diário de Avaliações
+"""
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import (
+    Column, Integer, BigInteger, Date, ForeignKey, select, delete, insert, func, case, cast, event, inspect
+)
+from database import Base, SessionLocal, insert_com_conflito
+from models.avaliacao import Avaliacao
+from models.manga import Manga
+
+
+# Faixas do histograma: nota em [n, n + 1), a última inclui 5.0
+FAIXAS_NOTA = range(6)
+
+CONTADORES = ["total", "soma_centesimos"] + [f"notas_{faixa}" for faixa in FAIXAS_NOTA]
+
+
+class AvaliacaoDiaria(Base):
+    """
+    Avaliações de um mangá criadas em um dia (total, soma e histograma)
+    Mantida incrementalmente a cada flush que insere, altera ou remove
+    avaliações: uma alteração de nota move a avaliação de faixa no dia em
+    que ela foi criada. Consultas de tendência leem só esta tabela.
+    A soma é inteira, em centésimos de nota: somas e subtrações repetidas
+    não acumulam erro de ponto flutuante
+    """
+    __tablename__ = 'avaliacoes_diarias'
+
+    id_manga = Column(Integer, ForeignKey('mangas.id_manga', ondelete='CASCADE'), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    soma_centesimos = Column(BigInteger, nullable=False, default=0)
+    notas_0 = Column(Integer, nullable=False, default=0)
+    notas_1 = Column(Integer, nullable=False, default=0)
+    notas_2 = Column(Integer, nullable=False, default=0)
+    notas_3 = Column(Integer, nullable=False, default=0)
+    notas_4 = Column(Integer, nullable=False, default=0)
+    notas_5 = Column(Integer, nullable=False, default=0)
+
+    @property
+    def soma_notas(self) -> float:
+        return self.soma_centesimos / 100
+
+    @property
+    def media(self):
+        return self.soma_centesimos / 100 / self.total if self.total else None
+
+    @property
+    def histograma(self) -> list:
+        return [getattr(self, f"notas_{faixa}") for faixa in FAIXAS_NOTA]
+
+    def __repr__(self):
+        return f"<AvaliacaoDiaria(manga_id={self.id_manga}, dia={self.dia}, total={self.total})>"
+
+
+def faixa_nota(nota: float) -> int:
+    """Faixa do histograma de uma nota"""
+    return min(int(nota), FAIXAS_NOTA[-1])
+
+
+def centesimos(nota: float) -> int:
+    """Nota em centésimos (exata para notas com até duas casas)"""
+    return round(nota * 100)
+
+
+def _centesimos_sql(nota):
+    return cast(func.round(nota * 100), BigInteger)
+
+
+def _faixa_sql(nota):
+    # CAST arredonda no PostgreSQL: as faixas são comparações explícitas
+    return case(*((nota >= faixa, faixa) for faixa in reversed(FAIXAS_NOTA[1:])), else_=0)
+
+
+def _dia(valor) -> date:
+    # date() do SQLite devolve texto
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, str):
+        return date.fromisoformat(valor[:10])
+    return valor
+
+
+def somar_avaliacao(deltas: dict, id_manga: int, criado_em, nota: float, sinal: int = 1):
+    """Acumula em `deltas` a entrada (sinal=1) ou saída (sinal=-1) de uma avaliação"""
+    contadores = deltas[(id_manga, _dia(criado_em))]
+    contadores["total"] += sinal
+    contadores["soma_centesimos"] += sinal * centesimos(nota)
+    contadores[f"notas_{faixa_nota(nota)}"] += sinal
+
+
+def novos_deltas() -> dict:
+    """(id_manga, dia) -> contadores a somar"""
+    return defaultdict(lambda: dict.fromkeys(CONTADORES, 0))
+
+
+def aplicar_deltas(conexao, deltas: dict):
+    """Soma os deltas nos agregados (upsert em ordem de chave, sem deadlocks entre escritores)"""
+    linhas = [
+        {"id_manga": id_manga, "dia": dia, **contadores}
+        for (id_manga, dia), contadores in sorted(deltas.items())
+        if any(contadores.values())
+    ]
+    if not linhas:
+        return
+
+    comando = insert_com_conflito(conexao, AvaliacaoDiaria)
+    conexao.execute(
+        comando.on_conflict_do_update(
+            index_elements=["id_manga", "dia"],
+            set_={c: getattr(AvaliacaoDiaria, c) + getattr(comando.excluded, c) for c in CONTADORES},
+        ),
+        linhas,
+    )
+    conexao.execute(
+        delete(AvaliacaoDiaria).where(
+            AvaliacaoDiaria.id_manga.in_({linha["id_manga"] for linha in linhas}),
+            AvaliacaoDiaria.total <= 0,
+        )
+    )
+
+
+def consulta_agregados(condicao):
+    """SELECT dos agregados calculados direto de avaliacoes para as linhas da condição"""
+    dia = func.date(Avaliacao.criado_em)
+    faixa = _faixa_sql(Avaliacao.nota)
+    return (
+        select(
+            Avaliacao.id_manga,
+            dia.label("dia"),
+            func.count().label("total"),
+            func.sum(_centesimos_sql(Avaliacao.nota)).label("soma_centesimos"),
+            *(func.sum(case((faixa == n, 1), else_=0)).label(f"notas_{n}") for n in FAIXAS_NOTA),
+        )
+        .where(condicao)
+        .group_by(Avaliacao.id_manga, dia)
+    )
+
+
+def recalcular_agregados(conexao, ids_manga) -> int:
+    """
+    Recalcula do zero os agregados dos mangás (lista de ids ou SELECT)
+    Usado pelo backfill e quando o flush não tem os valores anteriores
+    """
+    conexao.execute(delete(AvaliacaoDiaria).where(AvaliacaoDiaria.id_manga.in_(ids_manga)))
+    linhas = [
+        {**linha._mapping, "dia": _dia(linha.dia)}
+        for linha in conexao.execute(consulta_agregados(Avaliacao.id_manga.in_(ids_manga)))
+    ]
+    if linhas:
+        conexao.execute(insert(AvaliacaoDiaria), linhas)
+    return len(linhas)
+
+
+def remover_dos_agregados(conexao, condicao):
+    """
+    Desconta as avaliações da condição antes de um DELETE em massa
+    (ex.: leitores removidos, cujas avaliações saem pelo CASCADE)
+    """
+    deltas = novos_deltas()
+    for linha in conexao.execute(consulta_agregados(condicao)):
+        contadores = deltas[(linha.id_manga, _dia(linha.dia))]
+        for coluna in CONTADORES:
+            contadores[coluna] -= getattr(linha, coluna)
+    aplicar_deltas(conexao, deltas)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _atualizar_agregados(session, contexto_flush):
+    """Converte avaliações inseridas, alteradas e removidas no flush em deltas"""
+    deltas = novos_deltas()
+    recalcular = set()
+
+    for objeto in session.new:
+        if isinstance(objeto, Avaliacao):
+            somar_avaliacao(deltas, objeto.id_manga, objeto.criado_em or datetime.now(), objeto.nota)
+
+    for objeto in session.dirty:
+        if not isinstance(objeto, Avaliacao):
+            continue
+        estado = inspect(objeto)
+        historicos = {c: estado.attrs[c].history for c in ("nota", "id_manga", "criado_em")}
+        if not any(h.has_changes() for h in historicos.values()):
+            continue
+        anteriores = {c: (h.deleted or h.unchanged or [None])[0] for c, h in historicos.items()}
+        if None in anteriores.values():
+            # Valor anterior não estava carregado: recalcula o(s) mangá(s)
+            recalcular.update(i for i in (anteriores["id_manga"], objeto.id_manga) if i is not None)
+            continue
+        somar_avaliacao(deltas, anteriores["id_manga"], anteriores["criado_em"], anteriores["nota"], -1)
+        somar_avaliacao(deltas, objeto.id_manga, objeto.criado_em, objeto.nota)
+
+    for objeto in session.deleted:
+        if isinstance(objeto, Avaliacao):
+            # Objeto removido: só o estado carregado; id_manga vem da identidade
+            estado = inspect(objeto)
+            id_manga = estado.identity[1]
+            if None in (estado.dict.get("nota"), estado.dict.get("criado_em")):
+                recalcular.add(id_manga)
+            else:
+                somar_avaliacao(deltas, id_manga, estado.dict["criado_em"], estado.dict["nota"], -1)
+
+    # Mangás removidos neste flush: os agregados já saíram pelo CASCADE
+    removidos = {estado.identity[0] for estado in map(inspect, session.deleted)
+                 if estado.mapper.class_ is Manga}
+    recalcular -= removidos
+
+    if deltas or recalcular:
+        conexao = session.connection()
+        aplicar_deltas(conexao, {k: v for k, v in deltas.items()
+                                 if k[0] not in recalcular and k[0] not in removidos})
+        if recalcular:
+            recalcular_agregados(conexao, sorted(recalcular))
@@ -0,0 +1,27 @@
+"""
+Modelo de Progresso de Backfill
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from database import Base
+from datetime import datetime
+
+
+class BackfillProgresso(Base):
+    """
+    Checkpoint de um backfill registrado em backfill.py
+    Atualizado na mesma transação de cada lote: após uma falha o backfill
+    continua do último id confirmado
+    """
+    __tablename__ = 'backfills_progresso'
+    
+    nome = Column(String(100), primary_key=True)
+    ultimo_id = Column(BigInteger, nullable=True)  # último id já processado
+    id_maximo = Column(BigInteger, nullable=True)  # fim do intervalo, fixado na 1ª execução
+    linhas_processadas = Column(BigInteger, nullable=False, default=0)
+    lotes = Column(Integer, nullable=False, default=0)
+    iniciado_em = Column(DateTime, nullable=False, default=datetime.now)
+    atualizado_em = Column(DateTime, nullable=False, default=datetime.now)
+    concluido_em = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<BackfillProgresso(nome={self.nome}, ultimo_id={self.ultimo_id}, id_maximo={self.id_maximo})>"
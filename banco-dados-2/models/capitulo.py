@@ -1,7 +1,7 @@
 """
 Modelo de Capítulo
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, select
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -17,7 +17,6 @@ class Capitulo(Base):
     titulo_capitulo = Column(String(255), nullable=False)
     numero_capitulo = Column(Integer, nullable=False)
     numero_paginas = Column(Integer, nullable=False, default=0)
-    paginas_lidas = Column(Integer, default=0)
     data_publicacao = Column(DateTime, nullable=False, default=datetime.now)
     
     # Chave estrangeira
@@ -25,19 +24,49 @@ class Capitulo(Base):
     
     # Relacionamento
     manga = relationship("Manga", back_populates="capitulos")
+    paginas = relationship("PaginaCapitulo", order_by="PaginaCapitulo.numero_pagina",
+                           cascade="all, delete-orphan", passive_deletes=True)
     
-    def get_paginas_lidas(self) -> int:
-        """Retorna o número de páginas lidas"""
-        return self.paginas_lidas
+    # Um número por mangá; atende também a navegação e o "continuar lendo"
+    __table_args__ = (
+        Index('ux_capitulos_id_manga_numero', 'id_manga', 'numero_capitulo', unique=True),
+    )
     
-    def marcar_progresso(self, paginas: int):
-        """Marca o progresso de leitura"""
+    def get_paginas_lidas(self, id_leitor: int, session) -> int:
+        """Retorna a última página lida pelo leitor"""
+        from progresso_paginas import pagina_atual
+        return pagina_atual(session, id_leitor, self.id_capitulo)
+    
+    def marcar_progresso(self, id_leitor: int, paginas: int):
+        """Marca o progresso de leitura do leitor (gravado em lote pelo buffer de progresso)"""
+        from progresso_paginas import registrar_pagina
         if 0 <= paginas <= self.numero_paginas:
-            self.paginas_lidas = paginas
+            registrar_pagina(id_leitor, self.id_capitulo, paginas)
+    
+    def concluir(self, id_leitor: int, session):
+        """Marca o capítulo como concluído pelo leitor (na transação da sessão)"""
+        from progresso_paginas import gravar_pagina
+        gravar_pagina(session, id_leitor, self.id_capitulo, self.numero_paginas)
+    
+    def _vizinho(self, session, seguinte: bool):
+        coluna = Capitulo.numero_capitulo
+        return session.scalars(
+            select(Capitulo)
+            .where(
+                Capitulo.id_manga == self.id_manga,
+                coluna > self.numero_capitulo if seguinte else coluna < self.numero_capitulo,
+            )
+            .order_by(coluna if seguinte else coluna.desc())
+            .limit(1)
+        ).first()
+    
+    def proximo(self, session):
+        """Capítulo seguinte do mesmo mangá (None no último), sem carregar a lista"""
+        return self._vizinho(session, seguinte=True)
     
-    def concluir(self):
-        """Marca o capítulo como concluído"""
-        self.paginas_lidas = self.numero_paginas
+    def anterior(self, session):
+        """Capítulo anterior do mesmo mangá (None no primeiro), sem carregar a lista"""
+        return self._vizinho(session, seguinte=False)
     
     def __repr__(self):
         return f"<Capitulo(id={self.id_capitulo}, numero={self.numero_capitulo}, titulo={self.titulo_capitulo})>"
@@ -1,15 +1,19 @@
 """
 Modelo de Comentário
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
+from particionamento import ESTRATEGIA_COMENTARIOS
 
 
 class Comentario(Base):
     """
     Modelo de Comentário em Mangá
+    No PostgreSQL a tabela é particionada por HASH(id_manga) ou por
+    RANGE(data_criacao) (ver particionamento.py): filtre por id_manga nas
+    leituras de um mangá para que o planner descarte as demais partições
     """
     __tablename__ = 'comentarios'
     
@@ -19,13 +23,24 @@ class Comentario(Base):
     data_criacao = Column(DateTime, default=datetime.now, nullable=False)
     
     # Chaves estrangeiras
-    id_leitor = Column(Integer, ForeignKey('leitores.id_usuario'), nullable=False)
-    id_manga = Column(Integer, ForeignKey('mangas.id_manga'), nullable=False)
+    id_leitor = Column(Integer, ForeignKey('leitores.id_usuario', ondelete='CASCADE'), nullable=False)
+    id_manga = Column(Integer, ForeignKey('mangas.id_manga', ondelete='CASCADE'), nullable=False)
     
     # Relacionamentos
     leitor = relationship("Leitor", back_populates="comentarios")
     manga = relationship("Manga", back_populates="comentarios")
     
+    __table_args__ = (
+        Index('ix_comentarios_id_manga_data_criacao', 'id_manga', 'data_criacao'),
+        Index('ix_comentarios_id_leitor', 'id_leitor'),
+    )
+    
+    # UPDATE/DELETE levam a chave de partição do modo escolhido na migração
+    # (mesma PK que particionamento.particionar_tabelas cria)
+    __mapper_args__ = {
+        "primary_key": [id_comentario, data_criacao if ESTRATEGIA_COMENTARIOS == "range" else id_manga]
+    }
+    
     def responder_comentario(self, leitor, texto: str):
         """
         Cria uma resposta ao comentário (implementação simplificada)
@@ -0,0 +1,33 @@
+"""
+Modelo de Comentário Arquivado
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from database import Base
+from datetime import datetime
+
+
+class ComentarioArquivado(Base):
+    """
+    Comentário antigo movido de `comentarios` pelo job de arquivamento
+    Mantém o id original; lido apenas quando o leitor pagina além da
+    janela quente (ver arquivamento.py)
+    """
+    __tablename__ = 'comentarios_arquivo'
+    
+    id_comentario = Column(Integer, primary_key=True, autoincrement=False)
+    texto_comentario = Column(String(1000), nullable=False)
+    numero_curtidas = Column(Integer, default=0)
+    data_criacao = Column(DateTime, nullable=False)
+    arquivado_em = Column(DateTime, nullable=False, default=datetime.now)
+    
+    # Chaves estrangeiras (o arquivo some junto com o mangá/leitor)
+    id_leitor = Column(Integer, ForeignKey('leitores.id_usuario', ondelete='CASCADE'), nullable=False)
+    id_manga = Column(Integer, ForeignKey('mangas.id_manga', ondelete='CASCADE'), nullable=False)
+    
+    # Mesma ordem do feed: (data_criacao, id_comentario) por mangá
+    __table_args__ = (
+        Index('ix_comentarios_arquivo_manga_data_id', 'id_manga', 'data_criacao', 'id_comentario'),
+    )
+    
+    def __repr__(self):
+        return f"<ComentarioArquivado(id={self.id_comentario}, manga_id={self.id_manga}, data={self.data_criacao})>"
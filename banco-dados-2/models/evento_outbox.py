@@ -0,0 +1,161 @@
+"""
+Modelo de Evento de Outbox (feed de alterações)
+"""
+import enum
+import os
+from datetime import date, datetime
+
+from sqlalchemy import (
+    Column, Integer, BigInteger, String, DateTime, JSON, Index,
+    event, insert, inspect, text
+)
+from database import Base, SessionLocal
+from models.manga import Manga
+from models.capitulo import Capitulo
+from models.avaliacao import Avaliacao
+from models.comentario import Comentario
+from models.leitor_manga import LeitorManga
+
+
+# Desligável para cargas em massa (ex.: seed de benchmark)
+OUTBOX_ATIVO = os.getenv("OUTBOX_ATIVO", "1") != "0"
+
+# Modelo -> nome da entidade no feed
+ENTIDADES = {
+    Manga: "manga",
+    Capitulo: "capitulo",
+    Avaliacao: "avaliacao",
+    Comentario: "comentario",
+    LeitorManga: "leitor_manga",
+}
+
+
+class EventoOutbox(Base):
+    """
+    Alteração em um mangá, capítulo, avaliação, comentário ou leitura
+    Gravada na mesma transação da alteração (evento de flush); lida em
+    ordem pelos consumidores de outbox.py. `dados` traz as colunas novas
+    (insert/update), os valores anteriores das alteradas (update, em
+    "anteriores") ou a linha removida (delete). As exclusões em massa
+    gravam só o delete do "manga" ou do "leitor": as linhas filhas removidas
+    pelo CASCADE não têm evento próprio
+    """
+    __tablename__ = 'outbox_eventos'
+
+    id_evento = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    # Transação que gravou o evento (PostgreSQL): define a ordem de leitura
+    id_transacao = Column(BigInteger, nullable=False, default=0)
+    entidade = Column(String(30), nullable=False)
+    id_entidade = Column(Integer, nullable=False)
+    operacao = Column(String(10), nullable=False)  # insert, update, delete
+    id_manga = Column(Integer, nullable=True)
+    id_leitor = Column(Integer, nullable=True)
+    dados = Column(JSON, nullable=True)
+    criado_em = Column(DateTime, nullable=False, default=datetime.now)
+
+    # Ordem do feed
+    __table_args__ = (
+        Index('ix_outbox_eventos_transacao_evento', 'id_transacao', 'id_evento'),
+    )
+
+    def __repr__(self):
+        return f"<EventoOutbox(id={self.id_evento}, {self.operacao} {self.entidade}:{self.id_entidade})>"
+
+
+class OffsetOutbox(Base):
+    """Posição de um consumidor no feed: último (id_transacao, id_evento) processado"""
+    __tablename__ = 'outbox_offsets'
+
+    consumidor = Column(String(100), primary_key=True)
+    id_transacao = Column(BigInteger, nullable=False, default=0)
+    id_evento = Column(BigInteger, nullable=False, default=0)
+    atualizado_em = Column(DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f"<OffsetOutbox(consumidor={self.consumidor}, id_evento={self.id_evento})>"
+
+
+def _serializar(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, enum.Enum):
+        return valor.name
+    if isinstance(valor, bytes):
+        return valor.hex()  # ex.: bitmap de capítulos lidos
+    return valor
+
+
+def dados_linha(linha) -> dict:
+    """Colunas de uma linha (Row do Core) em formato JSON"""
+    return {chave: _serializar(valor) for chave, valor in linha._mapping.items()}
+
+
+def evento(entidade: str, id_entidade: int, operacao: str, id_manga=None, id_leitor=None, dados=None) -> dict:
+    """Parâmetros de um evento para registrar_eventos"""
+    return {
+        "entidade": entidade, "id_entidade": id_entidade, "operacao": operacao,
+        "id_manga": id_manga, "id_leitor": id_leitor, "dados": dados,
+        "criado_em": datetime.now(),
+    }
+
+
+def registrar_eventos(conexao, eventos: list):
+    """
+    Grava os eventos na transação da conexão (um único INSERT)
+    Para alterações feitas fora do ORM, como DELETEs em massa
+    """
+    if not eventos or not OUTBOX_ATIVO:
+        return
+    comando = insert(EventoOutbox)
+    if conexao.dialect.name == "postgresql":
+        comando = comando.values(id_transacao=text("pg_current_xact_id()::text::bigint"))
+    conexao.execute(comando, eventos)
+
+
+def _evento_objeto(objeto, operacao: str) -> dict:
+    estado = inspect(objeto)
+    mapper = estado.mapper
+    dados = {}
+
+    if operacao == "update":
+        anteriores = {}
+        for coluna in mapper.column_attrs:
+            historico = estado.attrs[coluna.key].history
+            if historico.has_changes():
+                dados[coluna.key] = _serializar(getattr(objeto, coluna.key))
+                if historico.deleted:
+                    anteriores[coluna.key] = _serializar(historico.deleted[0])
+        if not dados:
+            return None
+        dados["anteriores"] = anteriores
+    else:
+        dados = {
+            coluna.key: _serializar(estado.dict.get(coluna.key))
+            for coluna in mapper.column_attrs
+        }
+
+    # Objeto removido: só o estado carregado (um refresh falharia)
+    valor = estado.dict.get if operacao == "delete" else lambda chave: getattr(objeto, chave, None)
+    return evento(
+        ENTIDADES[mapper.class_],
+        mapper.primary_key_from_instance(objeto)[0],
+        operacao,
+        valor("id_manga"),
+        valor("id_leitor"),
+        dados,
+    )
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _gravar_eventos(session, contexto_flush):
+    """Converte as alterações do flush em eventos na mesma transação"""
+    eventos = []
+    for operacao, objetos in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for objeto in objetos:
+            if type(objeto) in ENTIDADES:
+                registro = _evento_objeto(objeto, operacao)
+                if registro:
+                    eventos.append(registro)
+
+    if eventos:
+        registrar_eventos(session.connection(), eventos)
@@ -1,9 +1,10 @@
 """
 Modelo de Gênero
 """
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, event
 from sqlalchemy.orm import relationship
-from database import Base
+from database import Base, SessionLocal
+from models.versao_referencia import incrementar_versao
 
 
 class Genero(Base):
@@ -16,7 +17,7 @@ class Genero(Base):
     tipo_genero = Column(String(100), unique=True, nullable=False)
     
     # Relacionamentos
-    manga_generos = relationship("MangaGenero", back_populates="genero", cascade="all, delete-orphan")
+    manga_generos = relationship("MangaGenero", back_populates="genero", cascade="all, delete-orphan", passive_deletes=True)
     
     def renomear(self, novo_nome: str) -> None:
         """Renomeia o gênero"""
@@ -24,3 +25,10 @@ class Genero(Base):
     
     def __repr__(self):
         return f"<Genero(id={self.id_genero}, tipo={self.tipo_genero})>"
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _incrementar_versao_generos(session, contexto_flush):
+    """Sinaliza aos caches de referência que os gêneros mudaram"""
+    if any(isinstance(o, Genero) for o in (*session.new, *session.dirty, *session.deleted)):
+        incrementar_versao(session.connection(), "generos")
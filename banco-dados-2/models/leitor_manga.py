@@ -1,12 +1,42 @@
 """
 Modelo de relacionamento Leitor-Manga (Tabela Associativa)
 """
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, Float, DateTime, LargeBinary, ForeignKey, Index, select, text, inspect
+from sqlalchemy.orm import relationship, object_session
 from database import Base
 from datetime import datetime
 
 
+# Capítulos lidos: bit n (byte n // 8, bit n % 8) = capítulo número n,
+# sem bytes zerados no fim. 1000 capítulos cabem em 126 bytes
+
+def bitmap_para_int(bitmap) -> int:
+    """bytes do banco -> inteiro (None ou vazio = nenhum capítulo)"""
+    return int.from_bytes(bitmap, "little") if bitmap else 0
+
+
+def int_para_bitmap(bits: int):
+    """inteiro -> bytes do banco (None quando nenhum capítulo foi lido)"""
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little") if bits else None
+
+
+def mascara_faixa(inicio: int, fim: int) -> int:
+    """Bits dos capítulos inicio..fim (inclusive)"""
+    if inicio < 0 or fim < inicio:
+        raise ValueError(f"Faixa de capítulos inválida: {inicio}..{fim}")
+    return ((1 << (fim - inicio + 1)) - 1) << inicio
+
+
+def numeros_lidos(bits: int) -> list:
+    """Números dos capítulos marcados, em ordem"""
+    numeros = []
+    while bits:
+        menor = bits & -bits
+        numeros.append(menor.bit_length() - 1)
+        bits ^= menor
+    return numeros
+
+
 class LeitorManga(Base):
     """
     Tabela associativa entre Leitor e Manga
@@ -17,18 +47,29 @@ class LeitorManga(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     
     # Chaves estrangeiras
-    id_leitor = Column(Integer, ForeignKey('leitores.id_usuario'), nullable=False)
-    id_manga = Column(Integer, ForeignKey('mangas.id_manga'), nullable=False)
+    id_leitor = Column(Integer, ForeignKey('leitores.id_usuario', ondelete='CASCADE'), nullable=False)
+    id_manga = Column(Integer, ForeignKey('mangas.id_manga', ondelete='CASCADE'), nullable=False)
     
     # Atributos do relacionamento
     data_favorito = Column(DateTime, nullable=True)
     progresso_leitura = Column(Float, default=0.0)  # Percentual de 0.0 a 100.0
     ultimo_capitulo_lido = Column(Integer, default=0)
+    capitulos_lidos = Column(LargeBinary, nullable=True)  # bitmap por numero_capitulo (ver bitmap_para_int)
     
     # Relacionamentos
     leitor = relationship("Leitor", back_populates="leituras")
     manga = relationship("Manga", back_populates="leituras")
     
+    # Índices das FKs (consultas por leitor e ON DELETE CASCADE)
+    __table_args__ = (
+        Index('ix_leitor_manga_id_leitor_id_manga', 'id_leitor', 'id_manga'),
+        Index('ix_leitor_manga_id_manga', 'id_manga'),
+        # Seguidores de um mangá em ordem de leitor (envio de notificações)
+        Index('ix_leitor_manga_favoritos', 'id_manga', 'id_leitor',
+              postgresql_where=text('data_favorito IS NOT NULL'),
+              sqlite_where=text('data_favorito IS NOT NULL')),
+    )
+    
     def marcar_como_favorito(self):
         """Marca o mangá como favorito"""
         if not self.data_favorito:
@@ -43,6 +84,8 @@ class LeitorManga(Base):
         # Garantir que ultimo_capitulo_lido não seja None
         if self.ultimo_capitulo_lido is None:
             self.ultimo_capitulo_lido = 0
+        
+        self.marcar_lidos(capitulo.numero_capitulo, capitulo.numero_capitulo)
             
         if capitulo.numero_capitulo > self.ultimo_capitulo_lido:
             self.ultimo_capitulo_lido = capitulo.numero_capitulo
@@ -52,5 +95,49 @@ class LeitorManga(Base):
             if total_capitulos > 0:
                 self.progresso_leitura = round((self.ultimo_capitulo_lido / total_capitulos) * 100, 2)
     
+    def _bits_para_alterar(self) -> int:
+        """
+        Bitmap atual relido com a linha travada (SELECT ... FOR UPDATE) até o
+        fim da transação: marcações concorrentes do mesmo leitor não se perdem.
+        Se o bitmap já foi alterado nesta transação, a linha já está travada
+        """
+        session = object_session(self)
+        estado = inspect(self)
+        if session is not None and estado.persistent and not estado.attrs.capitulos_lidos.history.has_changes():
+            session.refresh(self, ["capitulos_lidos"], with_for_update=True)
+        return bitmap_para_int(self.capitulos_lidos)
+    
+    def marcar_lidos(self, inicio: int, fim: int):
+        """Marca como lidos os capítulos inicio..fim (inclusive) em uma operação"""
+        self.capitulos_lidos = int_para_bitmap(self._bits_para_alterar() | mascara_faixa(inicio, fim))
+    
+    def desmarcar_lidos(self, inicio: int, fim: int):
+        """Desmarca os capítulos inicio..fim (inclusive)"""
+        self.capitulos_lidos = int_para_bitmap(self._bits_para_alterar() & ~mascara_faixa(inicio, fim))
+    
+    def foi_lido(self, numero_capitulo: int) -> bool:
+        """Indica se o capítulo está marcado como lido"""
+        return numero_capitulo >= 0 and bool(bitmap_para_int(self.capitulos_lidos) >> numero_capitulo & 1)
+    
+    def total_lidos(self) -> int:
+        """Quantidade de capítulos marcados como lidos"""
+        return bitmap_para_int(self.capitulos_lidos).bit_count()
+    
+    def numeros_lidos(self) -> list:
+        """Números dos capítulos lidos, em ordem"""
+        return numeros_lidos(bitmap_para_int(self.capitulos_lidos))
+    
+    def capitulos_nao_lidos(self, session) -> list:
+        """Números dos capítulos do mangá ainda não lidos (inclui os pulados), em ordem"""
+        from models.capitulo import Capitulo
+        
+        bits = bitmap_para_int(self.capitulos_lidos)
+        numeros = session.execute(
+            select(Capitulo.numero_capitulo)
+            .where(Capitulo.id_manga == self.id_manga)
+            .order_by(Capitulo.numero_capitulo)
+        ).scalars()
+        return [n for n in numeros if n < 0 or not bits >> n & 1]
+    
     def __repr__(self):
         return f"<LeitorManga(leitor_id={self.id_leitor}, manga_id={self.id_manga}, progresso={self.progresso_leitura}%)>"
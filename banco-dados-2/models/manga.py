@@ -1,7 +1,7 @@
 """
 Modelo de Manga com enumerações de Status
 """
-from sqlalchemy import Column, Integer, String, Enum as SQLEnum, DateTime
+from sqlalchemy import Column, Integer, String, Enum as SQLEnum, DateTime, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -27,12 +27,21 @@ class Manga(Base):
     status = Column(SQLEnum(Status), nullable=False, default=Status.EM_ANDAMENTO)
     data_criacao = Column(DateTime, nullable=False, default=datetime.now)
     
-    # Relacionamentos
-    capitulos = relationship("Capitulo", back_populates="manga", cascade="all, delete-orphan")
-    comentarios = relationship("Comentario", back_populates="manga", cascade="all, delete-orphan")
-    avaliacoes = relationship("Avaliacao", back_populates="manga", cascade="all, delete-orphan")
-    leituras = relationship("LeitorManga", back_populates="manga", cascade="all, delete-orphan")
-    manga_generos = relationship("MangaGenero", back_populates="manga", cascade="all, delete-orphan")
+    # Relacionamentos (filhos removidos pelo ON DELETE CASCADE do banco)
+    capitulos = relationship("Capitulo", back_populates="manga", cascade="all, delete-orphan", passive_deletes=True,
+                             order_by="Capitulo.numero_capitulo")
+    comentarios = relationship("Comentario", back_populates="manga", cascade="all, delete-orphan", passive_deletes=True)
+    avaliacoes = relationship("Avaliacao", back_populates="manga", cascade="all, delete-orphan", passive_deletes=True)
+    leituras = relationship("LeitorManga", back_populates="manga", cascade="all, delete-orphan", passive_deletes=True)
+    manga_generos = relationship("MangaGenero", back_populates="manga", cascade="all, delete-orphan", passive_deletes=True)
+    
+    # Índices compostos para paginação por keyset (ver paginacao.py)
+    __table_args__ = (
+        Index('ix_mangas_titulo_id', 'titulo_manga', 'id_manga'),
+        Index('ix_mangas_data_criacao_id', 'data_criacao', 'id_manga'),
+        Index('ix_mangas_status_titulo_id', 'status', 'titulo_manga', 'id_manga'),
+        Index('ix_mangas_status_data_criacao_id', 'status', 'data_criacao', 'id_manga'),
+    )
     
     def adicionar_capitulo(self, capitulo):
         """Adiciona um capítulo ao mangá"""
@@ -58,6 +67,24 @@ class Manga(Base):
         )
         return comentario
     
+    def adicionar_genero(self, nome_genero: str, session, principal: bool = False):
+        """Associa um gênero pelo nome (resolvido pelo cache de referência)"""
+        from models.manga_genero import MangaGenero
+        from dados_referencia import catalogo_generos
+        
+        id_genero = catalogo_generos(session).id_por_nome(nome_genero)
+        manga_genero = MangaGenero(id_genero=id_genero, principal=principal)
+        self.manga_generos.append(manga_genero)
+        return manga_genero
+    
+    def pagina_comentarios(self, session, limite: int = 20, apos: tuple = None):
+        """
+        Comentários do mais recente ao mais antigo, paginados por cursor
+        Recorre ao arquivo de comentários só ao passar da janela quente
+        """
+        from arquivamento import pagina_comentarios
+        return pagina_comentarios(session, self.id_manga, limite, apos)
+    
     def obter_media_avaliacoes(self) -> float:
         """Calcula a média das avaliações do mangá"""
         if not self.avaliacoes:
@@ -0,0 +1,87 @@
+"""
+Modelos de Notificação (caixa de entrada dos leitores)
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index, text, event
+from database import Base, SessionLocal
+
+
+class Notificacao(Base):
+    """
+    Notificação na caixa de entrada de um leitor (ex.: capítulo novo de um
+    mangá favorito). Inserida em lotes pelo envio (notificacoes.py); o
+    capítulo removido depois não apaga a notificação
+    """
+    __tablename__ = 'notificacoes'
+
+    id_notificacao = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    id_leitor = Column(Integer, ForeignKey('leitores.id_usuario', ondelete='CASCADE'), nullable=False)
+    id_manga = Column(Integer, ForeignKey('mangas.id_manga', ondelete='CASCADE'), nullable=False)
+    id_capitulo = Column(Integer, ForeignKey('capitulos.id_capitulo', ondelete='SET NULL'), nullable=True)
+    tipo = Column(String(30), nullable=False, default='novo_capitulo')
+    criada_em = Column(DateTime, nullable=False, default=datetime.now)
+    lida_em = Column(DateTime, nullable=True)
+
+    # Caixa de entrada (keyset por id_notificacao) e FKs
+    __table_args__ = (
+        Index('ix_notificacoes_id_leitor_id_notificacao', 'id_leitor', 'id_notificacao'),
+        Index('ix_notificacoes_nao_lidas', 'id_leitor', 'id_notificacao',
+              postgresql_where=text('lida_em IS NULL'), sqlite_where=text('lida_em IS NULL')),
+        Index('ix_notificacoes_id_manga', 'id_manga'),
+        Index('ix_notificacoes_id_capitulo', 'id_capitulo'),
+    )
+
+    def __repr__(self):
+        return f"<Notificacao(id={self.id_notificacao}, leitor_id={self.id_leitor}, tipo={self.tipo})>"
+
+
+class NotificacoesNaoLidas(Base):
+    """Contador de notificações não lidas por leitor (evita COUNT na caixa de entrada)"""
+    __tablename__ = 'notificacoes_nao_lidas'
+
+    id_leitor = Column(Integer, ForeignKey('leitores.id_usuario', ondelete='CASCADE'), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<NotificacoesNaoLidas(leitor_id={self.id_leitor}, total={self.total})>"
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _descontar_mangas_removidos(session, contexto_flush, instancias):
+    """
+    Mangás removidos pela sessão (session.delete): as notificações saem pelo
+    CASCADE, então as não lidas são descontadas antes do DELETE
+    """
+    from models.manga import Manga
+    from notificacoes import descontar_nao_lidas
+
+    ids_manga = [objeto.id_manga for objeto in session.deleted if isinstance(objeto, Manga)]
+    if ids_manga:
+        descontar_nao_lidas(session.connection(), Notificacao.id_manga.in_(ids_manga))
+
+
+class EnvioNotificacao(Base):
+    """
+    Envio pendente ou concluído das notificações de um capítulo
+    Criado junto com o capítulo; os lotes avançam por id_leitor
+    (ultimo_id_leitor), cada um na sua transação, e o envio é retomável
+    """
+    __tablename__ = 'envios_notificacao'
+
+    id_envio = Column(Integer, primary_key=True, autoincrement=True)
+    id_manga = Column(Integer, ForeignKey('mangas.id_manga', ondelete='CASCADE'), nullable=False)
+    id_capitulo = Column(Integer, ForeignKey('capitulos.id_capitulo', ondelete='SET NULL'), nullable=True)
+    tipo = Column(String(30), nullable=False, default='novo_capitulo')
+    ultimo_id_leitor = Column(Integer, nullable=False, default=0)
+    notificacoes = Column(BigInteger, nullable=False, default=0)
+    criado_em = Column(DateTime, nullable=False, default=datetime.now)
+    concluido_em = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_envios_notificacao_id_manga', 'id_manga'),
+        Index('ix_envios_notificacao_id_capitulo', 'id_capitulo'),
+    )
+
+    def __repr__(self):
+        return f"<EnvioNotificacao(id={self.id_envio}, manga_id={self.id_manga}, ultimo_leitor={self.ultimo_id_leitor})>"
@@ -0,0 +1,29 @@
+"""
+Modelo de Página de Capítulo
+"""
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from database import Base
+
+
+class PaginaCapitulo(Base):
+    """
+    Página (imagem) de um capítulo importado
+    O arquivo fica no armazenamento por conteúdo (importacao_capitulos.py),
+    endereçado pelo sha256: páginas iguais em capítulos diferentes são
+    gravadas uma vez só
+    """
+    __tablename__ = 'paginas_capitulo'
+
+    id_capitulo = Column(Integer, ForeignKey('capitulos.id_capitulo', ondelete='CASCADE'), primary_key=True)
+    numero_pagina = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), nullable=False)
+    formato = Column(String(10), nullable=False)  # jpg, png, gif, webp
+    tamanho_bytes = Column(Integer, nullable=False)
+
+    # Quem usa um arquivo do armazenamento (deduplicação e limpeza)
+    __table_args__ = (
+        Index('ix_paginas_capitulo_sha256', 'sha256'),
+    )
+
+    def __repr__(self):
+        return f"<PaginaCapitulo(capitulo_id={self.id_capitulo}, numero={self.numero_pagina}, sha256={self.sha256[:12]})>"
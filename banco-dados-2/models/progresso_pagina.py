@@ -0,0 +1,29 @@
+"""
+Modelo de Progresso de Página (leitor x capítulo)
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from database import Base
+
+
+class ProgressoPagina(Base):
+    """
+    Última página lida de um capítulo por um leitor
+    Gravada em lotes pelo BufferProgresso (progresso_paginas.py): cada
+    virada de página só atualiza o buffer em memória
+    """
+    __tablename__ = 'progresso_paginas'
+
+    id_leitor = Column(Integer, ForeignKey('leitores.id_usuario', ondelete='CASCADE'), primary_key=True)
+    id_capitulo = Column(Integer, ForeignKey('capitulos.id_capitulo', ondelete='CASCADE'), primary_key=True)
+    pagina = Column(Integer, nullable=False, default=0)
+    atualizado_em = Column(DateTime, nullable=False, default=datetime.now)
+
+    # FK de capitulos (ON DELETE CASCADE); por leitor a PK já atende
+    __table_args__ = (
+        Index('ix_progresso_paginas_id_capitulo', 'id_capitulo'),
+    )
+
+    def __repr__(self):
+        return f"<ProgressoPagina(leitor_id={self.id_leitor}, capitulo_id={self.id_capitulo}, pagina={self.pagina})>"
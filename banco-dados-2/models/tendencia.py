@@ -0,0 +1,59 @@
+"""
+Modelos do ranking de mangás em alta
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
+from database import Base
+
+
+class TendenciaBalde(Base):
+    """
+    Atividade de um mangá em um intervalo de tempo (balde)
+    `balde` é o número do intervalo desde a época Unix (instante //
+    TENDENCIAS_BALDE segundos). Preenchida pelo consumidor de outbox de
+    tendencias.py; baldes mais antigos que a maior janela são removidos
+    """
+    __tablename__ = 'tendencia_baldes'
+
+    id_manga = Column(Integer, ForeignKey('mangas.id_manga', ondelete='CASCADE'), primary_key=True)
+    balde = Column(Integer, primary_key=True)
+    leituras = Column(Integer, nullable=False, default=0)
+    avaliacoes = Column(Integer, nullable=False, default=0)
+    comentarios = Column(Integer, nullable=False, default=0)
+    curtidas = Column(Integer, nullable=False, default=0)
+    pontos = Column(Float, nullable=False, default=0.0)  # atividade ponderada (tendencias.PESOS)
+
+    # Recalculo das janelas e limpeza percorrem por balde
+    __table_args__ = (
+        Index('ix_tendencia_baldes_balde', 'balde'),
+    )
+
+    def __repr__(self):
+        return f"<TendenciaBalde(manga_id={self.id_manga}, balde={self.balde}, pontos={self.pontos})>"
+
+
+class MangaEmAlta(Base):
+    """
+    Pontuação de um mangá em uma janela (1h, 24h, 7d), já com decaimento
+    Recalculada por inteiro a cada atualização; as listas em alta (global e
+    por gênero) são lidas daqui
+    """
+    __tablename__ = 'mangas_em_alta'
+
+    janela = Column(String(10), primary_key=True)
+    id_manga = Column(Integer, ForeignKey('mangas.id_manga', ondelete='CASCADE'), primary_key=True)
+    pontuacao = Column(Float, nullable=False)
+    leituras = Column(Integer, nullable=False, default=0)
+    avaliacoes = Column(Integer, nullable=False, default=0)
+    comentarios = Column(Integer, nullable=False, default=0)
+    curtidas = Column(Integer, nullable=False, default=0)
+    atualizado_em = Column(DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        Index('ix_mangas_em_alta_janela_pontuacao', 'janela', 'pontuacao'),
+        Index('ix_mangas_em_alta_id_manga', 'id_manga'),
+    )
+
+    def __repr__(self):
+        return f"<MangaEmAlta(janela={self.janela}, manga_id={self.id_manga}, pontuacao={self.pontuacao:.2f})>"
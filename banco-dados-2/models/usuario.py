@@ -61,13 +61,13 @@ class Leitor(Usuario):
     """
     __tablename__ = 'leitores'
     
-    id_usuario = Column(Integer, ForeignKey('usuarios.id_usuario'), primary_key=True)
+    id_usuario = Column(Integer, ForeignKey('usuarios.id_usuario', ondelete='CASCADE'), primary_key=True)
     codinome = Column(String(100), unique=True, nullable=False)
     
     # Relacionamentos
-    comentarios = relationship("Comentario", back_populates="leitor", cascade="all, delete-orphan")
-    avaliacoes = relationship("Avaliacao", back_populates="leitor", cascade="all, delete-orphan")
-    leituras = relationship("LeitorManga", back_populates="leitor", cascade="all, delete-orphan")
+    comentarios = relationship("Comentario", back_populates="leitor", cascade="all, delete-orphan", passive_deletes=True)
+    avaliacoes = relationship("Avaliacao", back_populates="leitor", cascade="all, delete-orphan", passive_deletes=True)
+    leituras = relationship("LeitorManga", back_populates="leitor", cascade="all, delete-orphan", passive_deletes=True)
     
     __mapper_args__ = {
         'polymorphic_identity': 'leitor',
@@ -100,7 +100,7 @@ class Leitor(Usuario):
         ).first()
         
         if avaliacao_existente:
-            avaliacao_existente.editar_nota(nota)
+            avaliacao_existente.editar_avaliacao(nota)
             return avaliacao_existente
         
         avaliacao = Avaliacao(nota=nota, leitor=self, manga=manga)
@@ -158,6 +158,21 @@ class Leitor(Usuario):
         
         leitura.atualizar_progresso(capitulo)
     
+    def biblioteca(self, session, usar_cache: bool = True):
+        """
+        Favoritos com progresso, capítulos não lidos e data do último
+        capítulo em um único SELECT (biblioteca.ItemBiblioteca), com cache
+        """
+        from biblioteca import obter_biblioteca
+        
+        return obter_biblioteca(session, self.id_usuario, usar_cache)
+    
+    def continuar_lendo(self, session, limite: int = 20):
+        """Mangás em andamento com o próximo capítulo a ler (leitura_dto.ItemContinuarLendo)"""
+        from leitura_dto import listar_continuar_lendo
+        
+        return listar_continuar_lendo(session, self.id_usuario, limite)
+    
     def __repr__(self):
         return f"<Leitor(id={self.id_usuario}, codinome={self.codinome})>"
 
@@ -168,7 +183,7 @@ class Administrador(Usuario):
     """
     __tablename__ = 'administradores'
     
-    id_usuario = Column(Integer, ForeignKey('usuarios.id_usuario'), primary_key=True)
+    id_usuario = Column(Integer, ForeignKey('usuarios.id_usuario', ondelete='CASCADE'), primary_key=True)
     numero_de_mangas_upados = Column(Integer, default=0)
     
     __mapper_args__ = {
@@ -182,16 +197,101 @@ class Administrador(Usuario):
         return manga
     
     def adicionar_capitulo(self, manga, capitulo, session):
-        """Adiciona um capítulo a um mangá"""
+        """
+        Adiciona um capítulo a um mangá
+        Os leitores que favoritaram o mangá são notificados depois, em lotes
+        (notificacoes.py): aqui só o envio é registrado
+        """
+        from notificacoes import agendar_envio
+        
         manga.adicionar_capitulo(capitulo)
         session.add(capitulo)
+        agendar_envio(session, capitulo)
         return capitulo
     
+    def importar_capitulos(self, manga, caminhos, session, processos=None, diretorio=None):
+        """
+        Importa arquivos CBZ/ZIP (ou diretórios com eles) como capítulos do
+        mangá, com as páginas no armazenamento por conteúdo
+        (importacao_capitulos.py). Retorna o ResultadoImportacao
+        """
+        from importacao_capitulos import importar_capitulos, PAGINAS_DIR
+        
+        return importar_capitulos(session, manga, caminhos, processos, diretorio or PAGINAS_DIR)
+    
     def excluir_manga(self, manga, session):
         """Exclui um mangá do sistema"""
         session.delete(manga)
         self.numero_de_mangas_upados -= 1
     
+    def excluir_mangas(self, ids_manga, session) -> int:
+        """
+        Exclui vários mangás em um único DELETE
+        Capítulos, avaliações, comentários e leituras saem pelo ON DELETE
+        CASCADE do banco, sem carregar nada na sessão
+        """
+        from sqlalchemy import delete
+        from models.manga import Manga
+        from models.evento_outbox import registrar_eventos, evento
+        from cache import marcar_para_invalidacao
+        from detalhe_manga import chave_manga
+        from biblioteca import etiqueta_manga
+        from models.notificacao import Notificacao
+        from notificacoes import descontar_nao_lidas
+        
+        ids_manga = list(ids_manga)
+        if not ids_manga:
+            return 0
+        
+        # Notificações não lidas desses mangás saem pelo CASCADE
+        descontar_nao_lidas(session.connection(), Notificacao.id_manga.in_(ids_manga))
+        excluidos = session.execute(
+            delete(Manga).where(Manga.id_manga.in_(ids_manga)).returning(Manga.id_manga)
+        ).scalars().all()
+        # Um evento por mangá; os filhos removidos pelo CASCADE vão junto
+        registrar_eventos(session.connection(), [evento("manga", i, "delete", id_manga=i) for i in excluidos])
+        marcar_para_invalidacao(session, [chave_manga(i) for i in ids_manga])
+        marcar_para_invalidacao(session, [etiqueta_manga(i) for i in ids_manga])
+        self.numero_de_mangas_upados = max(0, (self.numero_de_mangas_upados or 0) - len(excluidos))
+        return len(excluidos)
+    
+    def excluir_leitores(self, ids_leitor, session) -> int:
+        """
+        Exclui vários leitores (usuarios + leitores) em um único DELETE
+        Avaliações, comentários e leituras saem pelo ON DELETE CASCADE
+        """
+        from sqlalchemy import delete, select, union
+        from models.evento_outbox import registrar_eventos, evento
+        from models.avaliacao import Avaliacao
+        from models.comentario import Comentario
+        from models.avaliacao_diaria import remover_dos_agregados
+        from cache import marcar_para_invalidacao
+        from detalhe_manga import chave_manga
+        from biblioteca import chave_leitor
+        
+        ids_leitor = list(ids_leitor)
+        if not ids_leitor:
+            return 0
+        
+        remover_dos_agregados(session.connection(), Avaliacao.id_leitor.in_(ids_leitor))
+        
+        # Detalhes que mostram avaliações/comentários desses leitores
+        ids_manga = session.execute(union(
+            select(Avaliacao.id_manga).where(Avaliacao.id_leitor.in_(ids_leitor)),
+            select(Comentario.id_manga).where(Comentario.id_leitor.in_(ids_leitor)),
+        )).scalars().all()
+        
+        excluidos = session.execute(
+            delete(Usuario)
+            .where(Usuario.id_usuario.in_(ids_leitor), Usuario.tipo == 'leitor')
+            .returning(Usuario.id_usuario)
+        ).scalars().all()
+        # Um evento por leitor; os filhos removidos pelo CASCADE vão junto
+        registrar_eventos(session.connection(), [evento("leitor", i, "delete", id_leitor=i) for i in excluidos])
+        marcar_para_invalidacao(session, [chave_manga(i) for i in ids_manga])
+        marcar_para_invalidacao(session, [chave_leitor(i) for i in ids_leitor])
+        return len(excluidos)
+    
     def excluir_capitulo(self, manga, capitulo, session):
         """Exclui um capítulo de um mangá"""
         manga.remover_capitulo(capitulo, session)
@@ -0,0 +1,24 @@
+"""
+Modelo de Versão de Chave de Cache
+"""
+from sqlalchemy import Column, BigInteger, String, Index
+from database import Base
+
+
+class VersaoCache(Base):
+    """
+    Última versão em que uma chave de cache foi invalidada
+    Usada pelo barramento de invalidação quando não há LISTEN/NOTIFY
+    (SQLite): os processos consultam as chaves com versão acima da última vista
+    """
+    __tablename__ = 'versoes_cache'
+    
+    chave = Column(String(255), primary_key=True)
+    versao = Column(BigInteger, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_versoes_cache_versao', 'versao'),
+    )
+    
+    def __repr__(self):
+        return f"<VersaoCache(chave={self.chave}, versao={self.versao})>"
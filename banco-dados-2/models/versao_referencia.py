@@ -0,0 +1,31 @@
+"""
+Modelo de Versão de Dados de Referência
+"""
+from sqlalchemy import Column, Integer, String, update, insert
+from database import Base
+
+
+class VersaoReferencia(Base):
+    """
+    Contador de versão de uma tabela de referência (ex.: gêneros)
+    Incrementado a cada alteração para que os caches de outros processos
+    saibam quando recarregar
+    """
+    __tablename__ = 'versoes_referencia'
+    
+    nome = Column(String(50), primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<VersaoReferencia(nome={self.nome}, versao={self.versao})>"
+
+
+def incrementar_versao(conexao, nome: str):
+    """Incrementa a versão (criando a linha se necessário) na transação atual"""
+    resultado = conexao.execute(
+        update(VersaoReferencia)
+        .where(VersaoReferencia.nome == nome)
+        .values(versao=VersaoReferencia.versao + 1)
+    )
+    if resultado.rowcount == 0:
+        conexao.execute(insert(VersaoReferencia).values(nome=nome, versao=1))
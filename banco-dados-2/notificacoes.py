@@ -0,0 +1,294 @@
+"""
+Notificações de capítulos novos para quem favoritou o mangá
+Publicar um capítulo (Administrador.adicionar_capitulo) só registra um
+envio em envios_notificacao. O envio é distribuído depois, em lotes de
+NOTIFICACOES_LOTE leitores em ordem de id_leitor: cada lote é um único
+INSERT ... SELECT a partir dos favoritos (índice parcial
+ix_leitor_manga_favoritos) mais o upsert dos contadores de não lidas, na
+mesma transação que avança o envio. Interrompido, continua do último lote.
+
+    python notificacoes.py --acompanhar      # distribui envios pendentes
+    python notificacoes.py --leitor 2        # caixa de entrada de um leitor
+"""
+import argparse
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update, delete, insert, func, case, literal, Integer, String, DateTime
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from database import SessionLocal, engine, insert_com_conflito
+from models import (
+    Manga, Capitulo, LeitorManga,
+    Notificacao, NotificacoesNaoLidas, EnvioNotificacao
+)
+from leitura_dto import converter
+
+
+TAMANHO_LOTE = int(os.getenv("NOTIFICACOES_LOTE", 5000))
+
+# Espera entre verificações de envios pendentes (--acompanhar)
+INTERVALO = float(os.getenv("NOTIFICACOES_INTERVALO", 5))
+
+
+@dataclass(slots=True, frozen=True)
+class ItemNotificacao:
+    id_notificacao: int
+    tipo: str
+    id_manga: int
+    titulo_manga: str
+    id_capitulo: Optional[int]
+    numero_capitulo: Optional[int]
+    titulo_capitulo: Optional[str]
+    criada_em: datetime
+    lida_em: Optional[datetime]
+
+
+@dataclass
+class PaginaNotificacoes:
+    """Uma página da caixa de entrada e o cursor (id_notificacao) para a próxima"""
+    itens: list
+    proximo_cursor: Optional[int]
+
+
+def agendar_envio(session: Session, capitulo: Capitulo, tipo: str = "novo_capitulo") -> EnvioNotificacao:
+    """Registra o envio das notificações do capítulo (distribuído depois, em lotes)"""
+    if capitulo.id_capitulo is None:
+        session.flush()
+    envio = EnvioNotificacao(id_manga=capitulo.id_manga, id_capitulo=capitulo.id_capitulo, tipo=tipo)
+    session.add(envio)
+    return envio
+
+
+def _seguidores(id_manga: int, apos_leitor: int):
+    return (
+        select(LeitorManga.id_leitor)
+        .where(
+            LeitorManga.id_manga == id_manga,
+            LeitorManga.data_favorito.is_not(None),
+            LeitorManga.id_leitor > apos_leitor,
+        )
+    )
+
+
+def somar_nao_lidas(conexao: Connection, por_leitor: dict):
+    """Soma (ou subtrai, com valores negativos) nos contadores de não lidas"""
+    linhas = [{"id_leitor": i, "total": n} for i, n in sorted(por_leitor.items()) if n]
+    if not linhas:
+        return
+    comando = insert_com_conflito(conexao, NotificacoesNaoLidas)
+    conexao.execute(
+        comando.on_conflict_do_update(
+            index_elements=["id_leitor"],
+            set_={"total": NotificacoesNaoLidas.total + comando.excluded.total},
+        ),
+        linhas,
+    )
+
+
+def distribuir_lote(conexao: Connection, id_envio: int, tamanho_lote: int = TAMANHO_LOTE) -> tuple:
+    """
+    Notifica o próximo lote de seguidores do envio
+    Retorna (notificações criadas, envio concluído)
+    """
+    envio = conexao.execute(
+        select(EnvioNotificacao).where(EnvioNotificacao.id_envio == id_envio).with_for_update()
+    ).first()
+    if envio is None or envio.concluido_em is not None:
+        return 0, True
+
+    seguidores = _seguidores(envio.id_manga, envio.ultimo_id_leitor)
+    # Último leitor do lote; None quando os restantes cabem neste lote
+    fim = conexao.execute(
+        seguidores.order_by(LeitorManga.id_leitor).offset(tamanho_lote - 1).limit(1)
+    ).scalar()
+    if fim is not None:
+        seguidores = seguidores.where(LeitorManga.id_leitor <= fim)
+
+    agora = datetime.now()
+    origem = seguidores.add_columns(
+        literal(envio.id_manga, Integer),
+        literal(envio.id_capitulo, Integer),
+        literal(envio.tipo, String),
+        literal(agora, DateTime),
+    ).distinct()
+    ids_leitor = conexao.execute(
+        insert(Notificacao)
+        .from_select(["id_leitor", "id_manga", "id_capitulo", "tipo", "criada_em"], origem)
+        .returning(Notificacao.id_leitor)
+    ).scalars().all()
+    somar_nao_lidas(conexao, Counter(ids_leitor))
+
+    ultimo = fim if fim is not None else max(ids_leitor, default=envio.ultimo_id_leitor)
+    conexao.execute(
+        update(EnvioNotificacao)
+        .where(EnvioNotificacao.id_envio == id_envio)
+        .values(
+            ultimo_id_leitor=ultimo,
+            notificacoes=EnvioNotificacao.notificacoes + len(ids_leitor),
+            concluido_em=agora if fim is None else None,
+        )
+    )
+    return len(ids_leitor), fim is None
+
+
+def processar_envio(id_envio: int, bind: Optional[Engine] = None, tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Distribui o envio até o fim, um lote por transação; retorna as notificações criadas"""
+    bind = bind or engine
+    total, concluido = 0, False
+    while not concluido:
+        with bind.begin() as conexao:
+            criadas, concluido = distribuir_lote(conexao, id_envio, tamanho_lote)
+        total += criadas
+    return total
+
+
+def processar_pendentes(bind: Optional[Engine] = None, tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Distribui todos os envios pendentes, do mais antigo ao mais novo"""
+    bind = bind or engine
+    with bind.connect() as conexao:
+        pendentes = conexao.execute(
+            select(EnvioNotificacao.id_envio)
+            .where(EnvioNotificacao.concluido_em.is_(None))
+            .order_by(EnvioNotificacao.id_envio)
+        ).scalars().all()
+    return sum(processar_envio(id_envio, bind, tamanho_lote) for id_envio in pendentes)
+
+
+def nao_lidas(session: Session, id_leitor: int) -> int:
+    """Total de notificações não lidas (contador, sem COUNT)"""
+    total = session.execute(
+        select(NotificacoesNaoLidas.total).where(NotificacoesNaoLidas.id_leitor == id_leitor)
+    ).scalar()
+    return max(total or 0, 0)
+
+
+def caixa_entrada(session: Session, id_leitor: int, limite: int = 20, apos: Optional[int] = None,
+                  apenas_nao_lidas: bool = False) -> PaginaNotificacoes:
+    """Notificações do leitor, da mais recente para a mais antiga, por cursor keyset"""
+    consulta = (
+        select(
+            Notificacao.id_notificacao,
+            Notificacao.tipo,
+            Notificacao.id_manga,
+            Manga.titulo_manga,
+            Notificacao.id_capitulo,
+            Capitulo.numero_capitulo,
+            Capitulo.titulo_capitulo,
+            Notificacao.criada_em,
+            Notificacao.lida_em,
+        )
+        .join(Manga, Manga.id_manga == Notificacao.id_manga)
+        .outerjoin(Capitulo, Capitulo.id_capitulo == Notificacao.id_capitulo)
+        .where(Notificacao.id_leitor == id_leitor)
+    )
+    if apenas_nao_lidas:
+        consulta = consulta.where(Notificacao.lida_em.is_(None))
+    if apos is not None:
+        consulta = consulta.where(Notificacao.id_notificacao < apos)
+
+    # Uma linha a mais para saber se existe próxima página
+    linhas = session.execute(consulta.order_by(Notificacao.id_notificacao.desc()).limit(limite + 1)).all()
+    itens = converter(ItemNotificacao, linhas[:limite])
+    return PaginaNotificacoes(itens, itens[-1].id_notificacao if len(linhas) > limite else None)
+
+
+def marcar_lidas(session: Session, id_leitor: int, ids_notificacao: Optional[list] = None) -> int:
+    """Marca como lidas as notificações indicadas (ou todas) e desconta do contador"""
+    condicao = [Notificacao.id_leitor == id_leitor, Notificacao.lida_em.is_(None)]
+    if ids_notificacao is not None:
+        condicao.append(Notificacao.id_notificacao.in_(ids_notificacao))
+
+    marcadas = session.execute(
+        update(Notificacao).where(*condicao).values(lida_em=datetime.now()),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    if marcadas:
+        session.execute(
+            update(NotificacoesNaoLidas)
+            .where(NotificacoesNaoLidas.id_leitor == id_leitor)
+            .values(total=case(
+                (NotificacoesNaoLidas.total > marcadas, NotificacoesNaoLidas.total - marcadas), else_=0
+            ))
+        )
+    return marcadas
+
+
+def descontar_nao_lidas(conexao: Connection, condicao):
+    """Desconta dos contadores as não lidas da condição antes de um DELETE em massa"""
+    por_leitor = conexao.execute(
+        select(Notificacao.id_leitor, func.count())
+        .where(condicao, Notificacao.lida_em.is_(None))
+        .group_by(Notificacao.id_leitor)
+    ).all()
+    somar_nao_lidas(conexao, {id_leitor: -total for id_leitor, total in por_leitor})
+
+
+def recalcular_nao_lidas(conexao: Connection) -> int:
+    """Refaz todos os contadores a partir das notificações (correção)"""
+    conexao.execute(delete(NotificacoesNaoLidas))
+    return conexao.execute(
+        insert(NotificacoesNaoLidas).from_select(
+            ["id_leitor", "total"],
+            select(Notificacao.id_leitor, func.count())
+            .where(Notificacao.lida_em.is_(None))
+            .group_by(Notificacao.id_leitor),
+        )
+    ).rowcount
+
+
+def _mostrar_caixa(id_leitor: int, limite: int):
+    session = SessionLocal()
+    try:
+        pagina = caixa_entrada(session, id_leitor, limite)
+        print(f"\n🔔 Leitor {id_leitor}: {nao_lidas(session, id_leitor)} não lida(s)\n")
+        for item in pagina.itens:
+            marca = " " if item.lida_em else "●"
+            capitulo = f"cap. {item.numero_capitulo}" if item.numero_capitulo is not None else "capítulo removido"
+            print(f" {marca} {item.criada_em:%d/%m %H:%M}  {item.titulo_manga} — {capitulo}")
+        if not pagina.itens:
+            print("   (caixa de entrada vazia)")
+    finally:
+        session.close()
+
+
+def main():
+    """Distribui envios pendentes ou mostra a caixa de entrada de um leitor"""
+    parser = argparse.ArgumentParser(description="Notificações de capítulos novos")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Leitores por transação")
+    parser.add_argument("--acompanhar", action="store_true",
+                        help=f"Verifica envios pendentes a cada {INTERVALO:.0f}s até Ctrl+C")
+    parser.add_argument("--recalcular", action="store_true", help="Refaz os contadores de não lidas")
+    parser.add_argument("--leitor", type=int, default=None, help="Mostra a caixa de entrada do leitor")
+    parser.add_argument("--limite", type=int, default=20)
+    args = parser.parse_args()
+
+    engine.echo = False
+    if args.leitor is not None:
+        _mostrar_caixa(args.leitor, args.limite)
+        return
+
+    if args.recalcular:
+        with engine.begin() as conexao:
+            print(f"🔢 {recalcular_nao_lidas(conexao)} contador(es) recalculado(s)")
+        return
+
+    try:
+        while True:
+            inicio = time.perf_counter()
+            criadas = processar_pendentes(tamanho_lote=args.lote)
+            if criadas or not args.acompanhar:
+                print(f"✓ {criadas} notificação(ões) criada(s) em {time.perf_counter() - inicio:.2f}s")
+            if not args.acompanhar:
+                break
+            time.sleep(INTERVALO)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
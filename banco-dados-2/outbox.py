@@ -0,0 +1,156 @@
+"""
+Consumo do feed de alterações (outbox_eventos)
+Cada consumidor tem um nome e uma posição em outbox_offsets. O lote é lido
+e a posição confirmada na mesma transação em que o consumidor grava seus
+agregados: cada evento é aplicado exatamente uma vez.
+
+    consumidor = ConsumidorOutbox("media_avaliacoes")
+    consumidor.processar(lambda conexao, eventos: ...)
+
+Ordem de leitura: (id_transacao, id_evento). No PostgreSQL um evento só é
+entregue quando todas as transações mais antigas terminaram, então um
+commit atrasado nunca fica para trás da posição de um consumidor
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import select, insert, update, delete, func, tuple_, text
+from sqlalchemy.engine import Connection, Engine
+from database import engine
+from models import EventoOutbox, OffsetOutbox
+
+
+TAMANHO_LOTE = int(os.getenv("OUTBOX_LOTE", 500))
+
+
+# Transações com id abaixo deste já terminaram (PostgreSQL)
+_TRANSACOES_ENCERRADAS = text("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+class ConsumidorOutbox:
+    """Leitor do feed com posição persistida"""
+
+    def __init__(self, nome: str, tamanho_lote: int = TAMANHO_LOTE, desde_inicio: bool = True):
+        self.nome = nome
+        self.tamanho_lote = tamanho_lote
+        # Consumidor novo: lê o histórico retido ou começa do fim do feed
+        self.desde_inicio = desde_inicio
+
+    def posicao(self, conexao: Connection) -> tuple:
+        """(id_transacao, id_evento) já processados; bloqueia o offset até o fim da transação"""
+        linha = conexao.execute(
+            select(OffsetOutbox.id_transacao, OffsetOutbox.id_evento)
+            .where(OffsetOutbox.consumidor == self.nome)
+            .with_for_update()
+        ).first()
+        if linha:
+            return tuple(linha)
+
+        inicial = (0, 0)
+        if not self.desde_inicio:
+            ultimo = conexao.execute(
+                select(EventoOutbox.id_transacao, EventoOutbox.id_evento)
+                .order_by(EventoOutbox.id_transacao.desc(), EventoOutbox.id_evento.desc())
+                .limit(1)
+            ).first()
+            inicial = tuple(ultimo) if ultimo else inicial
+        conexao.execute(insert(OffsetOutbox).values(
+            consumidor=self.nome, id_transacao=inicial[0], id_evento=inicial[1]
+        ))
+        return inicial
+
+    def ler_lote(self, conexao: Connection, limite: Optional[int] = None) -> list:
+        """Próximos eventos após a posição do consumidor, em ordem"""
+        consulta = (
+            select(EventoOutbox)
+            .where(tuple_(EventoOutbox.id_transacao, EventoOutbox.id_evento) > tuple_(*self.posicao(conexao)))
+            .order_by(EventoOutbox.id_transacao, EventoOutbox.id_evento)
+            .limit(limite or self.tamanho_lote)
+        )
+        if conexao.dialect.name == "postgresql":
+            consulta = consulta.where(EventoOutbox.id_transacao < _TRANSACOES_ENCERRADAS)
+        return conexao.execute(consulta).all()
+
+    def confirmar(self, conexao: Connection, ultimo_evento):
+        """Avança a posição até `ultimo_evento` (inclusive)"""
+        conexao.execute(
+            update(OffsetOutbox)
+            .where(OffsetOutbox.consumidor == self.nome)
+            .values(
+                id_transacao=ultimo_evento.id_transacao,
+                id_evento=ultimo_evento.id_evento,
+                atualizado_em=datetime.now(),
+            )
+        )
+
+    def processar(self, funcao: Callable[[Connection, list], None], bind: Optional[Engine] = None,
+                  max_lotes: Optional[int] = None) -> int:
+        """
+        Aplica `funcao(conexao, eventos)` lote a lote até esvaziar o feed
+        Lote, agregados e posição são confirmados juntos; retorna o total de eventos
+        """
+        bind = bind or engine
+        total = lotes = 0
+        while max_lotes is None or lotes < max_lotes:
+            with bind.begin() as conexao:
+                eventos = self.ler_lote(conexao)
+                if not eventos:
+                    break
+                funcao(conexao, eventos)
+                self.confirmar(conexao, eventos[-1])
+            total += len(eventos)
+            lotes += 1
+        return total
+
+    def acompanhar(self, funcao: Callable[[Connection, list], None], intervalo: float = 1.0,
+                   bind: Optional[Engine] = None, parar: Optional[Callable[[], bool]] = None):
+        """Processa continuamente, aguardando `intervalo` segundos quando o feed esvazia"""
+        while not (parar and parar()):
+            if not self.processar(funcao, bind):
+                time.sleep(intervalo)
+
+    def atraso(self, conexao: Connection) -> int:
+        """Eventos ainda não processados"""
+        return conexao.execute(
+            select(func.count())
+            .select_from(EventoOutbox)
+            .where(tuple_(EventoOutbox.id_transacao, EventoOutbox.id_evento) > tuple_(*self.posicao(conexao)))
+        ).scalar()
+
+
+def purgar_consumidos(conexao: Connection) -> int:
+    """Remove os eventos já processados por todos os consumidores"""
+    minimo = conexao.execute(
+        select(OffsetOutbox.id_transacao, OffsetOutbox.id_evento)
+        .order_by(OffsetOutbox.id_transacao, OffsetOutbox.id_evento)
+        .limit(1)
+    ).first()
+    if not minimo:
+        return 0
+    return conexao.execute(
+        delete(EventoOutbox)
+        .where(tuple_(EventoOutbox.id_transacao, EventoOutbox.id_evento) <= tuple_(*minimo))
+    ).rowcount
+
+
+def main():
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Feed de alterações (outbox)")
+    parser.add_argument("--purgar", action="store_true", help="Remove eventos já consumidos por todos")
+    args = parser.parse_args()
+
+    engine.echo = False
+    with engine.begin() as conexao:
+        total = conexao.execute(select(func.count()).select_from(EventoOutbox)).scalar()
+        print(f"📬 {total} evento(s) no feed")
+        for nome in conexao.execute(select(OffsetOutbox.consumidor).order_by(OffsetOutbox.consumidor)).scalars().all():
+            print(f"   {nome:<30} {ConsumidorOutbox(nome).atraso(conexao):>8} pendente(s)")
+        if args.purgar:
+            print(f"🗑 {purgar_consumidos(conexao)} evento(s) removido(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Paginação por keyset (cursor) do catálogo de mangás
+Em vez de OFFSET, cada página continua a partir da chave da última linha
+exibida, usando os índices compostos (coluna de ordenação, id_manga)
+"""
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select, func, tuple_, literal, text
+from sqlalchemy.orm import Session
+from models import Manga, Status
+
+
+# Ordenações suportadas -> coluna principal da chave do cursor
+ORDENACOES = {
+    "titulo": Manga.titulo_manga,
+    "data_criacao": Manga.data_criacao,
+}
+
+# Abaixo deste total estimado a contagem exata é barata o suficiente
+LIMIAR_CONTAGEM_EXATA = 10000
+
+
+@dataclass
+class PaginaMangas:
+    """Uma página do catálogo e o cursor para a próxima"""
+    itens: list
+    proximo_cursor: Optional[tuple]
+
+
+def listar_mangas_pagina(session: Session, ordenacao: str = "titulo",
+                         status: Optional[Status] = None, limite: int = 20,
+                         apos: Optional[tuple] = None,
+                         decrescente: bool = False) -> PaginaMangas:
+    """
+    Retorna uma página de mangás ordenada por (ordenacao, id_manga)
+
+    `apos` é o cursor devolvido pela página anterior (valor da coluna de
+    ordenação e id_manga da última linha). As linhas são tuplas de colunas,
+    sem passar pelo identity map da sessão.
+    """
+    if ordenacao not in ORDENACOES:
+        raise ValueError(f"Ordenação inválida: {ordenacao}. Use {', '.join(ORDENACOES)}")
+
+    coluna = ORDENACOES[ordenacao]
+    chave = tuple_(coluna, Manga.id_manga)
+
+    consulta = select(
+        Manga.id_manga,
+        Manga.titulo_manga,
+        Manga.autor,
+        Manga.status,
+        Manga.data_criacao,
+    )
+
+    if status is not None:
+        consulta = consulta.where(Manga.status == status)
+
+    if apos is not None:
+        cursor = tuple_(*(literal(v) for v in apos))
+        consulta = consulta.where(chave < cursor if decrescente else chave > cursor)
+
+    if decrescente:
+        consulta = consulta.order_by(coluna.desc(), Manga.id_manga.desc())
+    else:
+        consulta = consulta.order_by(coluna, Manga.id_manga)
+
+    # Busca uma linha a mais para saber se existe próxima página
+    linhas = session.execute(consulta.limit(limite + 1)).all()
+    itens = linhas[:limite]
+
+    proximo_cursor = None
+    if len(linhas) > limite:
+        ultima = itens[-1]
+        proximo_cursor = (getattr(ultima, coluna.key), ultima.id_manga)
+
+    return PaginaMangas(itens, proximo_cursor)
+
+
+def codificar_cursor(cursor: tuple) -> str:
+    """Serializa o cursor para uso fora do processo (ex.: query string)"""
+    valor, id_manga = cursor
+    if hasattr(valor, "isoformat"):
+        valor = valor.isoformat()
+    return json.dumps([valor, id_manga], ensure_ascii=False)
+
+
+def decodificar_cursor(texto: str, ordenacao: str = "titulo") -> tuple:
+    """Converte de volta o cursor gerado por codificar_cursor"""
+    from datetime import datetime
+
+    valor, id_manga = json.loads(texto)
+    if ordenacao == "data_criacao":
+        valor = datetime.fromisoformat(valor)
+    return valor, int(id_manga)
+
+
+def _estimativa_planner(session: Session, consulta) -> int:
+    """Linhas estimadas pelo planner do PostgreSQL para a consulta"""
+    sql = str(consulta.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"literal_binds": True}
+    ))
+    plano = session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    return int(plano[0]["Plan"]["Plan Rows"])
+
+
+def contar_mangas(session: Session, status: Optional[Status] = None,
+                  limiar_exato: int = LIMIAR_CONTAGEM_EXATA) -> tuple:
+    """
+    Conta os mangás, opcionalmente filtrados por status
+
+    No PostgreSQL usa primeiro a estimativa do planner (pg_class.reltuples
+    sem filtro, linhas do EXPLAIN com filtro); só faz COUNT(*) exato quando
+    a estimativa fica abaixo de `limiar_exato`.
+    Retorna (total, estimado).
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        if status is None:
+            estimativa = session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:tabela)"),
+                {"tabela": Manga.__tablename__}
+            ).scalar()
+        else:
+            estimativa = _estimativa_planner(
+                session,
+                select(literal(1)).select_from(Manga).where(Manga.status == status)
+            )
+
+        # reltuples = -1 quando a tabela nunca foi analisada
+        if estimativa is not None and estimativa >= limiar_exato:
+            return int(estimativa), True
+
+    consulta = select(func.count()).select_from(Manga)
+    if status is not None:
+        consulta = consulta.where(Manga.status == status)
+
+    return session.execute(consulta).scalar(), False
+
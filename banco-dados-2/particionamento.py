@@ -0,0 +1,273 @@
+"""
+Gerenciamento das partições de avaliacoes e comentarios (PostgreSQL)
+avaliacoes é particionada por HASH(id_manga). comentarios usa HASH(id_manga)
+ou RANGE(data_criacao) em partições mensais, conforme
+PARTICIONAMENTO_COMENTARIOS no momento da migração. No modo RANGE as
+partições dos próximos meses devem ser criadas com antecedência (ex.: cron
+diário), antes que linhas caiam na partição DEFAULT:
+
+    python particionamento.py --meses 3
+"""
+import argparse
+import os
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+ESTRATEGIAS = ("hash", "range")
+
+# Estratégia de comentarios usada pela migração (avaliacoes não tem data)
+ESTRATEGIA_COMENTARIOS = os.getenv("PARTICIONAMENTO_COMENTARIOS", "hash")
+
+# Número de partições HASH (não muda sem recriar a tabela)
+PARTICOES_HASH = int(os.getenv("PARTICOES_HASH", 16))
+
+# Meses à frente com partição RANGE já criada
+MESES_FUTUROS = int(os.getenv("PARTICOES_MESES_FUTUROS", 3))
+
+_ESTRATEGIAS_PG = {"h": "hash", "r": "range", "l": "list"}
+
+
+def _quote(conexao: Connection, nome: str) -> str:
+    return conexao.dialect.identifier_preparer.quote(nome)
+
+
+def inicio_mes(dia) -> date:
+    """Primeiro dia do mês de `dia`"""
+    if isinstance(dia, datetime):
+        dia = dia.date()
+    return dia.replace(day=1)
+
+
+def somar_meses(mes: date, meses: int) -> date:
+    """Primeiro dia do mês `meses` à frente"""
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def nome_particao_hash(tabela: str, resto: int) -> str:
+    return f"{tabela}_p{resto:02d}"
+
+
+def nome_particao_mensal(tabela: str, mes: date) -> str:
+    return f"{tabela}_{mes:%Y_%m}"
+
+
+def estrategia(conexao: Connection, tabela: str) -> Optional[str]:
+    """'hash', 'range' ou 'list' se a tabela for particionada, senão None"""
+    codigo = conexao.execute(
+        text("SELECT partstrat FROM pg_partitioned_table WHERE partrelid = to_regclass(:tabela)"),
+        {"tabela": tabela},
+    ).scalar()
+    return _ESTRATEGIAS_PG.get(codigo)
+
+
+def listar_particoes(conexao: Connection, tabela: str) -> list:
+    """[(nome, limites), ...] das partições da tabela"""
+    return conexao.execute(
+        text("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:tabela)
+            ORDER BY c.relname
+        """),
+        {"tabela": tabela},
+    ).all()
+
+
+def criar_particoes_hash(conexao: Connection, tabela: str, modulo: int = PARTICOES_HASH) -> list:
+    """Cria as `modulo` partições HASH da tabela"""
+    nomes = []
+    for resto in range(modulo):
+        nome = nome_particao_hash(tabela, resto)
+        conexao.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {_quote(conexao, nome)} "
+            f"PARTITION OF {_quote(conexao, tabela)} "
+            f"FOR VALUES WITH (MODULUS {modulo}, REMAINDER {resto})"
+        ))
+        nomes.append(nome)
+    return nomes
+
+
+def criar_particao_mensal(conexao: Connection, tabela: str, mes: date) -> str:
+    """
+    Cria a partição RANGE de um mês
+    Falha se a partição DEFAULT já tiver linhas desse mês
+    """
+    inicio = inicio_mes(mes)
+    nome = nome_particao_mensal(tabela, inicio)
+    conexao.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {_quote(conexao, nome)} "
+        f"PARTITION OF {_quote(conexao, tabela)} "
+        f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{somar_meses(inicio, 1).isoformat()}')"
+    ))
+    return nome
+
+
+def criar_particao_padrao(conexao: Connection, tabela: str) -> str:
+    """Cria a partição DEFAULT (linhas fora das partições mensais)"""
+    nome = f"{tabela}_padrao"
+    conexao.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {_quote(conexao, nome)} "
+        f"PARTITION OF {_quote(conexao, tabela)} DEFAULT"
+    ))
+    return nome
+
+
+def criar_particoes_mensais(conexao: Connection, tabela: str, inicio, fim) -> list:
+    """Cria as partições mensais de `inicio` até `fim` (inclusive)"""
+    mes, ultimo = inicio_mes(inicio), inicio_mes(fim)
+    nomes = []
+    while mes <= ultimo:
+        nomes.append(criar_particao_mensal(conexao, tabela, mes))
+        mes = somar_meses(mes, 1)
+    return nomes
+
+
+def criar_particoes_futuras(conexao: Connection, tabela: str = "comentarios",
+                            meses: int = MESES_FUTUROS) -> list:
+    """
+    Garante as partições do mês atual e dos `meses` seguintes
+    Não faz nada se a tabela não for particionada por RANGE
+    """
+    if estrategia(conexao, tabela) != "range":
+        return []
+
+    hoje = date.today()
+    return criar_particoes_mensais(conexao, tabela, hoje, somar_meses(inicio_mes(hoje), meses))
+
+
+def recriar_tabela(conexao: Connection, tabela: str, chave_primaria: list,
+                   particionar_por: Optional[str] = None, criar_particoes=None):
+    """
+    Recria a tabela (particionada ou não) preservando dados, colunas,
+    defaults, CHECKs, FKs, índices e a sequência do id
+    `criar_particoes(conexao, tabela_antiga)` cria as partições antes da cópia
+    """
+    q = lambda nome: _quote(conexao, nome)
+    antiga = f"{tabela}_antiga"
+    parametros = {"tabela": tabela}
+
+    nome_pk = conexao.execute(text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:tabela) AND contype = 'p'"
+    ), parametros).scalar()
+    chaves_estrangeiras = conexao.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:tabela) AND contype = 'f'"
+    ), parametros).all()
+    # Índices próprios da tabela (não os das partições nem o da PK)
+    indices = conexao.execute(text(
+        "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = to_regclass(:tabela) AND NOT x.indisprimary"
+    ), parametros).all()
+    sequencias = conexao.execute(text(
+        "SELECT a.attname, pg_get_serial_sequence(:tabela, a.attname) FROM pg_attribute a "
+        "WHERE a.attrelid = to_regclass(:tabela) AND a.attnum > 0 AND NOT a.attisdropped "
+        "AND pg_get_serial_sequence(:tabela, a.attname) IS NOT NULL"
+    ), parametros).all()
+
+    conexao.execute(text(f"ALTER TABLE {q(tabela)} RENAME TO {q(antiga)}"))
+    # Nomes de índice são únicos no schema: libera para a nova tabela
+    conexao.execute(text(f"ALTER TABLE {q(antiga)} RENAME CONSTRAINT {q(nome_pk)} TO {q(antiga + '_pkey')}"))
+    for nome, _ in indices:
+        conexao.execute(text(f"DROP INDEX {q(nome)}"))
+
+    particionamento = f" PARTITION BY {particionar_por}" if particionar_por else ""
+    conexao.execute(text(
+        f"CREATE TABLE {q(tabela)} (LIKE {q(antiga)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        f"{particionamento}"
+    ))
+    conexao.execute(text(
+        f"ALTER TABLE {q(tabela)} ADD CONSTRAINT {q(nome_pk)} "
+        f"PRIMARY KEY ({', '.join(q(c) for c in chave_primaria)})"
+    ))
+    for nome, definicao in chaves_estrangeiras:
+        conexao.execute(text(f"ALTER TABLE {q(tabela)} ADD CONSTRAINT {q(nome)} {definicao}"))
+
+    if criar_particoes:
+        criar_particoes(conexao, antiga)
+
+    conexao.execute(text(f"INSERT INTO {q(tabela)} SELECT * FROM {q(antiga)}"))
+    for coluna, sequencia in sequencias:
+        conexao.execute(text(f"ALTER SEQUENCE {sequencia} OWNED BY {q(tabela)}.{q(coluna)}"))
+    conexao.execute(text(f"DROP TABLE {q(antiga)}"))
+
+    # As definições ainda apontam para o nome original da tabela
+    for _, definicao in indices:
+        conexao.execute(text(definicao))
+
+
+def _particoes_mensais(tabela: str):
+    """Partições mensais do dado mais antigo até MESES_FUTUROS à frente, mais a DEFAULT"""
+    def criar(conexao: Connection, antiga: str):
+        primeira = conexao.execute(text(f"SELECT min(data_criacao) FROM {_quote(conexao, antiga)}")).scalar()
+        hoje = date.today()
+        criar_particoes_mensais(conexao, tabela, primeira or hoje, somar_meses(inicio_mes(hoje), MESES_FUTUROS))
+        criar_particao_padrao(conexao, tabela)
+    return criar
+
+
+def particionar_tabelas(conexao: Connection, estrategia_comentarios: str = ESTRATEGIA_COMENTARIOS,
+                        particoes_hash: int = PARTICOES_HASH):
+    """
+    Converte avaliacoes e comentarios em tabelas particionadas
+    Usado pelo init.py no banco criado a partir dos modelos; bancos
+    migrados passam pela revisão e78ca723f449
+    """
+    if estrategia_comentarios not in ESTRATEGIAS:
+        raise ValueError(
+            f"PARTICIONAMENTO_COMENTARIOS inválido: {estrategia_comentarios} "
+            f"(use {' ou '.join(ESTRATEGIAS)})"
+        )
+
+    hash_id_manga = lambda tabela: (
+        lambda c, _: criar_particoes_hash(c, tabela, particoes_hash)
+    )
+
+    if estrategia(conexao, "avaliacoes") is None:
+        recriar_tabela(
+            conexao, "avaliacoes", ["id_avaliacao", "id_manga"],
+            "HASH (id_manga)", hash_id_manga("avaliacoes"),
+        )
+
+    if estrategia(conexao, "comentarios") is None:
+        if estrategia_comentarios == "hash":
+            recriar_tabela(
+                conexao, "comentarios", ["id_comentario", "id_manga"],
+                "HASH (id_manga)", hash_id_manga("comentarios"),
+            )
+        else:
+            recriar_tabela(
+                conexao, "comentarios", ["id_comentario", "data_criacao"],
+                "RANGE (data_criacao)", _particoes_mensais("comentarios"),
+            )
+
+
+def main():
+    """Ponto de entrada da linha de comando"""
+    from database import engine
+
+    parser = argparse.ArgumentParser(description="Gerencia partições de avaliacoes/comentarios")
+    parser.add_argument("--meses", type=int, default=MESES_FUTUROS, help="Meses à frente (RANGE)")
+    parser.add_argument("--listar", action="store_true", help="Apenas lista as partições")
+    args = parser.parse_args()
+
+    with engine.begin() as conexao:
+        for tabela in ("avaliacoes", "comentarios"):
+            if not args.listar:
+                criadas = criar_particoes_futuras(conexao, tabela, args.meses)
+                if criadas:
+                    print(f"✓ {tabela}: {', '.join(criadas)}")
+
+            print(f"\n{tabela} ({estrategia(conexao, tabela) or 'não particionada'})")
+            for nome, limites in listar_particoes(conexao, tabela):
+                print(f"  {nome:<30} {limites}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Progresso de páginas por leitor e capítulo, com escrita em lotes
+Cada virada de página (Capitulo.marcar_progresso) só substitui a página
+pendente do par (leitor, capítulo) no BufferProgresso; uma thread descarrega
+o buffer a cada PROGRESSO_INTERVALO_MS (ou antes, com PROGRESSO_MAX_PENDENTES
+pares) em um único upsert em massa. Dez viradas de página entre duas
+descargas viram uma linha gravada.
+
+O upsert só sobrescreve uma linha mais antiga (atualizado_em), então
+descargas fora de ordem e gravações diretas (concluir o capítulo) não
+voltam o progresso. O que está no buffer se perde se o processo morrer
+sem parar_buffer_progresso (registrado no atexit): no máximo um intervalo
+de viradas de página.
+
+    python progresso_paginas.py --leitores 200 --viradas 20000
+"""
+import argparse
+import atexit
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import engine, insert_com_conflito
+from models import ProgressoPagina, Leitor, Capitulo
+
+
+INTERVALO_MS = int(os.getenv("PROGRESSO_INTERVALO_MS", 500))
+
+# Pares pendentes que antecipam a descarga
+MAX_PENDENTES = int(os.getenv("PROGRESSO_MAX_PENDENTES", 10000))
+
+
+@dataclass
+class EstatisticasBuffer:
+    """Viradas de página recebidas x linhas gravadas"""
+    registradas: int = 0
+    gravadas: int = 0
+    descargas: int = 0
+    falhas: int = 0
+
+    @property
+    def fracao_escritas(self) -> float:
+        """Percentual das viradas de página que chegou ao banco"""
+        return round(self.gravadas / self.registradas * 100, 2) if self.registradas else 0.0
+
+
+def gravar_progresso(conexao: Connection, registros: list) -> int:
+    """
+    Upsert em massa de (id_leitor, id_capitulo, pagina, atualizado_em)
+    Linhas ordenadas pela PK (ordem de locks estável entre descargas)
+    """
+    linhas = [
+        {"id_leitor": l, "id_capitulo": c, "pagina": p, "atualizado_em": em}
+        for l, c, p, em in sorted(registros, key=lambda r: (r[0], r[1]))
+    ]
+    if not linhas:
+        return 0
+    comando = insert_com_conflito(conexao, ProgressoPagina)
+    conexao.execute(
+        comando.on_conflict_do_update(
+            index_elements=["id_leitor", "id_capitulo"],
+            set_={"pagina": comando.excluded.pagina, "atualizado_em": comando.excluded.atualizado_em},
+            where=ProgressoPagina.atualizado_em <= comando.excluded.atualizado_em,
+        ),
+        linhas,
+    )
+    return len(linhas)
+
+
+def _apenas_existentes(conexao: Connection, lote: dict) -> dict:
+    """Pares do lote cujo leitor e capítulo ainda existem"""
+    leitores = set(conexao.execute(
+        select(Leitor.id_usuario).where(Leitor.id_usuario.in_({l for l, _ in lote}))
+    ).scalars())
+    capitulos = set(conexao.execute(
+        select(Capitulo.id_capitulo).where(Capitulo.id_capitulo.in_({c for _, c in lote}))
+    ).scalars())
+    return {(l, c): item for (l, c), item in lote.items() if l in leitores and c in capitulos}
+
+
+class BufferProgresso:
+    """Buffer em memória da última página por (leitor, capítulo), descarregado por uma thread"""
+
+    def __init__(self, bind: Optional[Engine] = None, intervalo_ms: int = INTERVALO_MS,
+                 max_pendentes: int = MAX_PENDENTES):
+        self.bind = bind or engine
+        self.intervalo = intervalo_ms / 1000
+        self.max_pendentes = max_pendentes
+        self.estatisticas = EstatisticasBuffer()
+        self._pendentes = {}  # (id_leitor, id_capitulo) -> (pagina, instante)
+        self._lock = threading.Lock()
+        self._cheio = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def registrar(self, id_leitor: int, id_capitulo: int, pagina: int):
+        """Guarda a página, substituindo a pendente do mesmo par"""
+        with self._lock:
+            self._pendentes[(id_leitor, id_capitulo)] = (pagina, datetime.now())
+            self.estatisticas.registradas += 1
+            cheio = len(self._pendentes) >= self.max_pendentes
+        if cheio:
+            self._cheio.set()
+
+    def pendente(self, id_leitor: int, id_capitulo: int) -> Optional[int]:
+        """Página ainda não gravada do par, se houver"""
+        with self._lock:
+            item = self._pendentes.get((id_leitor, id_capitulo))
+        return item[0] if item else None
+
+    def descarregar(self) -> int:
+        """Grava os pares pendentes em um upsert; retorna quantos foram gravados"""
+        with self._lock:
+            lote, self._pendentes = self._pendentes, {}
+        if not lote:
+            return 0
+
+        try:
+            try:
+                with self.bind.begin() as conexao:
+                    gravar_progresso(conexao, [(l, c, p, em) for (l, c), (p, em) in lote.items()])
+            except IntegrityError:
+                # Leitor ou capítulo removido depois da virada de página: o
+                # lote é regravado sem esses pares (senão falharia para sempre)
+                with self.bind.begin() as conexao:
+                    lote = _apenas_existentes(conexao, lote)
+                    gravar_progresso(conexao, [(l, c, p, em) for (l, c), (p, em) in lote.items()])
+        except Exception:
+            # Devolve ao buffer o que não foi substituído por uma página mais nova
+            with self._lock:
+                for chave, item in lote.items():
+                    self._pendentes.setdefault(chave, item)
+                self.estatisticas.falhas += 1
+            raise
+
+        with self._lock:
+            self.estatisticas.gravadas += len(lote)
+            self.estatisticas.descargas += 1
+        return len(lote)
+
+    def iniciar(self):
+        if self.ativo:
+            return self
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="buffer-progresso", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self, timeout: float = 5.0):
+        """Encerra a thread e grava o que ainda estiver pendente"""
+        self._parar.set()
+        self._cheio.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self.descarregar()
+
+    def _executar(self):
+        while not self._parar.is_set():
+            self._cheio.wait(self.intervalo)
+            self._cheio.clear()
+            try:
+                self.descarregar()
+            except Exception as e:
+                print(f"⚠ Falha ao gravar progresso de páginas ({e}); nova tentativa em {self.intervalo:.1f}s")
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def iniciar_buffer_progresso(bind: Optional[Engine] = None) -> BufferProgresso:
+    """Inicia (uma vez por processo) o buffer de progresso de páginas"""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = BufferProgresso(bind)
+            atexit.register(parar_buffer_progresso)
+        return _buffer.iniciar()
+
+
+def parar_buffer_progresso():
+    """Encerra o buffer gravando as páginas pendentes"""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.parar()
+            _buffer = None
+
+
+def registrar_pagina(id_leitor: int, id_capitulo: int, pagina: int):
+    """Virada de página: vai para o buffer do processo (iniciado na primeira chamada)"""
+    iniciar_buffer_progresso().registrar(id_leitor, id_capitulo, pagina)
+
+
+def gravar_pagina(session: Session, id_leitor: int, id_capitulo: int, pagina: int):
+    """Grava a página na transação da sessão, sem passar pelo buffer"""
+    gravar_progresso(session.connection(), [(id_leitor, id_capitulo, pagina, datetime.now())])
+
+
+def paginas_lidas(session: Session, id_leitor: int, ids_capitulo) -> dict:
+    """id_capitulo -> última página lida pelo leitor (pendentes do buffer incluídas)"""
+    ids_capitulo = list(ids_capitulo)
+    if not ids_capitulo:
+        return {}
+    paginas = dict(session.execute(
+        select(ProgressoPagina.id_capitulo, ProgressoPagina.pagina)
+        .where(ProgressoPagina.id_leitor == id_leitor, ProgressoPagina.id_capitulo.in_(ids_capitulo))
+    ).all())
+    buffer = _buffer
+    if buffer is not None:
+        for id_capitulo in ids_capitulo:
+            pendente = buffer.pendente(id_leitor, id_capitulo)
+            if pendente is not None:
+                paginas[id_capitulo] = pendente
+    return paginas
+
+
+def pagina_atual(session: Session, id_leitor: int, id_capitulo: int) -> int:
+    """Última página do capítulo lida pelo leitor (0 se nunca abriu)"""
+    return paginas_lidas(session, id_leitor, [id_capitulo]).get(id_capitulo, 0)
+
+
+def simular(ids_leitor: list, capitulos: list, viradas: int, intervalo_ms: int, duracao: float) -> tuple:
+    """
+    Distribui `viradas` viradas de página aleatórias ao longo de `duracao`
+    segundos. Retorna (estatísticas do buffer, linhas em progresso_paginas)
+    """
+    buffer = BufferProgresso(intervalo_ms=intervalo_ms).iniciar()
+    pausa = duracao / viradas if viradas else 0
+    # Cada leitor lê um capítulo por vez, página a página
+    lendo = {l: [random.choice(capitulos), 0] for l in ids_leitor}
+    for _ in range(viradas):
+        id_leitor = random.choice(ids_leitor)
+        estado = lendo[id_leitor]
+        (id_capitulo, total_paginas), pagina = estado
+        if pagina >= total_paginas:
+            estado[:] = [random.choice(capitulos), 0]
+            (id_capitulo, total_paginas), pagina = estado
+        estado[1] = pagina + 1
+        buffer.registrar(id_leitor, id_capitulo, pagina + 1)
+        if pausa:
+            time.sleep(pausa)
+    buffer.parar()
+
+    with engine.connect() as conexao:
+        linhas = conexao.execute(select(func.count()).select_from(ProgressoPagina)).scalar()
+    return buffer.estatisticas, linhas
+
+
+def main():
+    """Simula viradas de página e mostra quantas escritas o buffer evitou"""
+    parser = argparse.ArgumentParser(description="Progresso de páginas com escrita em lotes")
+    parser.add_argument("--leitores", type=int, default=100, help="Leitores existentes usados na simulação")
+    parser.add_argument("--viradas", type=int, default=10000)
+    parser.add_argument("--duracao", type=float, default=5.0, help="Segundos para distribuir as viradas")
+    parser.add_argument("--intervalo-ms", type=int, default=INTERVALO_MS)
+    args = parser.parse_args()
+
+    engine.echo = False
+    with engine.connect() as conexao:
+        ids_leitor = conexao.execute(
+            select(Leitor.id_usuario).order_by(Leitor.id_usuario).limit(args.leitores)
+        ).scalars().all()
+        capitulos = conexao.execute(
+            select(Capitulo.id_capitulo, Capitulo.numero_paginas).where(Capitulo.numero_paginas > 0)
+        ).all()
+    if not ids_leitor or not capitulos:
+        print("❌ São necessários leitores e capítulos com páginas (rode o seed)")
+        return
+
+    inicio = time.perf_counter()
+    estatisticas, linhas = simular(ids_leitor, [tuple(c) for c in capitulos],
+                                   args.viradas, args.intervalo_ms, args.duracao)
+    print(f"📖 {estatisticas.registradas} virada(s) de página de {len(ids_leitor)} leitor(es) "
+          f"em {time.perf_counter() - inicio:.2f}s")
+    print(f"💾 {estatisticas.gravadas} linha(s) gravada(s) em {estatisticas.descargas} upsert(s) "
+          f"({estatisticas.fracao_escritas:.1f}% das viradas; {linhas} par(es) leitor/capítulo no banco)")
+
+
+if __name__ == "__main__":
+    main()
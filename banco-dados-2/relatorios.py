@@ -0,0 +1,193 @@
+"""
+Registro de relatórios do sistema
+Cada relatório é uma função que monta um SELECT (SQLAlchemy Core), permitindo
+executá-lo em streaming, exportá-lo ou rodá-lo em paralelo sem materializar
+objetos ORM
+"""
+from sqlalchemy import select, union_all, func, desc, case, and_
+from models import (
+    Manga, Capitulo, Genero, MangaGenero,
+    Usuario, Leitor, Avaliacao, Comentario, ComentarioArquivado, LeitorManga
+)
+
+
+# Nome do relatório -> função que devolve o SELECT
+RELATORIOS = {}
+
+
+def registrar_relatorio(nome: str):
+    """Decorator que registra uma função construtora de relatório"""
+    def decorator(funcao):
+        RELATORIOS[nome] = funcao
+        return funcao
+    return decorator
+
+
+def obter_relatorio(nome: str):
+    """Retorna o SELECT de um relatório registrado"""
+    if nome not in RELATORIOS:
+        raise KeyError(f"Relatório desconhecido: {nome}")
+    return RELATORIOS[nome]()
+
+
+@registrar_relatorio("top_mangas_avaliados")
+def relatorio_top_mangas_avaliados(limite: int = 5):
+    """Mangás mais bem avaliados (média e total de avaliações)"""
+    return (
+        select(
+            Manga.titulo_manga,
+            Manga.autor,
+            Manga.status,
+            func.avg(Avaliacao.nota).label('media_avaliacao'),
+            func.count(Avaliacao.id_avaliacao).label('total_avaliacoes')
+        )
+        .outerjoin(Avaliacao, Manga.id_manga == Avaliacao.id_manga)
+        .group_by(Manga.id_manga, Manga.titulo_manga, Manga.autor, Manga.status)
+        .having(func.count(Avaliacao.id_avaliacao) > 0)  # Apenas com avaliações
+        .order_by(desc('media_avaliacao'), desc('total_avaliacoes'))
+        .limit(limite)
+    )
+
+
+@registrar_relatorio("leitores_ativos_por_genero")
+def relatorio_leitores_ativos_por_genero(genero: str = 'Ação'):
+    """Leitores com progresso > 50% em mangás de um gênero"""
+    subquery_mangas_genero = (
+        select(MangaGenero.id_manga)
+        .join(Genero, MangaGenero.id_genero == Genero.id_genero)
+        .where(Genero.tipo_genero == genero)
+    )
+
+    return (
+        select(
+            Leitor.codinome,
+            Usuario.nome,
+            Usuario.email,
+            func.count(LeitorManga.id_manga).label('mangas_lendo'),
+            func.avg(LeitorManga.progresso_leitura).label('progresso_medio'),
+            func.max(LeitorManga.progresso_leitura).label('maior_progresso'),
+            # CASE para classificar leitor
+            case(
+                (func.avg(LeitorManga.progresso_leitura) >= 80, 'Hardcore'),
+                (func.avg(LeitorManga.progresso_leitura) >= 50, 'Regular'),
+                else_='Casual'
+            ).label('categoria_leitor')
+        )
+        .join(LeitorManga, Leitor.id_usuario == LeitorManga.id_leitor)
+        .where(
+            and_(
+                LeitorManga.id_manga.in_(subquery_mangas_genero),
+                LeitorManga.progresso_leitura > 50
+            )
+        )
+        .group_by(Leitor.id_usuario, Leitor.codinome, Usuario.nome, Usuario.email)
+        .order_by(desc('progresso_medio'))
+    )
+
+
+@registrar_relatorio("capitulos_por_manga")
+def relatorio_capitulos_por_manga():
+    """Total de capítulos por mangá"""
+    return (
+        select(
+            Manga.titulo_manga,
+            func.count(Capitulo.id_capitulo).label('total_capitulos')
+        )
+        .join(Capitulo)
+        .group_by(Manga.id_manga, Manga.titulo_manga)
+    )
+
+
+@registrar_relatorio("mangas_bem_avaliados_engajados")
+def relatorio_mangas_bem_avaliados_engajados(media_minima: float = 4.5,
+                                             comentarios_minimos: int = 2):
+    """Mangás bem avaliados e com engajamento nos comentários (inclui os arquivados)"""
+    subquery_media = (
+        select(
+            Avaliacao.id_manga,
+            func.avg(Avaliacao.nota).label('media_nota'),
+            func.count(Avaliacao.id_avaliacao).label('total_avaliacoes')
+        )
+        .group_by(Avaliacao.id_manga)
+        .having(func.avg(Avaliacao.nota) >= media_minima)
+        .subquery()
+    )
+
+    comentarios = union_all(
+        select(Comentario.id_manga),
+        select(ComentarioArquivado.id_manga),
+    ).subquery()
+    subquery_comentarios = (
+        select(
+            comentarios.c.id_manga,
+            func.count().label('total_comentarios')
+        )
+        .group_by(comentarios.c.id_manga)
+        .having(func.count() >= comentarios_minimos)
+        .subquery()
+    )
+
+    return (
+        select(
+            Manga.titulo_manga,
+            Manga.autor,
+            Manga.status,
+            subquery_media.c.media_nota,
+            subquery_media.c.total_avaliacoes,
+            subquery_comentarios.c.total_comentarios
+        )
+        .join(subquery_media, Manga.id_manga == subquery_media.c.id_manga)
+        .join(subquery_comentarios, Manga.id_manga == subquery_comentarios.c.id_manga)
+        .order_by(subquery_media.c.media_nota.desc())
+    )
+
+
+@registrar_relatorio("leitores_engajados")
+def relatorio_leitores_engajados():
+    """Leitores com favoritos, avaliações e progresso acima de 50%"""
+    subquery_favoritos = (
+        select(
+            LeitorManga.id_leitor,
+            func.count(LeitorManga.id).label('total_favoritos')
+        )
+        .where(LeitorManga.data_favorito.isnot(None))
+        .group_by(LeitorManga.id_leitor)
+        .having(func.count(LeitorManga.id) > 1)
+        .subquery()
+    )
+
+    subquery_avaliacoes = (
+        select(
+            Avaliacao.id_leitor,
+            func.count(Avaliacao.id_avaliacao).label('total_avaliacoes'),
+            func.avg(Avaliacao.nota).label('media_notas_dadas')
+        )
+        .group_by(Avaliacao.id_leitor)
+        .having(func.count(Avaliacao.id_avaliacao) >= 2)
+        .subquery()
+    )
+
+    subquery_progresso = (
+        select(
+            LeitorManga.id_leitor,
+            func.avg(LeitorManga.progresso_leitura).label('progresso_medio')
+        )
+        .where(LeitorManga.progresso_leitura > 50.0)
+        .group_by(LeitorManga.id_leitor)
+        .subquery()
+    )
+
+    return (
+        select(
+            Leitor.codinome,
+            Leitor.nome,
+            Leitor.email,
+            subquery_favoritos.c.total_favoritos,
+            subquery_avaliacoes.c.total_avaliacoes,
+            subquery_avaliacoes.c.media_notas_dadas,
+            subquery_progresso.c.progresso_medio
+        )
+        .join(subquery_favoritos, Leitor.id_usuario == subquery_favoritos.c.id_leitor)
+        .join(subquery_avaliacoes, Leitor.id_usuario == subquery_avaliacoes.c.id_leitor)
+        .join(subquery_progresso, Leitor.id_usuario == subquery_progresso.c.id_leitor)
+    )
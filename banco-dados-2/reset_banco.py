@@ -0,0 +1,212 @@
+"""
+Reset rápido do banco para testes e benchmarks
+- truncar_tabelas: TRUNCATE ... RESTART IDENTITY CASCADE em um único comando
+  (SQLite: DELETE por tabela e zera sqlite_sequence)
+- criar_snapshot / restaurar_snapshot: cópia do banco já populado como
+  template do PostgreSQL (CREATE DATABASE ... TEMPLATE) ou cópia do arquivo
+  no SQLite
+- banco_restaurado: context manager que restaura o snapshot ao sair
+
+    python reset_banco.py snapshot            # depois do seed
+    python reset_banco.py restaurar
+"""
+import argparse
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import NullPool
+from database import Base, engine
+from models.versao_referencia import incrementar_versao
+from cache import caches_registrados, TODAS
+from barramento_invalidacao import publicar
+
+
+SNAPSHOT_PADRAO = "seed"
+
+# Controle de versão do schema e dos caches: nunca são apagadas
+TABELAS_PRESERVADAS = {"alembic_version", "versoes_referencia", "versoes_cache"}
+
+
+def _tabelas_dados(conexao: Connection) -> list:
+    """Tabelas dos modelos existentes no banco, das filhas para as pais"""
+    existentes = set(inspect(conexao).get_table_names())
+    return [
+        tabela.name for tabela in reversed(Base.metadata.sorted_tables)
+        if tabela.name in existentes and tabela.name not in TABELAS_PRESERVADAS
+    ]
+
+
+def _limpar_caches():
+    for backend in caches_registrados().values():
+        backend.limpar()
+
+
+def truncar_tabelas(conexao: Connection) -> list:
+    """
+    Apaga todos os dados e reinicia os contadores de id
+    Executa na transação da conexão informada (os caches são limpos no
+    commit dela); retorna as tabelas limpas
+    """
+    tabelas = _tabelas_dados(conexao)
+    if not tabelas:
+        return tabelas
+
+    quote = conexao.dialect.identifier_preparer.quote
+
+    if conexao.dialect.name == "postgresql":
+        conexao.execute(text(
+            f"TRUNCATE TABLE {', '.join(quote(t) for t in tabelas)} RESTART IDENTITY CASCADE"
+        ))
+    else:
+        for tabela in tabelas:
+            conexao.execute(text(f"DELETE FROM {quote(tabela)}"))
+        if conexao.dialect.name == "sqlite" and conexao.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'")
+        ).first():
+            conexao.execute(text("DELETE FROM sqlite_sequence"))
+
+    # Gêneros foram apagados: outros processos devem recarregar o catálogo
+    if inspect(conexao).has_table("versoes_referencia"):
+        incrementar_versao(conexao, "generos")
+    if inspect(conexao).has_table("versoes_cache"):
+        publicar(conexao, [TODAS])
+    # Caches do processo limpos só depois do commit: antes dele uma leitura
+    # ainda veria (e guardaria de novo) os dados antigos
+    event.listen(conexao, "commit", lambda _: _limpar_caches(), once=True)
+    return tabelas
+
+
+def resetar() -> float:
+    """Trunca o banco configurado em DATABASE_URL; retorna o tempo (s)"""
+    inicio = time.perf_counter()
+    with engine.begin() as conexao:
+        truncar_tabelas(conexao)
+    return time.perf_counter() - inicio
+
+
+def _engine_manutencao():
+    """Conexão ao banco 'postgres' para criar/remover outros bancos"""
+    return create_engine(
+        engine.url.set(database="postgres"),
+        isolation_level="AUTOCOMMIT",
+        poolclass=NullPool,
+    )
+
+
+def _encerrar_conexoes(conexao: Connection, banco: str):
+    # CREATE DATABASE ... TEMPLATE e DROP DATABASE exigem o banco sem conexões
+    conexao.execute(
+        text("""
+            SELECT pg_terminate_backend(pid) FROM pg_stat_activity
+            WHERE datname = :banco AND pid <> pg_backend_pid()
+        """),
+        {"banco": banco},
+    )
+
+
+def _copiar_banco_pg(origem: str, destino: str):
+    engine.dispose()
+    manutencao = _engine_manutencao()
+    try:
+        with manutencao.connect() as conexao:
+            quote = conexao.dialect.identifier_preparer.quote
+            _encerrar_conexoes(conexao, origem)
+            _encerrar_conexoes(conexao, destino)
+            conexao.execute(text(f"DROP DATABASE IF EXISTS {quote(destino)}"))
+            conexao.execute(text(f"CREATE DATABASE {quote(destino)} TEMPLATE {quote(origem)}"))
+    finally:
+        manutencao.dispose()
+
+
+def _copiar_arquivo_sqlite(origem: str, destino: str):
+    engine.dispose()
+    fonte, alvo = sqlite3.connect(origem), sqlite3.connect(destino)
+    try:
+        fonte.backup(alvo)
+    finally:
+        fonte.close()
+        alvo.close()
+
+
+def _nome_snapshot(nome: str) -> str:
+    banco = engine.url.database
+    if engine.dialect.name == "postgresql":
+        return f"{banco}_{nome}"
+    if engine.dialect.name == "sqlite":
+        if not banco or banco == ":memory:":
+            raise RuntimeError("Snapshot exige um banco SQLite em arquivo")
+        return f"{banco}.{nome}"
+    raise RuntimeError(f"Snapshot não suportado para {engine.dialect.name}")
+
+
+def criar_snapshot(nome: str = SNAPSHOT_PADRAO) -> float:
+    """Copia o estado atual do banco para o snapshot `nome`; retorna o tempo (s)"""
+    inicio = time.perf_counter()
+    snapshot = _nome_snapshot(nome)
+
+    if engine.dialect.name == "postgresql":
+        _copiar_banco_pg(engine.url.database, snapshot)
+    else:
+        _copiar_arquivo_sqlite(engine.url.database, snapshot)
+
+    return time.perf_counter() - inicio
+
+
+def restaurar_snapshot(nome: str = SNAPSHOT_PADRAO) -> float:
+    """
+    Substitui o banco pelo snapshot `nome`; retorna o tempo (s)
+    Todas as conexões abertas com o banco são encerradas
+    """
+    inicio = time.perf_counter()
+    snapshot = _nome_snapshot(nome)
+
+    if engine.dialect.name == "postgresql":
+        _copiar_banco_pg(snapshot, engine.url.database)
+    else:
+        _copiar_arquivo_sqlite(snapshot, engine.url.database)
+
+    # Outros processos: no PostgreSQL as conexões encerradas limpam os
+    # caches ao reconectar; no SQLite a versão publicada avisa
+    with engine.begin() as conexao:
+        publicar(conexao, [TODAS])
+    _limpar_caches()
+    return time.perf_counter() - inicio
+
+
+@contextmanager
+def banco_restaurado(nome: str = SNAPSHOT_PADRAO):
+    """
+    Fixture de teste/benchmark: restaura o snapshot ao sair do bloco
+
+        with banco_restaurado():
+            ...  # altera o banco à vontade
+    """
+    try:
+        yield
+    finally:
+        restaurar_snapshot(nome)
+
+
+def main():
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Reset rápido do banco de dados")
+    parser.add_argument("acao", choices=["truncar", "snapshot", "restaurar"])
+    parser.add_argument("--nome", default=SNAPSHOT_PADRAO, help="Nome do snapshot")
+    args = parser.parse_args()
+
+    engine.echo = False
+    if args.acao == "truncar":
+        segundos = resetar()
+    elif args.acao == "snapshot":
+        segundos = criar_snapshot(args.nome)
+    else:
+        segundos = restaurar_snapshot(args.nome)
+
+    print(f"✓ {args.acao} concluído em {segundos * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
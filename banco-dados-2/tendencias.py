@@ -0,0 +1,340 @@
+"""
+Mangás em alta (janelas de 1h, 24h e 7d)
+Leituras de capítulo (avanço em leitor_manga), avaliações e comentários
+novos e curtidas chegam pelo feed de alterações (outbox) e são somados por
+mangá em baldes de TENDENCIAS_BALDE segundos (tendencia_baldes), sempre
+pela hora do evento. A pontuação de uma janela é a soma ponderada (PESOS)
+dos baldes dentro dela com decaimento exponencial pela idade, com a
+meia-vida da janela. O ranking é recalculado por inteiro em mangas_em_alta,
+de onde saem as listas global e por gênero.
+
+AtualizadorTendencias consome o feed e recalcula o ranking a cada
+TENDENCIAS_INTERVALO segundos em uma thread (iniciar_tendencias).
+
+    python tendencias.py --janela 24h --genero Ação
+    python tendencias.py --acompanhar
+"""
+import argparse
+import math
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, delete, insert, func, cast, literal, Float, String, DateTime
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from database import SessionLocal, engine, insert_com_conflito
+from models import Manga, MangaGenero, TendenciaBalde, MangaEmAlta
+from outbox import ConsumidorOutbox
+from leitura_dto import converter
+
+
+BALDE_SEGUNDOS = int(os.getenv("TENDENCIAS_BALDE", 300))
+INTERVALO = float(os.getenv("TENDENCIAS_INTERVALO", 60))
+
+CONSUMIDOR = "tendencias"
+
+
+@dataclass(frozen=True)
+class Janela:
+    duracao: timedelta
+    meia_vida: timedelta
+
+
+JANELAS = {
+    "1h": Janela(timedelta(hours=1), timedelta(minutes=20)),
+    "24h": Janela(timedelta(hours=24), timedelta(hours=6)),
+    "7d": Janela(timedelta(days=7), timedelta(days=2)),
+}
+
+# Pontos por atividade
+PESOS = {
+    "leituras": 1.0,
+    "avaliacoes": 3.0,
+    "comentarios": 2.0,
+    "curtidas": 0.5,
+}
+
+CONTADORES = [*PESOS, "pontos"]
+
+_JANELA_MAXIMA = max(janela.duracao for janela in JANELAS.values())
+
+# Um único recálculo por vez entre processos (PostgreSQL)
+_TRAVA_RECALCULO = zlib.crc32(b"mangas_em_alta")
+
+
+@dataclass(slots=True, frozen=True)
+class ItemEmAlta:
+    id_manga: int
+    titulo_manga: str
+    autor: str
+    pontuacao: float
+    leituras: int
+    avaliacoes: int
+    comentarios: int
+    curtidas: int
+
+
+def balde(instante: datetime) -> int:
+    """Número do balde que contém o instante"""
+    return int(instante.timestamp()) // BALDE_SEGUNDOS
+
+
+def atividades(evento) -> dict:
+    """Atividades de um evento do feed ({} se não conta para o ranking)"""
+    dados = evento.dados or {}
+    anteriores = dados.get("anteriores", {})
+
+    if evento.entidade == "avaliacao" and evento.operacao == "insert":
+        return {"avaliacoes": 1}
+    if evento.entidade == "comentario" and evento.operacao == "insert":
+        return {"comentarios": 1}
+    if evento.entidade == "comentario" and evento.operacao == "update" and "numero_curtidas" in dados:
+        if "numero_curtidas" not in anteriores:
+            return {"curtidas": 1}
+        novas = (dados["numero_curtidas"] or 0) - (anteriores["numero_curtidas"] or 0)
+        return {"curtidas": novas} if novas > 0 else {}
+    if evento.entidade == "leitor_manga" and evento.operacao in ("insert", "update"):
+        # Leitor.ler_capitulo só altera leitor_manga quando o leitor avança
+        capitulo = dados.get("ultimo_capitulo_lido") or 0
+        if capitulo > (anteriores.get("ultimo_capitulo_lido") or 0):
+            return {"leituras": 1}
+    return {}
+
+
+def ingerir(conexao: Connection, eventos: list):
+    """Soma as atividades dos eventos nos baldes (função do ConsumidorOutbox)"""
+    limite = balde(datetime.now() - _JANELA_MAXIMA)
+    baldes = defaultdict(lambda: dict.fromkeys(CONTADORES, 0))
+    for evento in eventos:
+        contagens = atividades(evento)
+        numero = balde(evento.criado_em)
+        if not contagens or evento.id_manga is None or numero <= limite:
+            continue
+        contadores = baldes[(evento.id_manga, numero)]
+        for atividade, quantidade in contagens.items():
+            contadores[atividade] += quantidade
+            contadores["pontos"] += PESOS[atividade] * quantidade
+
+    if not baldes:
+        return
+
+    # Mangás removidos depois do evento ficam de fora (FK)
+    existentes = set(conexao.execute(
+        select(Manga.id_manga).where(Manga.id_manga.in_({id_manga for id_manga, _ in baldes}))
+    ).scalars())
+    linhas = [
+        {"id_manga": id_manga, "balde": numero, **contadores}
+        for (id_manga, numero), contadores in sorted(baldes.items())
+        if id_manga in existentes
+    ]
+    if not linhas:
+        return
+
+    comando = insert_com_conflito(conexao, TendenciaBalde)
+    conexao.execute(
+        comando.on_conflict_do_update(
+            index_elements=["id_manga", "balde"],
+            set_={c: getattr(TendenciaBalde, c) + getattr(comando.excluded, c) for c in CONTADORES},
+        ),
+        linhas,
+    )
+
+
+def _consulta_janela(nome: str, janela: Janela, agora: datetime):
+    """Pontuação com decaimento de cada mangá ativo na janela"""
+    atual = balde(agora)
+    # peso = 2 ^ (-idade / meia_vida), idade em baldes
+    fator = BALDE_SEGUNDOS * math.log(2) / janela.meia_vida.total_seconds()
+    peso = func.exp(cast((TendenciaBalde.balde - atual) * fator, Float))
+
+    return (
+        select(
+            literal(nome, String),
+            TendenciaBalde.id_manga,
+            func.sum(TendenciaBalde.pontos * peso),
+            func.sum(TendenciaBalde.leituras),
+            func.sum(TendenciaBalde.avaliacoes),
+            func.sum(TendenciaBalde.comentarios),
+            func.sum(TendenciaBalde.curtidas),
+            literal(agora, DateTime),
+        )
+        .where(TendenciaBalde.balde > balde(agora - janela.duracao))
+        .group_by(TendenciaBalde.id_manga)
+    )
+
+
+def atualizar_em_alta(conexao: Connection, agora: Optional[datetime] = None) -> dict:
+    """
+    Recalcula mangas_em_alta (todas as janelas) e descarta baldes antigos
+    Retorna {janela: mangás}; vazio se outro processo já está recalculando
+    """
+    if conexao.dialect.name == "postgresql":
+        if not conexao.execute(select(func.pg_try_advisory_xact_lock(_TRAVA_RECALCULO))).scalar():
+            return {}
+
+    agora = agora or datetime.now()
+    conexao.execute(delete(TendenciaBalde).where(TendenciaBalde.balde <= balde(agora - _JANELA_MAXIMA)))
+
+    colunas = ["janela", "id_manga", "pontuacao", "leituras", "avaliacoes",
+               "comentarios", "curtidas", "atualizado_em"]
+    totais = {}
+    for nome, janela in JANELAS.items():
+        # Troca atômica: leitores veem o ranking anterior até o commit
+        conexao.execute(delete(MangaEmAlta).where(MangaEmAlta.janela == nome))
+        totais[nome] = conexao.execute(
+            insert(MangaEmAlta).from_select(colunas, _consulta_janela(nome, janela, agora))
+        ).rowcount
+    return totais
+
+
+def em_alta(session: Session, janela: str = "24h", id_genero: Optional[int] = None,
+            limite: int = 10) -> list:
+    """Mangás em alta na janela, global ou de um gênero, como ItemEmAlta"""
+    if janela not in JANELAS:
+        raise ValueError(f"Janela inválida: {janela}. Use {', '.join(JANELAS)}")
+
+    consulta = (
+        select(
+            MangaEmAlta.id_manga,
+            Manga.titulo_manga,
+            Manga.autor,
+            MangaEmAlta.pontuacao,
+            MangaEmAlta.leituras,
+            MangaEmAlta.avaliacoes,
+            MangaEmAlta.comentarios,
+            MangaEmAlta.curtidas,
+        )
+        .join(Manga, Manga.id_manga == MangaEmAlta.id_manga)
+        .where(MangaEmAlta.janela == janela)
+    )
+    if id_genero is not None:
+        consulta = consulta.join(MangaGenero, MangaGenero.id_manga == MangaEmAlta.id_manga).where(
+            MangaGenero.id_genero == id_genero
+        )
+
+    return converter(ItemEmAlta, session.execute(
+        consulta.order_by(MangaEmAlta.pontuacao.desc(), MangaEmAlta.id_manga).limit(limite)
+    ))
+
+
+def atualizar(bind: Optional[Engine] = None) -> tuple:
+    """Consome o feed pendente e recalcula o ranking; retorna (eventos, {janela: mangás})"""
+    bind = bind or engine
+    eventos = ConsumidorOutbox(CONSUMIDOR).processar(ingerir, bind)
+    with bind.begin() as conexao:
+        return eventos, atualizar_em_alta(conexao)
+
+
+class AtualizadorTendencias:
+    """Thread que mantém o ranking em alta atualizado"""
+
+    def __init__(self, bind: Optional[Engine] = None, intervalo: float = INTERVALO):
+        self.bind = bind or engine
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self):
+        if self.ativo:
+            return self
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="atualizador-tendencias", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self, timeout: float = 5.0):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _executar(self):
+        while not self._parar.is_set():
+            try:
+                atualizar(self.bind)
+            except Exception as e:
+                print(f"⚠ Falha ao atualizar mangás em alta ({e}); nova tentativa em {self.intervalo:.0f}s")
+            self._parar.wait(self.intervalo)
+
+
+_atualizador = None
+_atualizador_lock = threading.Lock()
+
+
+def iniciar_tendencias(bind: Optional[Engine] = None) -> AtualizadorTendencias:
+    """Inicia (uma vez por processo) a atualização periódica do ranking"""
+    global _atualizador
+    with _atualizador_lock:
+        if _atualizador is None:
+            _atualizador = AtualizadorTendencias(bind)
+        return _atualizador.iniciar()
+
+
+def parar_tendencias():
+    """Encerra a atualização periódica"""
+    global _atualizador
+    with _atualizador_lock:
+        if _atualizador is not None:
+            _atualizador.parar()
+            _atualizador = None
+
+
+def _mostrar(janela: str, genero: Optional[str], limite: int):
+    from dados_referencia import catalogo_generos
+
+    session = SessionLocal()
+    try:
+        id_genero = catalogo_generos(session).id_por_nome(genero) if genero else None
+        itens = em_alta(session, janela, id_genero, limite)
+    finally:
+        session.close()
+
+    print(f"\n🔥 Em alta ({janela}{', ' + genero if genero else ''})\n")
+    print(f"{'#':>3} {'Mangá':<30} {'Pontos':>8} {'Leit.':>6} {'Aval.':>6} {'Com.':>6} {'Curt.':>6}")
+    print("-" * 72)
+    for posicao, item in enumerate(itens, 1):
+        print(f"{posicao:>3} {item.titulo_manga[:30]:<30} {item.pontuacao:>8.2f} {item.leituras:>6} "
+              f"{item.avaliacoes:>6} {item.comentarios:>6} {item.curtidas:>6}")
+    if not itens:
+        print("   (nenhuma atividade na janela)")
+
+
+def main():
+    """Atualiza e mostra os mangás em alta"""
+    parser = argparse.ArgumentParser(description="Mangás em alta")
+    parser.add_argument("--janela", choices=list(JANELAS), default="24h")
+    parser.add_argument("--genero", default=None, help="Nome do gênero")
+    parser.add_argument("--limite", type=int, default=10)
+    parser.add_argument("--acompanhar", action="store_true",
+                        help=f"Atualiza a cada {INTERVALO:.0f}s até Ctrl+C")
+    args = parser.parse_args()
+
+    engine.echo = False
+    if args.acompanhar:
+        print(f"🔄 Atualizando mangás em alta a cada {INTERVALO:.0f}s... Ctrl+C para sair")
+        atualizador = AtualizadorTendencias().iniciar()
+        try:
+            while atualizador.ativo:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            atualizador.parar()
+        return
+
+    eventos, totais = atualizar()
+    print(f"📥 {eventos} evento(s) processado(s); "
+          + ", ".join(f"{janela}: {total} mangá(s)" for janela, total in totais.items()))
+    _mostrar(args.janela, args.genero, args.limite)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Fixtures dos testes: banco SQLite temporário com o schema dos modelos
+DATABASE_URL precisa ser definido antes do primeiro import de database
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+_ARQUIVO_BANCO = os.path.join(tempfile.mkdtemp(prefix="mangas-testes-"), "testes.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_ARQUIVO_BANCO}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, SessionLocal, engine  # noqa: E402
+import models  # noqa: E402,F401 - registra as tabelas no metadata
+
+engine.echo = False
+
+
+@pytest.fixture
+def session():
+    """Sessão em um schema recriado a cada teste"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
@@ -0,0 +1,54 @@
+"""
+Agregados diários de avaliações (models/avaliacao_diaria.py)
+"""
+from sqlalchemy import select
+
+from models import Manga, Leitor, Avaliacao, AvaliacaoDiaria
+from models.avaliacao_diaria import recalcular_agregados
+
+
+def _manga_avaliado(session, notas):
+    manga = Manga(titulo_manga="Teste", autor="Autor")
+    session.add(manga)
+    for i, nota in enumerate(notas):
+        leitor = Leitor(nome=f"Leitor {i}", email=f"leitor{i}@teste.local", senha="-", codinome=f"leitor{i}")
+        session.add(Avaliacao(nota=nota, leitor=leitor, manga=manga))
+    session.commit()
+    return manga
+
+
+def test_excluir_manga_com_avaliacoes_carregadas(session):
+    """As avaliações removidas em cascata não geram deltas para o mangá excluído"""
+    manga = _manga_avaliado(session, [4.5, 3.0])
+    id_manga = manga.id_manga
+    assert len(manga.avaliacoes) == 2
+
+    session.delete(manga)
+    session.commit()
+
+    assert session.get(Manga, id_manga) is None
+    assert session.scalars(select(AvaliacaoDiaria).where(AvaliacaoDiaria.id_manga == id_manga)).all() == []
+
+
+def test_soma_incremental_sem_erro_acumulado(session):
+    """Editar notas repetidamente mantém a soma igual à recalculada"""
+    manga = _manga_avaliado(session, [4.7, 0.1, 2.3])
+    for nota in (0.3, 4.9, 1.1, 3.7) * 10:
+        for avaliacao in manga.avaliacoes:
+            avaliacao.editar_avaliacao(nota)
+        session.commit()
+    for avaliacao, nota in zip(manga.avaliacoes, (4.7, 0.1, 2.3)):
+        avaliacao.editar_avaliacao(nota)
+    session.commit()
+
+    def agregados():
+        consulta = select(AvaliacaoDiaria).where(AvaliacaoDiaria.id_manga == manga.id_manga)
+        return [(a.dia, a.total, a.soma_centesimos, a.histograma) for a in session.scalars(consulta)]
+
+    incrementais = agregados()
+    assert sum(a[2] for a in incrementais) == 710
+    assert sum(a[1] for a in incrementais) == 3
+
+    recalcular_agregados(session.connection(), [manga.id_manga])
+    session.expire_all()
+    assert agregados() == incrementais
@@ -0,0 +1,31 @@
+"""
+Bitmap de capítulos lidos (models/leitor_manga.py)
+"""
+from database import SessionLocal
+from models import Manga, Leitor, LeitorManga
+
+
+def test_marcacoes_de_sessoes_diferentes_nao_se_perdem(session):
+    """A marcação relê o bitmap gravado por outra sessão antes de alterá-lo"""
+    leitura = LeitorManga(
+        leitor=Leitor(nome="Leitor", email="leitor@teste.local", senha="-", codinome="leitor"),
+        manga=Manga(titulo_manga="Teste", autor="Autor"),
+    )
+    session.add(leitura)
+    session.commit()
+    leitura.marcar_lidos(1, 3)
+    session.commit()
+    assert leitura.numeros_lidos() == [1, 2, 3]
+
+    outra = SessionLocal()
+    try:
+        outra.get(LeitorManga, leitura.id).marcar_lidos(10, 12)
+        outra.commit()
+    finally:
+        outra.close()
+
+    leitura.desmarcar_lidos(2, 2)
+    leitura.marcar_lidos(5, 5)
+    session.commit()
+
+    assert leitura.numeros_lidos() == [1, 3, 5, 10, 11, 12]
@@ -0,0 +1,24 @@
+"""
+Contagens de comentários com o arquivo (arquivamento.py)
+"""
+from datetime import datetime
+
+from estatisticas import coletar_estatisticas
+from relatorios import obter_relatorio
+from models import Manga, Leitor, Avaliacao, Comentario, ComentarioArquivado
+
+
+def test_contagens_incluem_comentarios_arquivados(session):
+    """Painel e ranking de engajamento somam a tabela quente e o arquivo"""
+    leitor = Leitor(nome="Leitor", email="leitor@teste.local", senha="-", codinome="leitor")
+    manga = Manga(titulo_manga="Teste", autor="Autor")
+    session.add_all([leitor, manga, Avaliacao(nota=5.0, leitor=leitor, manga=manga),
+                     Comentario(texto_comentario="novo", leitor=leitor, manga=manga)])
+    session.flush()
+    session.add(ComentarioArquivado(id_comentario=1000, texto_comentario="antigo", data_criacao=datetime(2020, 1, 1),
+                                    id_leitor=leitor.id_usuario, id_manga=manga.id_manga))
+    session.commit()
+
+    assert coletar_estatisticas(session, usar_cache=False).total_comentarios == 2
+    ranking = session.execute(obter_relatorio("mangas_bem_avaliados_engajados")).all()
+    assert [(linha.titulo_manga, linha.total_comentarios) for linha in ranking] == [("Teste", 2)]
@@ -0,0 +1,66 @@
+"""
+Migrations aplicadas a um banco com dados (alembic/versions)
+"""
+import os
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from init import DIRETORIO, _importar_alembic
+
+
+# Revisão anterior aos agregados diários de avaliações
+REVISAO_INICIAL = "c21090122106"
+
+# Uma vez por processo: reimportar o alembic deixaria os módulos que já
+# guardaram alembic.op (migracao_online) com o proxy antigo
+command, Config, _, _ = _importar_alembic()
+
+
+def _migrar(conexao, revisao: str):
+    config = Config(os.path.join(DIRETORIO, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(DIRETORIO, "alembic"))
+    config.attributes["connection"] = conexao
+    command.upgrade(config, revisao)
+
+
+def test_upgrade_ate_o_head_com_dados(tmp_path):
+    """Backfills das migrations usam o schema da própria revisão, não o dos modelos atuais"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migracoes.db'}", poolclass=NullPool)
+    try:
+        with engine.connect() as conexao:
+            _migrar(conexao, REVISAO_INICIAL)
+            conexao.execute(text(
+                "INSERT INTO usuarios (id_usuario, email, nome, senha, tipo) "
+                "VALUES (1, 'leitor@teste.local', 'Leitor', '-', 'leitor')"
+            ))
+            conexao.execute(text("INSERT INTO leitores (id_usuario, codinome) VALUES (1, 'leitor')"))
+            conexao.execute(text(
+                "INSERT INTO mangas (id_manga, titulo_manga, autor, status, data_criacao) "
+                "VALUES (1, 'Teste', 'Autor', 'EM_ANDAMENTO', '2026-01-01 00:00:00')"
+            ))
+            conexao.execute(text(
+                "INSERT INTO capitulos (id_capitulo, titulo_capitulo, numero_capitulo, numero_paginas, "
+                "paginas_lidas, data_publicacao, id_manga) VALUES (1, 'Um', 1, 20, 0, '2026-01-02 00:00:00', 1)"
+            ))
+            conexao.execute(text(
+                "INSERT INTO leitor_manga (id, id_leitor, id_manga, progresso_leitura, ultimo_capitulo_lido) "
+                "VALUES (1, 1, 1, 100.0, 1)"
+            ))
+            conexao.execute(
+                text("INSERT INTO avaliacoes (nota, id_leitor, id_manga) VALUES (:nota, 1, 1)"),
+                [{"nota": nota} for nota in (4.7, 0.1, 2.3)],
+            )
+            conexao.commit()
+
+            _migrar(conexao, "head")
+
+            total, soma, histograma = conexao.execute(text(
+                "SELECT sum(total), sum(soma_centesimos), "
+                "group_concat(notas_0 || notas_1 || notas_2 || notas_3 || notas_4 || notas_5) "
+                "FROM avaliacoes_diarias WHERE id_manga = 1"
+            )).one()
+            assert (total, soma, histograma) == (3, 710, "101010")
+            assert conexao.execute(text("SELECT capitulos_lidos FROM leitor_manga WHERE id = 1")).scalar() == b"\x02"
+    finally:
+        engine.dispose()
@@ -0,0 +1,21 @@
+"""
+Contadores de notificações não lidas (notificacoes.py)
+"""
+from models import Manga, Leitor, Notificacao, NotificacoesNaoLidas
+from notificacoes import somar_nao_lidas
+
+
+def test_excluir_manga_desconta_nao_lidas(session):
+    """Notificações removidas em cascata com o mangá saem do contador"""
+    leitor = Leitor(nome="Leitor", email="leitor@teste.local", senha="-", codinome="leitor")
+    mangas = [Manga(titulo_manga=f"Teste {i}", autor="Autor") for i in range(2)]
+    session.add_all([leitor, *mangas])
+    session.flush()
+    session.add_all(Notificacao(id_leitor=leitor.id_usuario, id_manga=m.id_manga) for m in (*mangas, mangas[0]))
+    somar_nao_lidas(session.connection(), {leitor.id_usuario: 3})
+    session.commit()
+
+    session.delete(mangas[0])
+    session.commit()
+
+    assert session.get(NotificacoesNaoLidas, leitor.id_usuario).total == 1